@@ -0,0 +1,133 @@
+import argparse
+import random
+
+import numpy as np
+
+import batch_engine
+
+# GST slab rates in percent, as in sku_master.gst_percentage and hsn_codes.igst_rate
+GST_RATES = [0, 5, 12, 18, 28]
+
+# Share of tax documents that are intra-state (CGST + SGST) rather than inter-state (IGST)
+INTRA_STATE_SHARE = 0.5
+
+# Whether amounts are derived from each other (see configure) or drawn independently
+CONSISTENT = False
+
+
+# Switch the consistent-amounts mode on or off. In consistent mode tax is the GST rate
+# of the base amount, totals are the sum of their parts and journal entries balance;
+# otherwise every amount is an independent draw from the same range as before.
+def configure(consistent=True):
+    global CONSISTENT
+    CONSISTENT = consistent
+
+
+# Amounts in paise (integer hundredths), like round(random.uniform(low, high), 2) * 100.
+# Amounts are added up in paise so totals are exact.
+def paise_column(rng, n, low, high):
+    return np.rint(rng.uniform(low * 100, high * 100, n)).astype(np.int64)
+
+
+# rate percent of amounts in paise, rounded half up to the paisa
+def percent_of(amounts, rates):
+    return (amounts * np.asarray(rates, dtype=np.int64) + 50) // 100
+
+
+def _rupees(columns):
+    return {name: values / 100 for name, values in columns.items()}
+
+
+# Sales order / invoice amounts: total_amount before tax, tax_amount, shipping_amount and
+# grand_total. Consistent: tax is a GST slab rate of the total and
+# grand_total = total_amount + tax_amount + shipping_amount.
+def order_columns(rng, n):
+    total = paise_column(rng, n, 1000, 100000)
+    shipping = paise_column(rng, n, 50, 1000)
+    if CONSISTENT:
+        tax = percent_of(total, rng.choice(GST_RATES, n))
+        grand_total = total + tax + shipping
+    else:
+        tax = paise_column(rng, n, 100, 10000)
+        grand_total = paise_column(rng, n, 1150, 111000)
+    return _rupees({'total_amount': total, 'tax_amount': tax, 'shipping_amount': shipping,
+                    'grand_total': grand_total})
+
+
+# GST document amounts for a taxable amount between low and high: cgst_amount,
+# sgst_amount, igst_amount and total_amount. Consistent: intra-state documents split the
+# slab rate equally into CGST and SGST, inter-state ones charge it all as IGST, and
+# total_amount = taxable_amount + cgst_amount + sgst_amount + igst_amount.
+def tax_columns(rng, n, low=1000, high=100000):
+    taxable = paise_column(rng, n, low, high)
+    if CONSISTENT:
+        rates = rng.choice(GST_RATES, n)
+        intra_state = rng.random(n) < INTRA_STATE_SHARE
+        half = (taxable * rates + 100) // 200
+        cgst = np.where(intra_state, half, 0)
+        sgst = cgst
+        igst = np.where(intra_state, 0, percent_of(taxable, rates))
+        total = taxable + cgst + sgst + igst
+    else:
+        cgst = paise_column(rng, n, low * 0.05, high * 0.05)
+        sgst = paise_column(rng, n, low * 0.05, high * 0.05)
+        igst = paise_column(rng, n, low * 0.1, high * 0.1)
+        total = paise_column(rng, n, low * 1.1, high * 1.1)
+    return _rupees({'taxable_amount': taxable, 'cgst_amount': cgst, 'sgst_amount': sgst,
+                    'igst_amount': igst, 'total_amount': total})
+
+
+# Journal entry amounts: debit_amount of the debit line, credit_amount of the credit line,
+# total_debit and total_credit. Consistent: both lines carry the entry amount, so
+# every entry balances and its totals are the sums of its lines.
+def journal_columns(rng, n):
+    if CONSISTENT:
+        amount = paise_column(rng, n, 1000, 100000)
+        debit = credit = total_debit = total_credit = amount
+    else:
+        debit = paise_column(rng, n, 0, 100000)
+        credit = paise_column(rng, n, 0, 100000)
+        total_debit = paise_column(rng, n, 1000, 100000)
+        total_credit = paise_column(rng, n, 1000, 100000)
+    return _rupees({'debit_amount': debit, 'credit_amount': credit, 'total_debit': total_debit,
+                    'total_credit': total_credit})
+
+
+# Amount column generators by kind
+KINDS = {
+    'order': order_columns,
+    'tax': tax_columns,
+    'journal': journal_columns
+}
+
+
+# Amount columns of a kind for batch generators, e.g. amount_columns(rng, n, 'tax', low=1000, high=10000)
+def amount_columns(rng, n, kind, **kwargs):
+    return KINDS[kind](rng, n, **kwargs)
+
+
+# Amounts of num_records records, one dict per record, for per-record generators. Like
+# batch_engine.timestamp_rows they are drawn as arrays a chunk at a time, seeded from the
+# random module when called.
+def amount_rows(kind, num_records, rng=None, chunk_size=batch_engine.ROW_CHUNK_SIZE, **kwargs):
+    rng = rng if rng is not None else batch_engine.make_rng(random.getrandbits(64))
+    return _iter_amount_rows(kind, num_records, rng, chunk_size, kwargs)
+
+
+def _iter_amount_rows(kind, num_records, rng, chunk_size, kwargs):
+    for start in range(0, num_records, chunk_size):
+        columns = amount_columns(rng, min(chunk_size, num_records - start), kind, **kwargs)
+        names = list(columns)
+        for row in zip(*(column.tolist() for column in columns.values())):
+            yield dict(zip(names, row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show sample amounts of a kind")
+    parser.add_argument('kind', choices=sorted(KINDS))
+    parser.add_argument('--consistent', action='store_true', help="Derive tax, totals and balanced lines")
+    parser.add_argument('--count', type=int, default=5)
+    args = parser.parse_args()
+    configure(args.consistent)
+    for row in amount_rows(args.kind, args.count, batch_engine.make_rng()):
+        print(row)
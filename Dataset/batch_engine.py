@@ -0,0 +1,205 @@
+import inspect
+import random
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Rows generated per chunk in batch mode
+DEFAULT_CHUNK_SIZE = 100000
+
+# Rows of timestamps timestamp_rows() draws at a time for per-record generators
+ROW_CHUNK_SIZE = 10000
+
+
+# Create a NumPy random generator for a batch run
+def make_rng(seed=None):
+    return np.random.default_rng(seed)
+
+
+# Default row count of a generator, taken from its num_records argument
+def table_size(generator):
+    return inspect.signature(generator).parameters['num_records'].default
+
+
+# Equivalent of round(random.uniform(low, high), decimals) for a whole column
+def uniform_column(rng, n, low, high, decimals=2):
+    return np.round(rng.uniform(low, high, n), decimals)
+
+
+# Equivalent of random.randint(low, high) (both ends inclusive) for a whole column
+def randint_column(rng, n, low, high):
+    return rng.integers(low, high, n, endpoint=True)
+
+
+# Equivalent of random.choice(options) for a whole column
+def choice_column(rng, n, options):
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+
+
+# Boolean mask that is True with probability p, e.g. for "x if random.random() < p else None"
+def mask_column(rng, n, p):
+    return rng.random(n) < p
+
+
+# Keep values where mask is True and use fill (None by default) elsewhere
+def where_column(mask, values, fill=None):
+    return np.where(mask, np.asarray(values, dtype=object), fill)
+
+
+# Column with values on a random fraction p of n rows and fill elsewhere; values(count)
+# builds only the values kept, so sparse text columns do not generate text to discard
+def sparse_column(rng, n, p, values, fill=None):
+    mask = mask_column(rng, n, p)
+    column = np.full(n, fill, dtype=object)
+    column[mask] = values(int(mask.sum()))
+    return column
+
+
+# Equivalent of f"{prefix}{fake.random_number(digits=digits)}" for a whole column
+def number_id_column(rng, n, prefix, digits):
+    numbers = rng.integers(0, 10 ** digits, n)
+    return np.char.add(prefix, numbers.astype(str))
+
+
+# Equivalent of f"{random.randint(low, high):0{width}d}" for a whole column
+def padded_int_column(rng, n, low, high, width):
+    return np.char.zfill(randint_column(rng, n, low, high).astype(str), width)
+
+
+# Equivalent of fake.uuid4() for a whole column
+def uuid4_column(rng, n):
+    raw = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_digits = raw.tobytes().hex()
+    return [
+        f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+        for h in (hex_digits[i:i + 32] for i in range(0, n * 32, 32))
+    ]
+
+
+# Resolve Faker-style relative dates ("now", "-1y", "-30d") to a datetime
+def resolve_date(value, now=None):
+    now = now or datetime.now().replace(microsecond=0)
+    if isinstance(value, datetime):
+        return value
+    if value == "now":
+        return now
+    match = re.fullmatch(r"([+-]?\d+)([ydwhms])", value)
+    if not match:
+        raise ValueError(f"Invalid relative date {value!r}")
+    amount, unit = int(match.group(1)), match.group(2)
+    units = {"y": timedelta(days=365), "d": timedelta(days=1), "w": timedelta(weeks=1),
+             "h": timedelta(hours=1), "m": timedelta(minutes=1), "s": timedelta(seconds=1)}
+    return now + amount * units[unit]
+
+
+# Equivalent of fake.date_time_between(start_date, end_date) as a datetime64[s] column
+def datetime_between_column(rng, n, start_date, end_date="now"):
+    start = np.datetime64(resolve_date(start_date), 's')
+    end = np.datetime64(resolve_date(end_date), 's')
+    seconds = rng.integers(0, max((end - start).astype(np.int64), 1), n)
+    return start + seconds.astype('timedelta64[s]')
+
+
+# Add random.randint(low, high) units ('D' days, 'h' hours) to a datetime64 column
+def offset_column(rng, base, low, high, unit='D'):
+    offsets = randint_column(rng, len(base), low, high).astype(f'timedelta64[{unit}]')
+    return base + offsets
+
+
+# Timestamp specs map each field to how its datetime64[s] column is drawn. Fields are
+# drawn in order, so a field can build on any field listed before it:
+#   (start_date, end_date)        between two dates, like fake.date_time_between()
+#   (field, low, high[, unit])    field plus random.randint(low, high) days ('h' for hours)
+#   ('after', field[, end_date])  between field and end_date ("now" by default)
+# Offsets are never negative, so a derived field (last_updated, end_date) never precedes its base.
+def timestamp_columns(rng, n, spec):
+    columns = {}
+    for name, rule in spec.items():
+        if rule[0] == 'after':
+            base = columns[rule[1]]
+            end = np.datetime64(resolve_date(rule[2] if len(rule) > 2 else "now"), 's')
+            span = np.maximum((end - base).astype(np.int64), 0)
+            columns[name] = base + rng.integers(0, span + 1).astype('timedelta64[s]')
+        elif len(rule) > 2:
+            columns[name] = offset_column(rng, columns[rule[0]], rule[1], rule[2], *rule[3:])
+        else:
+            columns[name] = datetime_between_column(rng, n, rule[0], rule[1])
+    return columns
+
+
+# Format a datetime64 column the way datetime.isoformat() does for whole seconds.
+# Dates are formatted once per distinct day and times assembled as digit bytes,
+# which is faster than np.datetime_as_string for large columns.
+def isoformat_column(values):
+    seconds = np.asarray(values).astype('datetime64[s]')
+    if len(seconds) == 0 or np.isnat(seconds).any():
+        return np.datetime_as_string(seconds, unit='s')
+    days = seconds.astype('datetime64[D]')
+    day_numbers = days.view(np.int64)
+    first, last = day_numbers.min(), day_numbers.max()
+    if last - first > len(seconds):
+        return np.datetime_as_string(seconds, unit='s')
+    day_strings = np.datetime_as_string(np.arange(first, last + 1).astype('datetime64[D]')).astype('S10')
+    day_bytes = np.frombuffer(day_strings.tobytes(), dtype=np.uint8).reshape(-1, 10)
+    time_of_day = (seconds - days).view(np.int64)
+    out = np.empty((len(seconds), 19), dtype=np.uint8)
+    out[:, :10] = day_bytes[day_numbers - first]
+    out[:, 10] = ord('T')
+    out[:, 13] = out[:, 16] = ord(':')
+    for column, part in ((11, time_of_day // 3600), (14, time_of_day // 60 % 60), (17, time_of_day % 60)):
+        out[:, column] = part // 10 + ord('0')
+        out[:, column + 1] = part % 10 + ord('0')
+    return out.view('S19').ravel().astype('U19')
+
+
+# isoformat_column over several datetime64 columns in one pass, e.g. the output of timestamp_columns()
+def isoformat_columns(columns):
+    if not columns:
+        return {}
+    strings = isoformat_column(np.concatenate([np.asarray(column).astype('datetime64[s]') for column in columns.values()]))
+    lengths = np.cumsum([len(column) for column in columns.values()])[:-1]
+    return dict(zip(columns, np.split(strings, lengths)))
+
+
+# ISO timestamps of num_records records drawn from a timestamp spec, one dict per record,
+# for per-record generators. Rows are drawn chunk_size at a time as they are consumed.
+# Without rng the draws are seeded from the random module (when this is called, not
+# when the first row is read), so seeded runs stay reproducible.
+def timestamp_rows(num_records, spec, rng=None, chunk_size=ROW_CHUNK_SIZE):
+    rng = rng if rng is not None else make_rng(random.getrandbits(64))
+    return _iter_timestamp_rows(num_records, spec, rng, chunk_size)
+
+
+def _iter_timestamp_rows(num_records, spec, rng, chunk_size):
+    for start in range(0, num_records, chunk_size):
+        columns = isoformat_columns(timestamp_columns(rng, min(chunk_size, num_records - start), spec))
+        names = list(columns)
+        for row in zip(*(column.tolist() for column in columns.values())):
+            yield dict(zip(names, row))
+
+
+# Turn a chunk of columns into record dicts, converting NumPy values to plain Python ones
+def iter_records(columns):
+    names = list(columns)
+    values = [col.tolist() if isinstance(col, np.ndarray) else list(col) for col in columns.values()]
+    for row in zip(*values):
+        yield dict(zip(names, row))
+
+
+# Run a batch generator chunk by chunk, yielding one column dict per chunk.
+# Extra keyword arguments (e.g. keys=) are passed to the generator.
+def iter_batches(batch_generator, num_records=None, chunk_size=DEFAULT_CHUNK_SIZE, rng=None, **kwargs):
+    if num_records is None:
+        num_records = table_size(batch_generator)
+    rng = rng if rng is not None else make_rng()
+    for start in range(0, num_records, chunk_size):
+        yield batch_generator(min(chunk_size, num_records - start), rng=rng, **kwargs)
+
+
+# Run a batch generator and yield its rows as records, one chunk in memory at a time
+def iter_batch_records(batch_generator, num_records=None, chunk_size=DEFAULT_CHUNK_SIZE, rng=None, **kwargs):
+    for columns in iter_batches(batch_generator, num_records, chunk_size, rng, **kwargs):
+        yield from iter_records(columns)
@@ -0,0 +1,205 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import platform
+import time
+import tracemalloc
+
+import faker
+import numpy as np
+
+import batch_engine
+import id_allocator
+import key_registry
+import scale
+import seeding
+import value_pools
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Row counts every generator is benchmarked at
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# Timed runs per case; the fastest one is reported
+DEFAULT_REPEAT = 3
+
+# Relative drop in rows/s (or rise in peak memory) against the baseline that counts as a regression
+DEFAULT_THRESHOLD = 0.2
+
+# Parent keys registered for tables that sample foreign keys
+PARENT_KEYS = 1000
+
+SEED = 0
+AS_OF = '2024-01-01T00:00:00'
+
+
+# Every benchmark case as (module, table file, mode): each generator in a module's
+# TABLES ('record') and BATCH_TABLES ('batch')
+def cases(modules=scale.ALL_MODULES):
+    found = []
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        for filename in module.TABLES:
+            found.append((module_name, filename, 'record'))
+        for filename in getattr(module, 'BATCH_TABLES', {}):
+            found.append((module_name, filename, 'batch'))
+    return found
+
+
+# Registry of synthetic parent keys, so child tables run their real foreign key path
+def parent_keys(table):
+    keys = key_registry.KeyRegistry()
+    for parent in key_registry.parents(table):
+        keys.register(parent, [f"{parent}-{i}" for i in range(PARENT_KEYS)])
+    return keys
+
+
+# Generate num_records rows of a table once, seeded the same way every time
+def generate(module, filename, mode, num_records):
+    seeding.freeze_clock(AS_OF, [module])
+    value_pools.set_seed(SEED)
+    id_allocator.start()
+    rng = seeding.seed_module(module, seeding.derive_seed(SEED, filename))
+    table = key_registry.table_name(filename)
+    options = {'keys': parent_keys(table)} if key_registry.parents(table) else {}
+    if mode == 'batch':
+        return list(batch_engine.iter_batch_records(module.BATCH_TABLES[filename], num_records, rng=rng, **options))
+    return module.TABLES[filename](num_records, **options)
+
+
+# High-water mark of this process's resident memory in MB (None where unavailable)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if platform.system() == 'Darwin' else peak / 1024
+
+
+# Benchmark one case in a fresh worker process: the fastest of repeat timed runs,
+# the compact JSON size of the rows, the process's peak RSS and, unless disabled,
+# the peak traced Python allocation of one more run under tracemalloc
+def run_case(module_name, filename, mode, num_records, repeat, trace):
+    module = importlib.import_module(module_name)
+    # Warm up one-off caches (value pools, text corpora) outside the timed runs
+    generate(module, filename, mode, min(num_records, 10))
+    rss_before = peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records = generate(module, filename, mode, num_records)
+        timings.append(time.perf_counter() - started)
+    rows = len(records)
+    size = sum(len(json.dumps(record, separators=(',', ':'))) + 1 for record in records)
+    del records
+    rss_peak = peak_rss_mb()
+    traced = None
+    if trace:
+        tracemalloc.start()
+        generate(module, filename, mode, num_records)
+        traced = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    seconds = min(timings)
+    return {
+        'module': module_name, 'table': key_registry.table_name(filename), 'mode': mode,
+        'generator': module.TABLES[filename].__name__ if mode == 'record' else module.BATCH_TABLES[filename].__name__,
+        'size': num_records, 'rows': rows, 'bytes': size, 'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds else None,
+        'bytes_per_sec': size / seconds if seconds else None,
+        'peak_rss_mb': rss_peak,
+        'rss_growth_mb': rss_peak - rss_before if rss_peak is not None else None,
+        'peak_traced_mb': traced
+    }
+
+
+# Versions and settings the results were measured with
+def environment(sizes, repeat, trace):
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+        'numpy': np.__version__, 'faker': faker.VERSION, 'sizes': sizes, 'repeat': repeat,
+        'tracemalloc': trace, 'seed': SEED, 'as_of': AS_OF,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+# Run every case, each in its own process so peak RSS is not carried over between cases
+def run(modules=scale.ALL_MODULES, sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, trace=True, match=None, verbose=True):
+    selected = [case for case in cases(modules) if match is None or match in case[1] or match in case[0]]
+    results = []
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for module_name, filename, mode in selected:
+            for num_records in sizes:
+                result = pool.apply(run_case, (module_name, filename, mode, num_records, repeat, trace))
+                results.append(result)
+                if verbose:
+                    print_result(result)
+    return {'environment': environment(sizes, repeat, trace), 'results': results}
+
+
+def _key(result):
+    return result['table'], result['mode'], result['size']
+
+
+# Cases that got slower (rows/s) or bigger (peak traced memory) than the baseline by more
+# than threshold, as (result, metric, baseline value, current value, relative change)
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    previous = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+        for metric, worse in (('rows_per_sec', -1), ('peak_traced_mb', 1)):
+            if not old.get(metric) or result.get(metric) is None:
+                continue
+            change = (result[metric] - old[metric]) / old[metric]
+            if change * worse > threshold:
+                regressions.append((result, metric, old[metric], result[metric], change))
+    return regressions
+
+
+def _mb(value):
+    return f"{value:.1f}" if value is not None else '-'
+
+
+def print_header():
+    print(f"{'table':<28} {'mode':<6} {'rows':>7} {'rows/s':>12} {'MB/s':>8} {'RSS MB':>8} {'traced MB':>9}")
+
+
+def print_result(result):
+    print(f"{result['table']:<28} {result['mode']:<6} {result['rows']:>7} {result['rows_per_sec'] or 0:>12,.0f} "
+          f"{(result['bytes_per_sec'] or 0) / 1e6:>8.2f} {_mb(result['peak_rss_mb']):>8} {_mb(result['peak_traced_mb']):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every table generator's throughput and peak memory")
+    parser.add_argument('modules', nargs='*', default=scale.ALL_MODULES, help="Module scripts to benchmark (default: all)")
+    parser.add_argument('--sizes', type=lambda value: [int(size) for size in value.split(',')], default=DEFAULT_SIZES,
+                        help="Comma-separated row counts (default: 100,1000,10000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per case, the fastest is kept")
+    parser.add_argument('--match', default=None, help="Only tables or modules whose name contains this")
+    parser.add_argument('--no-tracemalloc', action='store_true', help="Skip the extra traced run per case")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the results")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown or memory growth reported as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    print_header()
+    current = run(args.modules, args.sizes, args.repeat, not args.no_tracemalloc, args.match)
+    with open(args.output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Wrote {len(current['results'])} results to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for result, metric, old, new, change in regressions:
+            print(f"REGRESSION {result['table']} ({result['mode']}, {result['size']} rows): "
+                  f"{metric} {old:,.2f} -> {new:,.2f} ({change:+.0%})")
+        print(f"{len(regressions)} regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        if regressions:
+            raise SystemExit(1)
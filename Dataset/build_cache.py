@@ -0,0 +1,105 @@
+import hashlib
+import inspect
+import json
+import os
+import types
+
+import dataset_io
+
+# Cache of the fingerprints each table in an output directory was built from
+CACHE_FILE = '.build_cache.json'
+
+# Shared modules whose source is part of every table's fingerprint
+ENGINE_MODULES = ['amounts', 'batch_engine', 'columnar', 'dataset_io', 'id_allocator', 'key_registry', 'normalized', 'seeding', 'text_engine', 'value_pools']
+
+
+# repr that does not depend on set ordering or hash randomization
+def _stable_repr(value):
+    if isinstance(value, (set, frozenset)):
+        return '{' + ', '.join(sorted(_stable_repr(item) for item in value)) + '}'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f"{_stable_repr(k)}: {_stable_repr(v)}" for k, v in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_stable_repr(item) for item in value) + ']'
+    return repr(value)
+
+
+# Global names a code object (and the comprehensions/lambdas inside it) refers to
+def _referenced_names(code):
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names.extend(_referenced_names(const))
+    return names
+
+
+# Hash of a function's source, the module-level helper functions it calls and the
+# module constants it reads, so editing one generator only changes its own fingerprint
+def code_fingerprint(function):
+    digest = hashlib.sha256()
+    seen, stack = set(), [function]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        digest.update(inspect.getsource(current).encode())
+        for name in dict.fromkeys(_referenced_names(current.__code__)):
+            value = current.__globals__.get(name)
+            if inspect.isfunction(value) and value.__module__ == current.__module__:
+                stack.append(value)
+            elif isinstance(value, (bool, int, float, str, list, tuple, dict, set, frozenset)):
+                digest.update(f"{name}={_stable_repr(value)}".encode())
+    return digest.hexdigest()
+
+
+# Hash of the shared engine modules' source
+def engine_fingerprint(modules=ENGINE_MODULES):
+    digest = hashlib.sha256()
+    for module_name in modules:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{module_name}.py"), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Fingerprint of one table from its code fingerprints, parameters and upstream fingerprints
+def table_fingerprint(code, params, upstream):
+    key = json.dumps({'code': code, 'params': params, 'upstream': upstream}, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# Fingerprints and output sizes of the tables built into an output directory
+class BuildCache:
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, CACHE_FILE)
+        self.entries = {}
+        self.hits = []
+        self.misses = []
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+    # Whether a table's output at path was built from this fingerprint and is unchanged since
+    def is_fresh(self, filename, fingerprint, path, extra_paths=()):
+        entry = self.entries.get(filename)
+        fresh = (entry is not None and entry['fingerprint'] == fingerprint
+                 and os.path.exists(path) and dataset_io.data_size(path) == entry['size']
+                 and all(os.path.exists(extra) for extra in extra_paths))
+        (self.hits if fresh else self.misses).append(filename)
+        return fresh
+
+    def rows(self, filename):
+        return self.entries[filename]['rows']
+
+    def record(self, filename, fingerprint, path, rows):
+        self.entries[filename] = {'fingerprint': fingerprint, 'size': dataset_io.data_size(path), 'rows': rows}
+
+    # Drop a table whose output is about to be rewritten, so an interrupted build never trusts it
+    def invalidate(self, filename):
+        self.entries.pop(filename, None)
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,262 @@
+import argparse
+import importlib
+import os
+import time
+
+import faker
+import numpy as np
+
+import build_cache
+import dataset_io
+import generate_additional_quality_data
+import key_registry
+import parallel_generation
+import scale
+import seeding
+
+# Every module script the build runs
+MODULES = parallel_generation.MODULES + ['generate_interaction_data']
+
+# Tables that must be written before each table can start: masters before the
+# transactions that refer to them, transactions before the documents and reports
+# built on them. Foreign keys sampled through key_registry are added automatically.
+DEPENDENCIES = {
+    # Sales
+    'sales_orders': ['customer_master', 'sku_master'],
+    'dispatch_requests': ['sales_orders', 'logistics_master'],
+    'invoices': ['sales_orders'],
+    # Purchase
+    'purchase_orders': ['supplier_master', 'item_master'],
+    'grn': ['purchase_orders'],
+    'job_work_orders': ['supplier_master', 'item_master'],
+    'purchase_debit_notes': ['purchase_orders', 'grn'],
+    # Stores
+    'stock_items': ['stock_categories', 'inventory_zones'],
+    'goods_issue_notes': ['stock_items'],
+    'stock_transfers': ['stock_items'],
+    'stock_aging': ['stock_items'],
+    # Production
+    'batch_cards': ['raw_material_master', 'process_definitions'],
+    'work_orders': ['batch_cards'],
+    'job_cards': ['work_orders'],
+    'production_inventory': ['batch_cards'],
+    # Quality
+    'material_inspections': ['inspection_checklists', 'standard_specifications'],
+    'pdir_entries': ['inspection_checklists', 'standard_specifications'],
+    'batch_releases': ['batch_cards', 'material_inspections'],
+    'material_revalidation': ['material_inspections'],
+    # Logistics
+    'sales_dispatches': ['sales_orders', 'shipping_modes', 'transport_partners'],
+    'advance_shipment_notices': ['sales_dispatches'],
+    'dispatch_status_reports': ['sales_dispatches'],
+    'sales_register': ['sales_dispatches'],
+    # Finance
+    'payment_processing': ['ledger_accounts', 'payment_terms'],
+    'journal_entries': ['ledger_accounts'],
+    'gst_invoices': ['gst_configurations', 'tax_codes'],
+    'gst_returns': ['gst_invoices'],
+    'ledger_balance_reports': ['ledger_accounts', 'journal_entries'],
+    # HR
+    'payroll_details': ['employee_records'],
+    'user_access': ['employee_records', 'role_permissions'],
+    'payroll_processing': ['payroll_details'],
+    'leave_management': ['employee_records'],
+    'employee_attendance': ['employee_records', 'leave_management'],
+    'payroll_reports': ['payroll_processing'],
+    # GST
+    'e_invoices': ['gstin_records', 'hsn_codes', 'sac_codes'],
+    'e_way_bills': ['e_invoices'],
+    'credit_debit_notes': ['e_invoices'],
+    'rcm_transactions': ['gstin_records', 'hsn_codes', 'sac_codes'],
+    'gstr1': ['e_invoices', 'credit_debit_notes'],
+    'gstr3b': ['e_invoices', 'rcm_transactions'],
+    'gstr2a': ['gstin_records'],
+    'gst_reconciliation': ['gstr1', 'gstr3b', 'gstr2a'],
+    'gst_audit_reports': ['gst_reconciliation']
+}
+
+# Extra PDIR entries appended by generate_additional_quality_data.py (at scale factor 1)
+DEFAULT_ADDITIONAL_PDIR_ENTRIES = 150
+
+
+# Upstream tables of a table: declared dependencies plus foreign-key parents
+def upstream(table):
+    return sorted(set(DEPENDENCIES.get(table, ())) | set(key_registry.parents(table)))
+
+
+# Append the extra PDIR entries to a freshly written pdir_entries file,
+# seeded and clock-pinned like the rest of the run
+def append_additional_pdir_entries(path, count, seed, as_of):
+    module = generate_additional_quality_data
+    seeding.freeze_clock(as_of, [module])
+    seeding.seed_module(module, seeding.derive_seed(seed, 'additional_pdir_entries'))
+    started = time.perf_counter()
+    module.generate_pdir_entries(path, count)
+    return time.perf_counter() - started
+
+
+# Fingerprint of every table of the run: its generator code (per-record, batch and
+# the extra PDIR step where used), its parameters and its upstream tables' fingerprints
+def table_fingerprints(modules, sizes, seed, as_of, batch, shard_size, output_format, key_distribution,
+                       additional_pdir_entries, calendar=False, consistent_amounts=False):
+    engine = build_cache.engine_fingerprint()
+    code, params = {}, {}
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        batch_tables = getattr(module, 'BATCH_TABLES', {})
+        calendar_tables = getattr(module, 'CALENDAR_TABLES', {}) if calendar else {}
+        for filename, generator in module.TABLES.items():
+            table = key_registry.table_name(filename)
+            code[table] = [build_cache.code_fingerprint(generator)]
+            params[table] = {
+                'rows': sizes[filename], 'seed': seed, 'as_of': as_of, 'format': output_format,
+                'shard_size': None if filename in getattr(module, 'UNSHARDED_TABLES', ()) else shard_size,
+                'batch': batch and filename in batch_tables, 'key_distribution': key_distribution,
+                'consistent_amounts': consistent_amounts,
+                'engine': engine, 'faker': faker.VERSION, 'numpy': np.__version__
+            }
+            if batch and filename in batch_tables:
+                code[table].append(build_cache.code_fingerprint(batch_tables[filename]))
+            if filename in calendar_tables:
+                code[table] = [build_cache.code_fingerprint(calendar_tables[filename])]
+                params[table].update(rows=None, calendar=True)
+            if table == 'pdir_entries' and additional_pdir_entries:
+                code[table].append(build_cache.code_fingerprint(generate_additional_quality_data.generate_pdir_entries))
+                params[table]['additional_pdir_entries'] = additional_pdir_entries
+    fingerprints = {}
+
+    def fingerprint(table):
+        if table not in fingerprints:
+            parents = {parent: fingerprint(parent) for parent in upstream(table) if parent in code}
+            fingerprints[table] = build_cache.table_fingerprint(code[table], params[table], parents)
+        return fingerprints[table]
+
+    for table in code:
+        fingerprint(table)
+    return fingerprints
+
+
+# Longest chain of dependent tables, timing each table by its longest shard:
+# the floor for a full rebuild given enough workers
+def critical_path(stats):
+    finish, previous = {}, {}
+
+    def visit(table):
+        if table not in finish:
+            before = [parent for parent in upstream(table) if parent in stats]
+            previous[table] = max(before, key=visit, default=None)
+            finish[table] = (finish[previous[table]] if previous[table] else 0) + stats[table]['longest_shard']
+        return finish[table]
+
+    last = max(stats, key=visit)
+    path = [last]
+    while previous[path[-1]]:
+        path.append(previous[path[-1]])
+    return path[::-1], finish[last]
+
+
+# Per-table report, in completion order
+# (wall s runs from submission to written and includes waiting for a worker;
+# rows/s is over the time spent generating)
+def print_report(stats, total):
+    print(f"{'table':<28} {'rows':>10} {'shards':>6} {'start s':>8} {'wall s':>8} {'gen s':>8} {'rows/s':>12}")
+    for table, table_stats in sorted(stats.items(), key=lambda item: item[1]['end']):
+        if table_stats.get('cached'):
+            print(f"{table:<28} {table_stats['rows']:>10} {'cached':>6}")
+            continue
+        rate = table_stats['rows'] / table_stats['seconds'] if table_stats['seconds'] else 0
+        print(f"{table:<28} {table_stats['rows']:>10} {table_stats['shards']:>6} {table_stats['start']:>8.2f} "
+              f"{table_stats['wall']:>8.2f} {table_stats['seconds']:>8.2f} {rate:>12,.0f}")
+    path, length = critical_path(stats)
+    rows = sum(table_stats['rows'] for table_stats in stats.values() if not table_stats.get('cached'))
+    print(f"Critical path ({length:.2f}s): {' -> '.join(path)}")
+    print(f"Sum of generation times: {sum(s['seconds'] for s in stats.values()):.2f}s")
+    print(f"Total: {rows} rows generated in {total:.2f}s ({rows / total:,.0f} rows/s)")
+
+
+# Build every table of the given modules, running independent tables concurrently
+# and each table as soon as its upstream tables are written. Table sizes follow
+# scale_factor (see scale.py). With use_cache, tables whose fingerprint matches
+# the last build into output_dir (see build_cache.py) are not regenerated. With
+# calendar, employee_attendance is built from employee_records and leave_management.
+def build(modules=MODULES, seed=0, workers=None, shard_size=parallel_generation.DEFAULT_SHARD_SIZE,
+          as_of=None, batch=False, output_dir='data', output_format='json', key_distribution='uniform',
+          additional_pdir_entries=DEFAULT_ADDITIONAL_PDIR_ENTRIES, verbose=True, scale_factor=1, use_cache=True,
+          calendar=False, consistent_amounts=False):
+    as_of = as_of or seeding.default_as_of()
+    sizes = scale.table_sizes(scale_factor, modules)
+    additional_pdir_entries = round(additional_pdir_entries * scale_factor)
+    fingerprints = table_fingerprints(modules, sizes, seed, as_of, batch, shard_size, output_format,
+                                      key_distribution, additional_pdir_entries, calendar, consistent_amounts)
+    cache = build_cache.BuildCache(output_dir)
+    cached = {}
+    for filename in sizes:
+        table = key_registry.table_name(filename)
+        path = dataset_io.output_path(output_dir, filename, output_format)
+        key_files = [os.path.join(output_dir, '.keys', f"{table}.npy")] if table in key_registry.PARENT_TABLES else []
+        if use_cache and cache.is_fresh(filename, fingerprints[table], path, key_files):
+            cached[filename] = cache.rows(filename)
+        else:
+            cache.invalidate(filename)
+    if cache.entries or cached:
+        cache.save()
+    stats = {}
+
+    def table_done(filename, table_stats):
+        table = key_registry.table_name(filename)
+        if table_stats.get('cached'):
+            stats[table] = table_stats
+            return
+        if table == 'pdir_entries' and additional_pdir_entries:
+            path = dataset_io.output_path(output_dir, filename, output_format)
+            elapsed = append_additional_pdir_entries(path, additional_pdir_entries, seed, as_of)
+            table_stats['rows'] += additional_pdir_entries
+            table_stats['seconds'] += elapsed
+            table_stats['longest_shard'] += elapsed
+            table_stats['wall'] += elapsed
+            table_stats['end'] += elapsed
+        stats[table] = table_stats
+        cache.record(filename, fingerprints[table], dataset_io.output_path(output_dir, filename, output_format),
+                     table_stats['rows'])
+        cache.save()
+        if verbose:
+            print(f"Wrote {filename} ({table_stats['rows']} records in {table_stats['wall']:.2f}s)")
+
+    started = time.perf_counter()
+    parallel_generation.generate_parallel(modules, seed, workers, shard_size, as_of, batch, output_dir,
+                                          output_format, key_distribution, DEPENDENCIES, table_done, sizes, cached,
+                                          calendar, consistent_amounts)
+    total = time.perf_counter() - started
+    if verbose and stats:
+        print_report(stats, total)
+        print(f"Build cache: {len(cache.hits)} hits, {len(cache.misses)} misses")
+    return as_of, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the whole dataset in dependency order, running independent tables in parallel")
+    parser.add_argument('modules', nargs='*', default=MODULES, help="Module scripts to run (default: all)")
+    parser.add_argument('--seed', type=int, default=0, help="Global seed; the same seed gives byte-identical files")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--shard-size', type=int, default=parallel_generation.DEFAULT_SHARD_SIZE, help="Rows per shard")
+    parser.add_argument('--as-of', default=None, help="Reference 'now' for relative dates (default: today 00:00)")
+    parser.add_argument('--batch', action='store_true', help="Use NumPy column generators where available")
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    parser.add_argument('--additional-pdir-entries', type=int, default=DEFAULT_ADDITIONAL_PDIR_ENTRIES,
+                        help="PDIR entries appended after pdir_entries is written, at scale factor 1 (0 to skip)")
+    parser.add_argument('--scale-factor', type=scale.parse_scale_factor, default=1,
+                        help=f"Size of every table relative to the defaults, or a preset ({', '.join(scale.PRESETS)})")
+    parser.add_argument('--calendar', action='store_true',
+                        help="Build employee_attendance as an employee x working-day grid honouring approved leave")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    parser.add_argument('--no-cache', action='store_true', help="Regenerate every table even if its fingerprint is unchanged")
+    args = parser.parse_args()
+    as_of, _ = build(args.modules, args.seed, args.workers, args.shard_size, args.as_of, args.batch,
+                     args.output_dir, args.format, args.key_distribution, args.additional_pdir_entries,
+                     scale_factor=args.scale_factor, use_cache=not args.no_cache, calendar=args.calendar,
+                     consistent_amounts=args.consistent_amounts)
+    print(f"All datasets have been generated in '{args.output_dir}' (seed={args.seed}, scale factor={args.scale_factor:g}, as-of={as_of})")
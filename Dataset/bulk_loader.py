@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dataset_io
+import index_plan
+import key_registry
+import seed_manifest
+
+# Documents per insert_many request
+DEFAULT_BATCH_SIZE = 1000
+
+# Threads sending insert batches, shared by every collection being loaded
+DEFAULT_WORKERS = 8
+
+# Files read (and collections loaded) at the same time
+DEFAULT_FILE_WORKERS = 4
+
+# Batches read but not yet acknowledged by the server, across all collections; with the
+# streaming reader this bounds client memory to about max_in_flight * batch_size documents
+# whatever the file sizes
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+# Inserted (or upserted) document count of a failed unordered bulk write: pymongo's
+# BulkWriteError (and sinks.MemoryBulkWriteError) report what got through before the
+# errors in their details
+def _written_on_error(error):
+    details = getattr(error, 'details', None) or {}
+    return details.get('nInserted', 0) + details.get('nUpserted', 0) + details.get('nModified', 0)
+
+
+# Loads data files into collections of a sink (see sinks.py: MongoDB, SQLite, files or
+# an in-process stand-in). Several files are read at once and each is split into batches
+# sent as unordered bulk inserts from a shared thread pool, so one large or slow
+# collection does not hold up the others. A reader waits for a free slot before queueing
+# another batch, so at most max_in_flight batches are held in memory.
+#
+# With a seed_manifest.SeedManifest (on a sink that supports upserts), loads are
+# idempotent: files whose checksum matches their last complete load are skipped, and a
+# changed file only upserts (by the table's natural key, key_registry.PRIMARY_KEYS) the
+# records whose digest changed and deletes the ones it no longer has. A collection that
+# already holds documents the manifest does not account for (an interrupted or
+# pre-manifest seed) is upserted in full.
+class BulkLoader:
+    def __init__(self, sink, workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, file_workers=DEFAULT_FILE_WORKERS, manifest=None):
+        self.sink = sink
+        self.workers = workers
+        self.batch_size = batch_size
+        self.file_workers = file_workers
+        self.manifest = manifest
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._inserts = None
+
+    def _write(self, send):
+        try:
+            return send(), None
+        except Exception as e:
+            return _written_on_error(e), e
+        finally:
+            self._slots.release()
+
+    def _delete(self, collection_name, key_field, keys):
+        self.sink.delete_keys(collection_name, key_field, keys)
+        return 0
+
+    def _submit(self, futures, send, *args):
+        self._slots.acquire()
+        futures.append(self._inserts.submit(self._write, lambda: send(*args)))
+
+    # Load one file into a collection, streaming its records (dataset_io.iter_records) so
+    # memory does not grow with the file. Without digests every record is inserted. With
+    # digests (a seed_manifest.DigestStore) the digest of each record is recorded by its
+    # key_field a batch at a time; with upsert as well, only records whose digest differs
+    # from the store's last complete load are upserted by key_field, and keys of that load
+    # missing from the file are deleted. Returns its stats: rows read, documents written,
+    # batches sent, seconds from first read to last acknowledgement, batch errors and, if
+    # the file could not be read to the end, the read 'error' (batches read before it are
+    # still written).
+    def load_file(self, path, collection_name, key_field=None, digests=None, upsert=False):
+        started = time.perf_counter()
+        futures, rows, removed, read_error = [], 0, 0, None
+
+        def changed(records):
+            nonlocal rows
+            for chunk in dataset_io.iter_chunks(records, self.batch_size):
+                rows += len(chunk)
+                if digests is None:
+                    yield from chunk
+                    continue
+                # Digest before insert_many adds an _id to the record
+                chunk_digests = [(record[key_field], seed_manifest.record_digest(record)) for record in chunk]
+                digests.add(chunk_digests)
+                previous = digests.previous([key for key, _ in chunk_digests]) if upsert else {}
+                for record, (key, digest) in zip(chunk, chunk_digests):
+                    if previous.get(key) != digest:
+                        yield record
+
+        try:
+            for batch in dataset_io.iter_chunks(changed(dataset_io.iter_records(path)), self.batch_size):
+                if upsert:
+                    self._submit(futures, self.sink.upsert_many, collection_name, key_field, batch)
+                else:
+                    self._submit(futures, self.sink.insert_many, collection_name, batch)
+            if upsert:
+                for keys in digests.removed(self.batch_size):
+                    removed += len(keys)
+                    self._submit(futures, self._delete, collection_name, key_field, keys)
+        except Exception as e:
+            read_error = e
+        written, errors = 0, []
+        for future in futures:
+            count, error = future.result()
+            written += count
+            if error is not None:
+                errors.append(error)
+        stats = {'rows': rows, 'inserted': written, 'batches': len(futures),
+                 'seconds': time.perf_counter() - started, 'errors': errors}
+        if upsert:
+            stats['removed'] = removed if read_error is None else 0
+        if read_error is not None:
+            stats['error'] = read_error
+        return stats
+
+    # Load a file through the manifest: skip it if unchanged, else diff it against the
+    # digests of its last complete load and record the result once it has no errors.
+    # The collection's document count is checked against the manifest, so a target that
+    # was dropped or edited since is reloaded (in full) rather than trusted. Before
+    # upserting, the unique natural-key index the index plan builds anyway is created,
+    # so each upsert finds its document by index instead of scanning the collection; if
+    # it cannot be built (the collection already has duplicate keys) the error is kept
+    # in the stats as 'index_error' and the upserts go ahead without it.
+    def _load_with_manifest(self, path, filename, collection_name):
+        checksum = seed_manifest.file_checksum(path)
+        count = self.sink.count(collection_name)
+        if self.manifest.is_unchanged(filename, checksum) and count == self.manifest.rows(filename):
+            return {'rows': count, 'inserted': 0, 'batches': 0, 'seconds': 0.0, 'errors': [], 'skipped': True}
+        key_field = key_registry.PRIMARY_KEYS[collection_name]
+        digests = self.manifest.digest_store(collection_name)
+        try:
+            if not self.manifest.is_complete(filename) or count != len(digests):
+                # Diffing against an empty store upserts every record and deletes nothing
+                digests.clear()
+            index_error = None
+            if count:
+                keys = index_plan.index_keys(key_field)
+                try:
+                    self.sink.create_index(collection_name, keys, index_plan.index_name(keys), unique=True)
+                except Exception as e:
+                    index_error = e
+            self.manifest.start(filename, checksum)
+            stats = self.load_file(path, collection_name, key_field, digests, upsert=bool(count))
+            if index_error is not None:
+                stats['index_error'] = index_error
+            if not stats['errors'] and 'error' not in stats:
+                self.manifest.complete(filename, stats['rows'], digests)
+        finally:
+            digests.close()
+        return stats
+
+    # Load every file of data_folder (or the given file names) into the collection named
+    # after its table. on_file_done(filename, stats) is called as each file finishes.
+    # Returns {collection: stats}.
+    def load(self, data_folder, filenames=None, on_file_done=None):
+        filenames = dataset_io.data_files(data_folder) if filenames is None else filenames
+        results = {}
+        report_lock = threading.Lock()
+
+        def load_one(filename):
+            collection_name = key_registry.table_name(filename)
+            path = os.path.join(data_folder, filename)
+            if self.manifest is not None and collection_name in key_registry.PRIMARY_KEYS:
+                stats = self._load_with_manifest(path, filename, collection_name)
+            else:
+                stats = self.load_file(path, collection_name)
+            results[collection_name] = stats
+            if on_file_done is not None:
+                with report_lock:
+                    on_file_done(filename, stats)
+
+        with ThreadPoolExecutor(self.workers) as inserts:
+            self._inserts = inserts
+            with ThreadPoolExecutor(self.file_workers) as files:
+                list(files.map(load_one, filenames))
+        self._inserts = None
+        return results
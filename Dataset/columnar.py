@@ -0,0 +1,402 @@
+import argparse
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+
+# Rows buffered before each chunk of column data is written
+DEFAULT_CHUNK_SIZE = 10000
+
+MANIFEST = 'manifest.json'
+
+# String columns whose first chunk has at most this share of distinct values are dictionary-encoded
+DICTIONARY_RATIO = 0.5
+
+# On-disk dtype of each fixed-width column type
+DTYPES = {
+    'float64': '<f8',
+    'int64': '<i8',
+    'bool': 'u1',
+    'timestamp': '<i8',   # epoch seconds or microseconds, see the column's unit
+    'date': '<i8',        # epoch days
+    'dictionary': '<i4'   # index into the column's dictionary, -1 for null
+}
+
+_DATETIME = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?')
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_NAT = np.iinfo(np.int64).min
+
+
+# Column spec (type and, for nested values, child specs) inferred from a chunk of values
+def infer_spec(values):
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    if not present:
+        return {'type': 'json'}
+    if kinds == {bool}:
+        return {'type': 'bool'}
+    if kinds == {int}:
+        return {'type': 'int64'}
+    if kinds <= {int, float}:
+        return {'type': 'float64'}
+    if kinds == {str}:
+        if all(_DATETIME.fullmatch(value) for value in present):
+            return {'type': 'timestamp', 'unit': 'us' if any('.' in value for value in present) else 's'}
+        if all(_DATE.fullmatch(value) for value in present):
+            return {'type': 'date', 'unit': 'D'}
+        if len(set(present)) <= DICTIONARY_RATIO * len(present):
+            return {'type': 'dictionary'}
+        return {'type': 'string'}
+    if kinds == {list}:
+        return {'type': 'list', 'item': infer_spec([item for value in present for item in value])}
+    if kinds == {dict}:
+        fields = list(dict.fromkeys(field for value in present for field in value))
+        return {'type': 'struct', 'fields': {
+            field: infer_spec([value.get(field) if value is not None else None for value in values])
+            for field in fields
+        }}
+    return {'type': 'json'}
+
+
+# Name of a child column: struct fields are "parent.field", list items "parent[]"
+def child_name(name, field=None):
+    if field is None:
+        return f"{name}[]"
+    return field if name is None else f"{name}.{field}"
+
+
+# Writes one column (and its children) chunk by chunk to files named after the column:
+# .bin for values, .offsets for strings and lists, .valid once a null is seen, .dict.json for dictionaries
+class _ColumnWriter:
+    def __init__(self, directory, name, spec, append=False):
+        self.directory = directory
+        self.name = name
+        self.spec = spec
+        self.type = spec['type']
+        self.rows = spec.get('rows', 0) if append else 0
+        self._files = {}
+        self._valid = None
+        self._lookup = {}
+        self._end = 0
+        if self.type == 'struct':
+            self.children = {field: _ColumnWriter(directory, child_name(name, field), child, append)
+                             for field, child in spec['fields'].items()}
+        elif self.type == 'list':
+            self.child = _ColumnWriter(directory, child_name(name), spec['item'], append)
+        if name is None:
+            return
+        if append:
+            self._reopen()
+        elif self.type in ('string', 'json', 'list'):
+            self._file('.offsets').write(np.zeros(1, dtype='<i8').tobytes())
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, self.name + suffix)
+
+    def _file(self, suffix):
+        if suffix not in self._files:
+            self._files[suffix] = open(self._path(suffix), 'ab')
+        return self._files[suffix]
+
+    # Continue an existing column, cutting off anything written after the last manifest
+    def _reopen(self):
+        def truncate(suffix, size):
+            if os.path.exists(self._path(suffix)):
+                with open(self._path(suffix), 'r+b') as f:
+                    f.truncate(size)
+
+        if self.spec.get('nulls'):
+            truncate('.valid', self.rows)
+            self._valid = self._file('.valid')
+        if self.type in DTYPES:
+            truncate('.bin', self.rows * np.dtype(DTYPES[self.type]).itemsize)
+        if self.type in ('string', 'json', 'list'):
+            truncate('.offsets', (self.rows + 1) * 8)
+            with open(self._path('.offsets'), 'rb') as f:
+                f.seek(self.rows * 8)
+                self._end = int(np.frombuffer(f.read(8), dtype='<i8')[0])
+        if self.type in ('string', 'json'):
+            truncate('.bin', self._end)
+        if self.type == 'dictionary':
+            with open(self._path('.dict.json'), encoding='utf-8') as f:
+                self._lookup = {value: code for code, value in enumerate(json.load(f))}
+
+    def _write_validity(self, values):
+        valid = [value is not None for value in values]
+        if self._valid is None and all(valid):
+            return
+        if self._valid is None:
+            self._valid = self._file('.valid')
+            self._valid.write(b'\x01' * self.rows)
+        self._valid.write(np.array(valid, dtype=np.uint8).tobytes())
+
+    def _write_offsets(self, lengths):
+        offsets = np.cumsum(np.asarray(lengths, dtype='<i8')) + self._end
+        self._file('.offsets').write(offsets.astype('<i8').tobytes())
+        if len(offsets):
+            self._end = int(offsets[-1])
+
+    # Rewrite the values written so far with a wider type, e.g. int64 -> float64
+    def _promote(self, convert, **spec):
+        if '.bin' in self._files:
+            self._files.pop('.bin').close()
+        old = np.fromfile(self._path('.bin'), dtype='<i8') if os.path.exists(self._path('.bin')) else np.zeros(0, '<i8')
+        convert(old).tofile(self._path('.bin'))
+        self.spec.update(spec)
+        self.type = self.spec['type']
+
+    def write(self, values):
+        if self.name is not None:
+            self._write_validity(values)
+        try:
+            self._write_values(values)
+        except (TypeError, ValueError, OverflowError) as exc:
+            raise ValueError(f"Column {self.name!r} ({self.type}): {exc}") from exc
+        self.rows += len(values)
+
+    def _write_values(self, values):
+        if self.type == 'int64' and any(type(value) is float for value in values):
+            self._promote(lambda old: old.astype('<f8'), type='float64')
+        if self.type == 'timestamp' and self.spec['unit'] == 's' and any(value and '.' in value for value in values):
+            self._promote(lambda old: np.where(old == _NAT, _NAT, old * 1000000), unit='us')
+
+        if self.type in ('float64', 'int64', 'bool'):
+            fill = np.nan if self.type == 'float64' else 0
+            data = np.array([fill if value is None else value for value in values], dtype=DTYPES[self.type])
+        elif self.type in ('timestamp', 'date'):
+            data = np.array(['NaT' if value is None else value for value in values],
+                            dtype=f"datetime64[{self.spec['unit']}]").astype('<i8')
+        elif self.type == 'dictionary':
+            codes = []
+            for value in values:
+                if value is not None and not isinstance(value, str):
+                    raise TypeError(f"expected a string, got {value!r}")
+                codes.append(-1 if value is None else self._lookup.setdefault(value, len(self._lookup)))
+            data = np.array(codes, dtype=DTYPES['dictionary'])
+        elif self.type in ('string', 'json'):
+            if self.type == 'string' and any(value is not None and not isinstance(value, str) for value in values):
+                raise TypeError("expected strings")
+            if self.type == 'json':
+                values = [None if value is None else json.dumps(value, separators=(',', ':')) for value in values]
+            encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+            self._write_offsets([len(value) for value in encoded])
+            data = b''.join(encoded)
+        elif self.type == 'list':
+            items = [value or [] for value in values]
+            self._write_offsets([len(value) for value in items])
+            self.child.write([item for value in items for item in value])
+            return
+        else:
+            rows = [value or {} for value in values]
+            unknown = {field for row in rows for field in row} - set(self.children)
+            if unknown:
+                raise ValueError(f"unexpected fields {sorted(unknown)}")
+            for field, child in self.children.items():
+                child.write([row.get(field) for row in rows])
+            return
+        self._file('.bin').write(data if isinstance(data, bytes) else data.tobytes())
+
+    # Close the column's files and return its spec for the manifest
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        spec = {key: value for key, value in self.spec.items() if key not in ('fields', 'item', 'rows', 'nulls')}
+        spec['rows'] = self.rows
+        if self._valid is not None:
+            spec['nulls'] = True
+        if self.type == 'dictionary':
+            with open(self._path('.dict.json'), 'w', encoding='utf-8') as f:
+                json.dump(list(self._lookup), f, ensure_ascii=False)
+            spec['dictionary_size'] = len(self._lookup)
+        if self.type == 'struct':
+            spec['fields'] = {field: child.close() for field, child in self.children.items()}
+        elif self.type == 'list':
+            spec['item'] = self.child.close()
+        return spec
+
+
+# Streams records into a directory of typed column files plus manifest.json.
+# Column types are inferred from the first chunk. With append=True rows are
+# added to an existing table.
+class ColumnarWriter:
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, append=False):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._buffer = []
+        self._root = None
+        manifest_path = os.path.join(path, MANIFEST)
+        if append and os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            root = {'type': 'struct', 'fields': manifest['columns'], 'rows': manifest['rows']}
+            self._root = _ColumnWriter(path, None, root, append=True)
+        else:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.makedirs(path)
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._root is None:
+            self._root = _ColumnWriter(self.path, None, infer_spec(self._buffer))
+        self._root.write(self._buffer)
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        spec = self._root.close() if self._root is not None else {'rows': 0, 'fields': {}}
+        manifest = {'format': 'columnar', 'version': 1, 'rows': spec['rows'], 'columns': spec['fields']}
+        tmp_path = os.path.join(self.path, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Format epoch values of a timestamp/date column the way datetime.isoformat() does
+def _isoformat(data, unit):
+    strings = np.datetime_as_string(data.view(f'datetime64[{unit}]'), unit=unit).tolist()
+    if unit == 'us':
+        strings = [value[:-7] if value.endswith('.000000') else value for value in strings]
+    return strings
+
+
+# Reads a columnar table. Each column is memory-mapped on its own, so a scan over
+# one field only touches that field's files.
+class ColumnarTable:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.rows = self.manifest['rows']
+        self.specs = {}
+        self._dictionaries = {}
+        self._collect_specs(None, {'type': 'struct', 'fields': self.manifest['columns']})
+
+    def _collect_specs(self, name, spec):
+        if name is not None:
+            self.specs[name] = spec
+        if spec['type'] == 'struct':
+            for field, child in spec['fields'].items():
+                self._collect_specs(child_name(name, field), child)
+        elif spec['type'] == 'list':
+            self._collect_specs(child_name(name), spec['item'])
+
+    def __len__(self):
+        return self.rows
+
+    # Top-level column names in record order
+    @property
+    def columns(self):
+        return list(self.manifest['columns'])
+
+    def _map(self, name, suffix, dtype, count):
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name + suffix), dtype=dtype, mode='r', shape=(count,))
+
+    # Memory-mapped data of one column: numbers as float64/int64, booleans, timestamps
+    # and dates as datetime64, dictionary codes as int32, the UTF-8 bytes of string
+    # columns and the offsets of list columns. e.g. column('total_amount').sum()
+    def column(self, name):
+        spec = self.specs[name]
+        kind = spec['type']
+        if kind in DTYPES:
+            data = self._map(name, '.bin', DTYPES[kind], spec['rows'])
+            if kind in ('timestamp', 'date'):
+                return data.view(f"datetime64[{spec['unit']}]")
+            return data.view(np.bool_) if kind == 'bool' else data
+        if kind == 'list':
+            return self.offsets(name)
+        if kind in ('string', 'json'):
+            return self._map(name, '.bin', np.uint8, int(self.offsets(name)[-1]))
+        raise ValueError(f"{name} is a struct column; read its fields, e.g. {name}.<field>")
+
+    # rows + 1 offsets of a string or list column; row i spans offsets[i]:offsets[i + 1]
+    def offsets(self, name):
+        return self._map(name, '.offsets', '<i8', self.specs[name]['rows'] + 1)
+
+    # Boolean mask of non-null rows, or None if the column has no nulls
+    def valid(self, name):
+        spec = self.specs[name]
+        if not spec.get('nulls'):
+            return None
+        return self._map(name, '.valid', np.uint8, spec['rows']).view(np.bool_)
+
+    # Dictionary of a dictionary-encoded column
+    def dictionary(self, name):
+        if name not in self._dictionaries:
+            with open(os.path.join(self.path, name + '.dict.json'), encoding='utf-8') as f:
+                self._dictionaries[name] = np.array(json.load(f) + [None], dtype=object)
+        return self._dictionaries[name]
+
+    # Decoded values of rows start:stop of a column as a list (nested values rebuilt)
+    def values(self, name, start=0, stop=None):
+        spec = self.specs[name]
+        kind = spec['type']
+        stop = spec['rows'] if stop is None else stop
+        if kind == 'struct':
+            fields = {field: self.values(child_name(name, field), start, stop) for field in spec['fields']}
+            values = [dict(zip(fields, row)) for row in zip(*fields.values())] if fields else [{}] * (stop - start)
+        elif kind == 'list':
+            offsets = self.offsets(name)[start:stop + 1].tolist()
+            items = self.values(child_name(name), offsets[0], offsets[-1])
+            values = [items[offsets[i] - offsets[0]:offsets[i + 1] - offsets[0]] for i in range(stop - start)]
+        elif kind in ('string', 'json'):
+            offsets = self.offsets(name)[start:stop + 1]
+            data = self._map(name, '.bin', np.uint8, int(self.offsets(name)[-1]))[offsets[0]:offsets[-1]].tobytes()
+            offsets = (offsets - offsets[0]).tolist()
+            values = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(stop - start)]
+            if kind == 'json':
+                values = [json.loads(value) if value else None for value in values]
+        elif kind == 'dictionary':
+            values = self.dictionary(name)[self.column(name)[start:stop]].tolist()
+        elif kind in ('timestamp', 'date'):
+            values = _isoformat(np.asarray(self._map(name, '.bin', '<i8', spec['rows'])[start:stop]), spec['unit'])
+        else:
+            values = self.column(name)[start:stop].tolist()
+        valid = self.valid(name)
+        if valid is not None:
+            values = [value if ok else None for value, ok in zip(values, valid[start:stop].tolist())]
+        return values
+
+    # Rebuild the records chunk by chunk
+    def iter_records(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        for start in range(0, self.rows, chunk_size):
+            stop = min(start + chunk_size, self.rows)
+            columns = {name: self.values(name, start, stop) for name in self.columns}
+            for row in zip(*columns.values()):
+                yield dict(zip(columns, row))
+
+    def to_records(self):
+        return list(self.iter_records())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the columns of a columnar table")
+    parser.add_argument('path', help="Table directory, e.g. data/invoices.columns")
+    args = parser.parse_args()
+    table = ColumnarTable(args.path)
+    print(f"{args.path}: {len(table)} rows")
+    for name, spec in table.specs.items():
+        details = ', '.join(f"{key}={value}" for key, value in spec.items() if key not in ('type', 'fields', 'item'))
+        print(f"  {name:<40} {spec['type']:<11} {details}")
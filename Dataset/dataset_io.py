@@ -0,0 +1,379 @@
+import gzip
+import io
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import columnar
+import normalized
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for the .zst formats
+    zstandard = None
+
+# Output formats and the file extension each one uses
+FORMATS = {
+    'json': '.json',          # compact JSON array, one record per line
+    'ndjson': '.ndjson',      # newline-delimited JSON, one record per line
+    'columnar': '.columns',   # directory of typed column files, see columnar.py
+    'normalized': '.normalized',  # columnar parent table plus flat child table of its nested list, see normalized.py
+    'json.gz': '.json.gz',    # JSON array / NDJSON streamed through gzip (gzip -d reads them)
+    'ndjson.gz': '.ndjson.gz',
+    'json.zst': '.json.zst',  # the same through zstd (needs the zstandard package)
+    'ndjson.zst': '.ndjson.zst'
+}
+
+# Compression of each compressed format suffix and its level
+COMPRESSIONS = {'gz': 'gzip', 'zst': 'zstd'}
+COMPRESSION_LEVELS = {'gzip': 6, 'zstd': 3}
+
+# Uncompressed bytes per independently compressed block, and threads compressing blocks
+COMPRESSION_BLOCK_SIZE = 1 << 20
+COMPRESSION_THREADS = os.cpu_count() or 1
+
+# Records serialized before each write to disk
+DEFAULT_CHUNK_SIZE = 10000
+
+
+# Path of a table's output file for the given format, e.g. data/job_cards.ndjson
+def output_path(output_dir, filename, fmt='json'):
+    return os.path.join(output_dir, os.path.splitext(filename)[0] + FORMATS[fmt])
+
+
+# Output format of a data file, from its extension (the longest one that matches,
+# so data/grn.json.gz is 'json.gz')
+def format_of(path):
+    path = os.path.normpath(path)
+    for fmt, fmt_extension in sorted(FORMATS.items(), key=lambda item: -len(item[1])):
+        if path.endswith(fmt_extension):
+            return fmt
+    raise ValueError(f"Unknown data file extension {os.path.splitext(path)[1]!r} in {path}")
+
+
+# Names of the data files (and columnar/normalized table directories) in a directory,
+# in any format, skipping hidden build state such as .keys/ and .build_cache.json
+def data_files(directory):
+    names = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith('.'):
+            continue
+        try:
+            format_of(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return names
+
+
+# Base format and compression of an output format, e.g. 'ndjson.gz' -> ('ndjson', 'gzip')
+def split_format(fmt):
+    base, _, suffix = fmt.partition('.')
+    return base, COMPRESSIONS.get(suffix)
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("The .zst formats need the zstandard package: pip install zstandard")
+
+
+# Compress one block as a complete gzip member or zstd frame. Concatenated members
+# (frames) form a valid file, so blocks can be compressed independently and in parallel.
+def compress_block(data, compression):
+    if compression == 'gzip':
+        return gzip.compress(data, COMPRESSION_LEVELS['gzip'], mtime=0)
+    _require_zstandard()
+    return zstandard.ZstdCompressor(level=COMPRESSION_LEVELS['zstd']).compress(data)
+
+
+# Open a JSON or NDJSON data file for reading as text, decompressing it if compressed
+def open_text(path):
+    compression = split_format(format_of(path))[1]
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+# Load every record of a JSON array, NDJSON file (either possibly compressed), columnar or normalized table
+def read_records(path):
+    if format_of(path) == 'columnar':
+        return columnar.ColumnarTable(path).to_records()
+    if format_of(path) == 'normalized':
+        return normalized.NormalizedTable(path).to_records()
+    with open_text(path) as f:
+        if split_format(format_of(path))[0] == 'json':
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Characters read at a time by the streaming JSON array reader
+JSON_READ_BLOCK_SIZE = 1 << 20
+
+_json_decoder = json.JSONDecoder()
+_json_whitespace = re.compile(r'[ \t\r\n]*')
+
+
+# Elements of the top-level JSON array in text file f, decoded one at a time from a
+# buffer of about block_size characters, so memory is bounded by the largest element
+# rather than the file. A file holding a single JSON value other than an array yields it.
+def iter_json_array(f, block_size=JSON_READ_BLOCK_SIZE):
+    buffer, pos, eof = '', 0, False
+
+    # Skip whitespace, reading more as needed; returns the next character ('' at the end)
+    def peek():
+        nonlocal buffer, pos, eof
+        while True:
+            pos = _json_whitespace.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            buffer, pos = f.read(block_size), 0
+            eof = not buffer
+
+    first = peek()
+    if not first:
+        return
+    if first != '[':
+        yield json.loads(buffer[pos:] + f.read())
+        return
+    pos += 1
+    if peek() == ']':
+        return
+    while True:
+        peek()
+        # Decode the next element; until the buffer also holds the delimiter after it (so it
+        # is not cut off, e.g. a number), read more, at least doubling what is buffered
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(buffer, pos)
+                after = _json_whitespace.match(buffer, end).end()
+                if (after < len(buffer) and buffer[after] in ',]') or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more = f.read(max(block_size, len(buffer) - pos))
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+        yield value
+        pos = end
+        separator = peek()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+        pos += 1
+        # Drop consumed text once more than a block of it has built up
+        if pos > block_size:
+            buffer, pos = buffer[pos:], 0
+
+
+# Stream the records of a data file one at a time in any format read_records takes, so
+# memory stays flat however large the file is: JSON arrays through iter_json_array,
+# NDJSON line by line and columnar or normalized tables chunk by chunk
+def iter_records(path, block_size=JSON_READ_BLOCK_SIZE):
+    if format_of(path) == 'columnar':
+        yield from columnar.ColumnarTable(path).iter_records()
+        return
+    if format_of(path) == 'normalized':
+        yield from normalized.NormalizedTable(path).iter_records()
+        return
+    with open_text(path) as f:
+        if split_format(format_of(path))[0] == 'json':
+            yield from iter_json_array(f, block_size)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Group a stream of records (e.g. from a module's ITER_TABLES generator) into lists of
+# up to chunk_size, for consumers that work a chunk at a time
+def iter_chunks(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Last non-whitespace byte of a file before end, as (position, byte), reading backwards in blocks
+def _last_non_space(f, end, block_size=4096):
+    while end > 0:
+        start = max(0, end - block_size)
+        f.seek(start)
+        block = f.read(end - start).rstrip()
+        if block:
+            return start + len(block) - 1, block[-1:]
+        end = start
+    return -1, b''
+
+
+# Position of the closing bracket of a JSON array file and whether the array has elements
+def _json_array_tail(path):
+    with open(path, 'rb') as f:
+        close, byte = _last_non_space(f, os.path.getsize(path))
+        if byte != b']':
+            raise ValueError(f"{path} does not end with a JSON array")
+        _, before = _last_non_space(f, close)
+    return close, before != b'['
+
+
+# Binary file that text is streamed into compressed. Text is cut into blocks of about
+# block_size bytes; each block is compressed on a thread pool (zlib and zstd release the
+# GIL, so blocks compress in parallel while the caller keeps generating) and the
+# compressed blocks are written in order. At most two blocks per thread are in flight.
+class CompressedFile:
+    def __init__(self, path, compression, mode='wb', block_size=COMPRESSION_BLOCK_SIZE, threads=COMPRESSION_THREADS):
+        if compression == 'zstd':
+            _require_zstandard()
+        self.compression = compression
+        self.block_size = block_size
+        self._file = open(path, mode)
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+        self._in_flight = deque()
+        self._max_in_flight = 2 * threads
+        self._pending = []
+        self._pending_size = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self.block_size:
+            self.end_block()
+
+    # Compress what was written since the last block as a block of its own
+    def end_block(self):
+        if not self._pending:
+            return
+        self._in_flight.append(self._pool.submit(compress_block, b''.join(self._pending), self.compression))
+        self._pending, self._pending_size = [], 0
+        while len(self._in_flight) > self._max_in_flight:
+            self._file.write(self._in_flight.popleft().result())
+
+    def close(self):
+        self.end_block()
+        while self._in_flight:
+            self._file.write(self._in_flight.popleft().result())
+        self._pool.shutdown()
+        self._file.close()
+
+
+# Closing bracket of a JSON array with and without elements
+JSON_TAIL = '\n]\n'
+EMPTY_JSON_TAIL = ']\n'
+
+
+# Closing bracket of a compressed JSON array: written as the file's last block, so an
+# append can cut exactly that block off. Returns (offset, array has elements).
+def _compressed_json_array_tail(path, compression):
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        for tail, has_records in ((JSON_TAIL, True), (EMPTY_JSON_TAIL, False)):
+            block = compress_block(tail.encode(), compression)
+            if size >= len(block):
+                f.seek(size - len(block))
+                if f.read() == block:
+                    return size - len(block), has_records
+    raise ValueError(f"{path} does not end with the closing block of a compressed JSON array")
+
+
+# Streams records to a JSON array or NDJSON file, optionally compressed (see
+# CompressedFile), without holding the whole table. With append=True records are
+# added after the existing ones without reading them: NDJSON files are opened for
+# appending and JSON arrays are reopened at their closing bracket (for compressed
+# arrays, the closing block is cut off).
+class RecordWriter:
+    def __init__(self, path, fmt='json', chunk_size=DEFAULT_CHUNK_SIZE, ensure_ascii=True, append=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}, expected one of {sorted(FORMATS)}")
+        self.path = path
+        self.fmt = fmt
+        self.base_format, self.compression = split_format(fmt)
+        self.chunk_size = chunk_size
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+        self._buffer = []
+        self._has_records = False
+        appending = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if appending and self.base_format == 'json':
+            if self.compression:
+                close, self._has_records = _compressed_json_array_tail(path, self.compression)
+            else:
+                close, self._has_records = _json_array_tail(path)
+            with open(path, 'r+b') as f:
+                f.truncate(close)
+        if self.compression:
+            self._file = CompressedFile(path, self.compression, 'ab' if appending else 'wb')
+        else:
+            self._file = open(path, 'a' if appending else 'w', encoding='utf-8')
+        if not appending and self.base_format == 'json':
+            self._file.write('[')
+
+    def write(self, record):
+        self._buffer.append(json.dumps(record, separators=(',', ':'), ensure_ascii=self.ensure_ascii))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.base_format == 'json':
+            separator = ',\n' if self.count or self._has_records else '\n'
+            self._file.write(separator + ',\n'.join(self._buffer))
+        else:
+            self._file.write('\n'.join(self._buffer) + '\n')
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self.base_format == 'json':
+            if self.compression:
+                self._file.end_block()
+            self._file.write(JSON_TAIL if self.count or self._has_records else EMPTY_JSON_TAIL)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Writer for a table in any output format (ensure_ascii only applies to the JSON formats)
+def open_writer(path, fmt='json', chunk_size=DEFAULT_CHUNK_SIZE, ensure_ascii=True, append=False):
+    if fmt == 'columnar':
+        return columnar.ColumnarWriter(path, chunk_size, append)
+    if fmt == 'normalized':
+        return normalized.NormalizedWriter(path, chunk_size=chunk_size, append=append)
+    return RecordWriter(path, fmt, chunk_size, ensure_ascii, append)
+
+
+# Size in bytes of a data file, or of all files of a columnar or normalized table directory
+def data_size(path):
+    if os.path.isdir(path):
+        return sum(entry.stat().st_size if entry.is_file() else data_size(entry.path) for entry in os.scandir(path))
+    return os.path.getsize(path)
+
+
+# Stream an iterable of records to path (or after its existing records with
+# append=True) and return how many were written
+def write_records(path, records, fmt='json', chunk_size=DEFAULT_CHUNK_SIZE, ensure_ascii=True, append=False):
+    with open_writer(path, fmt, chunk_size, ensure_ascii, append) as writer:
+        writer.write_many(records)
+    return writer.count
@@ -1,54 +1,58 @@
-import json
+import argparse
+import os
 from faker import Faker
 from datetime import datetime, timedelta
 import random
-import uuid
+
+import id_allocator
+import text_engine
+import incremental
 
 fake = Faker()
 
 def generate_pdir_entries(existing_file, count=100):
-    # Load existing data to match patterns
-    with open(existing_file) as f:
-        data = json.load(f)
-    
-    # Extract existing patterns
-    product_codes = {entry['product_code'] for entry in data}
-    batch_numbers = {entry['batch_number'] for entry in data}
+    # Existing patterns come from the sidecar state, so the file itself is not re-read
+    state = incremental.load_state(existing_file)
+    product_codes = state['values']['product_code']
+    batch_numbers = state['values']['batch_number']
+    # New ids continue after the existing rows, so they never repeat one
+    id_allocator.start(state['rows'])
     
     new_entries = []
     for _ in range(count):
         entry = {
-            "pdir_id": f"PDIR{fake.random_number(digits=8)}",
-            "product_code": random.choice(list(product_codes)),
-            "batch_number": random.choice(list(batch_numbers)),
+            "pdir_id": id_allocator.next_id("PDIR", 8),
+            "product_code": random.choice(product_codes),
+            "batch_number": random.choice(batch_numbers),
             "inspection_date": (datetime.now() - timedelta(days=random.randint(1, 365))).isoformat(),
-            "checklist_id": str(uuid.uuid4()),
-            "specification_id": str(uuid.uuid4()),
+            "checklist_id": fake.uuid4(),
+            "specification_id": fake.uuid4(),
             "inspector_id": f"INS{fake.random_number(digits=6)}",
             "results": [
                 {
-                    "checkpoint_id": str(uuid.uuid4()),
+                    "checkpoint_id": fake.uuid4(),
                     "measured_value": round(random.uniform(1, 200), 2),
                     "status": random.choice(["Pass", "Fail", "Marginal"]),
-                    "remarks": fake.sentence()
+                    "remarks": text_engine.text('sentence', 'qc')
                 } for _ in range(random.randint(2, 5))
             ],
             "overall_status": random.choice(["Passed", "Failed"]),
-            "remarks": fake.paragraph(),
+            "remarks": text_engine.text('paragraph', 'qc'),
             "created_by": fake.name(),
             "created_date": (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat(),
             "last_updated": datetime.now().isoformat()
         }
         new_entries.append(entry)
     
-    # Append to existing file
-    data.extend(new_entries)
-    with open(existing_file, 'w') as f:
-        json.dump(data, f, indent=2)
+    # Append to the end of the existing file
+    return incremental.append_records(existing_file, new_entries, state)
 
 if __name__ == "__main__":
-    generate_pdir_entries(
-        existing_file="e:/Hackathon/PS2/AI_59_Code_For_Life_PS02/Dataset/data/pdir_entries.json",
-        count=150
-    )
-    print("Generated 150 additional PDIR entries")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Append PDIR entries to the output of generate_quality_data.py")
+    # Whichever format (and compression) pdir_entries was written in
+    default_file = incremental.existing_path('data', 'pdir_entries.json') or os.path.join('data', 'pdir_entries.json')
+    parser.add_argument('--file', default=default_file, help="pdir_entries file to extend")
+    parser.add_argument('--count', type=int, default=150)
+    args = parser.parse_args()
+    generate_pdir_entries(existing_file=args.file, count=args.count)
+    print(f"Generated {args.count} additional PDIR entries")
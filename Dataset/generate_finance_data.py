@@ -1,8 +1,13 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import amounts
+import batch_engine
+import dataset_io
+import id_allocator
+import value_pools
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,170 +16,214 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'ledger_accounts': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'gst_configurations': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'payment_terms': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'tax_codes': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'payment_processing': {
+        'payment_date': ("-1y", "now"),
+        'last_updated': ('payment_date', 1, 5)
+    },
+    'journal_entries': {
+        'entry_date': ("-1y", "now"),
+        'last_updated': ('entry_date', 1, 5)
+    },
+    'gst_invoices': {
+        'invoice_date': ("-1y", "now"),
+        'last_updated': ('invoice_date', 1, 5)
+    },
+    'gst_returns': {
+        'filing_date': ("-1y", "now"),
+        'last_updated': ('filing_date', 1, 5)
+    },
+    'ledger_balance_reports': {
+        'report_date': ("-1y", "now"),
+        'last_updated': ('report_date', 1, 5)
+    }
+}
+
 # Generate Ledger Accounts
-def generate_ledger_accounts(num_records=500):
-    accounts = []
+def iter_ledger_accounts(num_records=500):
     account_types = ["Asset", "Liability", "Income", "Expense", "Equity"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['ledger_accounts']):
         account = {
             "account_id": fake.uuid4(),
             "account_code": f"ACC{fake.random_number(digits=6)}",
             "account_name": fake.company(),
             "account_type": random.choice(account_types),
             "parent_account": f"ACC{fake.random_number(digits=6)}" if random.random() < 0.3 else None,
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "is_active": random.choice([True, False]),
             "opening_balance": round(random.uniform(-1000000, 1000000), 2),
             "current_balance": round(random.uniform(-1000000, 1000000), 2),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        accounts.append(account)
-    return accounts
+        yield account
+
+def generate_ledger_accounts(num_records=500):
+    return list(iter_ledger_accounts(num_records))
 
 # Generate GST Configurations
-def generate_gst_configurations(num_records=50):
-    configs = []
-    for _ in range(num_records):
+def iter_gst_configurations(num_records=50):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gst_configurations']):
         config = {
             "config_id": fake.uuid4(),
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "gst_rate": random.choice([0, 5, 12, 18, 28]),
             "cgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "sgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "igst_rate": random.choice([0, 5, 12, 18, 28]),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        configs.append(config)
-    return configs
+        yield config
+
+def generate_gst_configurations(num_records=50):
+    return list(iter_gst_configurations(num_records))
 
 # Generate Payment Terms
-def generate_payment_terms(num_records=20):
-    terms = []
-    for _ in range(num_records):
+def iter_payment_terms(num_records=20):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['payment_terms']):
         term = {
             "term_id": fake.uuid4(),
             "term_code": f"PT{fake.random_number(digits=4)}",
             "term_name": random.choice(["Immediate", "Net 15", "Net 30", "Net 45", "Net 60", "Net 90"]),
             "days": random.choice([0, 15, 30, 45, 60, 90]),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        terms.append(term)
-    return terms
+        yield term
+
+def generate_payment_terms(num_records=20):
+    return list(iter_payment_terms(num_records))
 
 # Generate Tax Codes
-def generate_tax_codes(num_records=30):
-    codes = []
-    for _ in range(num_records):
+def iter_tax_codes(num_records=30):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['tax_codes']):
         code = {
             "code_id": fake.uuid4(),
             "tax_code": f"TAX{fake.random_number(digits=4)}",
             "tax_name": random.choice(["VAT", "CST", "Service Tax", "Excise", "Customs"]),
             "rate": round(random.uniform(0, 28), 2),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        codes.append(code)
-    return codes
+        yield code
+
+def generate_tax_codes(num_records=30):
+    return list(iter_tax_codes(num_records))
 
 # Generate Payment Processing Records
-def generate_payment_processing(num_records=1000):
-    payments = []
-    for _ in range(num_records):
-        payment_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_payment_processing(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['payment_processing']):
         payment = {
-            "payment_id": f"PAY{fake.random_number(digits=8)}",
+            "payment_id": id_allocator.next_id("PAY", 8),
             "reference_id": f"REF{fake.random_number(digits=8)}",
-            "payment_date": payment_date.isoformat(),
+            "payment_date": dates["payment_date"],
             "amount": round(random.uniform(1000, 100000), 2),
             "payment_mode": random.choice(["Cash", "Bank Transfer", "Cheque", "Credit Card", "UPI"]),
             "payment_type": random.choice(["Advance", "Regular", "Final", "Refund"]),
             "account_id": f"ACC{fake.random_number(digits=6)}",
             "status": random.choice(["Pending", "Completed", "Failed", "Cancelled"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'gst'),
             "created_by": fake.name(),
-            "created_date": payment_date.isoformat(),
-            "last_updated": (payment_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["payment_date"],
+            "last_updated": dates["last_updated"]
         }
-        payments.append(payment)
-    return payments
+        yield payment
+
+def generate_payment_processing(num_records=1000):
+    return list(iter_payment_processing(num_records))
 
 # Generate Journal Entries
-def generate_journal_entries(num_records=1000):
-    entries = []
-    for _ in range(num_records):
-        entry_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_journal_entries(num_records=1000):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['journal_entries']),
+                            amounts.amount_rows('journal', num_records)):
         entry = {
-            "entry_id": f"JRN{fake.random_number(digits=8)}",
-            "entry_date": entry_date.isoformat(),
+            "entry_id": id_allocator.next_id("JRN", 8),
+            "entry_date": dates["entry_date"],
             "reference": f"REF{fake.random_number(digits=8)}",
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "entries": [
                 {
                     "account_id": f"ACC{fake.random_number(digits=6)}",
-                    "debit_amount": round(random.uniform(0, 100000), 2),
+                    "debit_amount": money["debit_amount"],
                     "credit_amount": 0,
-                    "description": fake.text(max_nb_chars=100)
+                    "description": text_engine.text('short_text', 'gst')
                 },
                 {
                     "account_id": f"ACC{fake.random_number(digits=6)}",
                     "debit_amount": 0,
-                    "credit_amount": round(random.uniform(0, 100000), 2),
-                    "description": fake.text(max_nb_chars=100)
+                    "credit_amount": money["credit_amount"],
+                    "description": text_engine.text('short_text', 'gst')
                 }
             ],
-            "total_debit": round(random.uniform(1000, 100000), 2),
-            "total_credit": round(random.uniform(1000, 100000), 2),
+            "total_debit": money["total_debit"],
+            "total_credit": money["total_credit"],
             "status": random.choice(["Draft", "Posted", "Void"]),
             "created_by": fake.name(),
-            "created_date": entry_date.isoformat(),
-            "last_updated": (entry_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["entry_date"],
+            "last_updated": dates["last_updated"]
         }
-        entries.append(entry)
-    return entries
+        yield entry
+
+def generate_journal_entries(num_records=1000):
+    return list(iter_journal_entries(num_records))
 
 # Generate GST Invoices
-def generate_gst_invoices(num_records=1000):
-    invoices = []
-    for _ in range(num_records):
-        invoice_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gst_invoices(num_records=1000):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['gst_invoices']),
+                            amounts.amount_rows('tax', num_records)):
         invoice = {
-            "invoice_id": f"GST{fake.random_number(digits=8)}",
-            "invoice_date": invoice_date.isoformat(),
+            "invoice_id": id_allocator.next_id("GST", 8),
+            "invoice_date": dates["invoice_date"],
             "invoice_number": f"INV{fake.random_number(digits=8)}",
             "customer_gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
-            "taxable_amount": round(random.uniform(1000, 100000), 2),
-            "cgst_amount": round(random.uniform(50, 5000), 2),
-            "sgst_amount": round(random.uniform(50, 5000), 2),
-            "igst_amount": round(random.uniform(100, 10000), 2),
-            "total_amount": round(random.uniform(1100, 110000), 2),
+            "taxable_amount": money["taxable_amount"],
+            "cgst_amount": money["cgst_amount"],
+            "sgst_amount": money["sgst_amount"],
+            "igst_amount": money["igst_amount"],
+            "total_amount": money["total_amount"],
             "status": random.choice(["Draft", "Posted", "Cancelled"]),
             "created_by": fake.name(),
-            "created_date": invoice_date.isoformat(),
-            "last_updated": (invoice_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["invoice_date"],
+            "last_updated": dates["last_updated"]
         }
-        invoices.append(invoice)
-    return invoices
+        yield invoice
+
+def generate_gst_invoices(num_records=1000):
+    return list(iter_gst_invoices(num_records))
 
 # Generate GST Return Filing Records
-def generate_gst_returns(num_records=100):
-    returns = []
-    for _ in range(num_records):
-        return_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gst_returns(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gst_returns']):
         gst_return = {
-            "return_id": f"GST{fake.random_number(digits=8)}",
+            "return_id": id_allocator.next_id("GSR", 8),
             "return_type": random.choice(["GSTR-1", "GSTR-3B"]),
-            "return_period": return_date.strftime("%Y-%m"),
-            "filing_date": return_date.isoformat(),
+            "return_period": dates["filing_date"][:7],
+            "filing_date": dates["filing_date"],
             "total_taxable_value": round(random.uniform(1000000, 10000000), 2),
             "total_cgst": round(random.uniform(50000, 500000), 2),
             "total_sgst": round(random.uniform(50000, 500000), 2),
@@ -183,62 +232,102 @@ def generate_gst_returns(num_records=100):
             "status": random.choice(["Draft", "Filed", "Amended"]),
             "filing_status": random.choice(["Pending", "Filed", "Late"]),
             "created_by": fake.name(),
-            "created_date": return_date.isoformat(),
-            "last_updated": (return_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["filing_date"],
+            "last_updated": dates["last_updated"]
         }
-        returns.append(gst_return)
-    return returns
+        yield gst_return
+
+def generate_gst_returns(num_records=100):
+    return list(iter_gst_returns(num_records))
 
 # Generate Ledger Balance Reports
-def generate_ledger_balance_reports(num_records=200):
-    reports = []
-    for _ in range(num_records):
-        report_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_ledger_balance_reports(num_records=200):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['ledger_balance_reports']):
         report = {
-            "report_id": f"LBR{fake.random_number(digits=8)}",
+            "report_id": id_allocator.next_id("LBR", 8),
             "account_id": f"ACC{fake.random_number(digits=6)}",
-            "report_date": report_date.isoformat(),
+            "report_date": dates["report_date"],
             "opening_balance": round(random.uniform(-1000000, 1000000), 2),
             "debit_total": round(random.uniform(0, 1000000), 2),
             "credit_total": round(random.uniform(0, 1000000), 2),
             "closing_balance": round(random.uniform(-1000000, 1000000), 2),
             "created_by": fake.name(),
-            "created_date": report_date.isoformat(),
-            "last_updated": (report_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["report_date"],
+            "last_updated": dates["last_updated"]
         }
-        reports.append(report)
-    return reports
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    ledger_accounts = generate_ledger_accounts()
-    gst_configurations = generate_gst_configurations()
-    payment_terms = generate_payment_terms()
-    tax_codes = generate_tax_codes()
-    payment_processing = generate_payment_processing()
-    journal_entries = generate_journal_entries()
-    gst_invoices = generate_gst_invoices()
-    gst_returns = generate_gst_returns()
-    ledger_balance_reports = generate_ledger_balance_reports()
-
-    # Save datasets to JSON files
-    datasets = {
-        'ledger_accounts.json': ledger_accounts,
-        'gst_configurations.json': gst_configurations,
-        'payment_terms.json': payment_terms,
-        'tax_codes.json': tax_codes,
-        'payment_processing.json': payment_processing,
-        'journal_entries.json': journal_entries,
-        'gst_invoices.json': gst_invoices,
-        'gst_returns.json': gst_returns,
-        'ledger_balance_reports.json': ledger_balance_reports
+        yield report
+
+def generate_ledger_balance_reports(num_records=200):
+    return list(iter_ledger_balance_reports(num_records))
+
+# Generate Payment Processing Records as NumPy columns (batch mode)
+def generate_payment_processing_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['payment_processing']))
+    return {
+        "payment_id": id_allocator.id_column(num_records, "PAY", 8),
+        "reference_id": batch_engine.number_id_column(rng, num_records, "REF", 8),
+        "payment_date": dates["payment_date"],
+        "amount": batch_engine.uniform_column(rng, num_records, 1000, 100000),
+        "payment_mode": batch_engine.choice_column(rng, num_records, ["Cash", "Bank Transfer", "Cheque", "Credit Card", "UPI"]),
+        "payment_type": batch_engine.choice_column(rng, num_records, ["Advance", "Regular", "Final", "Refund"]),
+        "account_id": batch_engine.number_id_column(rng, num_records, "ACC", 6),
+        "status": batch_engine.choice_column(rng, num_records, ["Pending", "Completed", "Failed", "Cancelled"]),
+        "remarks": text_engine.column(rng, num_records, 'text', 'gst'),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["payment_date"],
+        "last_updated": dates["last_updated"]
     }
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Table generators keyed by output file
+TABLES = {
+    'ledger_accounts.json': generate_ledger_accounts,
+    'gst_configurations.json': generate_gst_configurations,
+    'payment_terms.json': generate_payment_terms,
+    'tax_codes.json': generate_tax_codes,
+    'payment_processing.json': generate_payment_processing,
+    'journal_entries.json': generate_journal_entries,
+    'gst_invoices.json': generate_gst_invoices,
+    'gst_returns.json': generate_gst_returns,
+    'ledger_balance_reports.json': generate_ledger_balance_reports
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'ledger_accounts.json': iter_ledger_accounts,
+    'gst_configurations.json': iter_gst_configurations,
+    'payment_terms.json': iter_payment_terms,
+    'tax_codes.json': iter_tax_codes,
+    'payment_processing.json': iter_payment_processing,
+    'journal_entries.json': iter_journal_entries,
+    'gst_invoices.json': iter_gst_invoices,
+    'gst_returns.json': iter_gst_returns,
+    'ledger_balance_reports.json': iter_ledger_balance_reports
+}
+
+# Column generators used instead of TABLES in batch mode
+BATCH_TABLES = {
+    'payment_processing.json': generate_payment_processing_batch
+}
+
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(batch=False, output_format='json'):
+    rng = batch_engine.make_rng()
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        num_records = batch_engine.table_size(generator)
+        if batch and filename in BATCH_TABLES:
+            records = batch_engine.iter_batch_records(BATCH_TABLES[filename], num_records, rng=rng)
+        else:
+            records = ITER_TABLES[filename](num_records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', action='store_true', help="Generate high-volume tables as NumPy columns")
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    args = parser.parse_args()
+    amounts.configure(args.consistent_amounts)
+    generate_all_datasets(batch=args.batch, output_format=args.format)
     print("All Finance & Accounts datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
@@ -1,8 +1,12 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import amounts
+import batch_engine
+import dataset_io
+import id_allocator
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,48 +15,102 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'hsn_codes': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'sac_codes': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'gstin_records': {
+        'registration_date': ("-2y", "now"),
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'e_invoices': {
+        'invoice_date': ("-1y", "now"),
+        'last_updated': ('invoice_date', 1, 5)
+    },
+    'e_way_bills': {
+        'bill_date': ("-1y", "now"),
+        'last_updated': ('bill_date', 1, 5)
+    },
+    'credit_debit_notes': {
+        'note_date': ("-1y", "now"),
+        'last_updated': ('note_date', 1, 5)
+    },
+    'rcm_transactions': {
+        'transaction_date': ("-1y", "now"),
+        'last_updated': ('transaction_date', 1, 5)
+    },
+    'gstr1': {
+        'filing_date': ("-1y", "now"),
+        'last_updated': ('filing_date', 1, 5)
+    },
+    'gstr3b': {
+        'filing_date': ("-1y", "now"),
+        'last_updated': ('filing_date', 1, 5)
+    },
+    'gstr2a': {
+        'generation_date': ("-1y", "now"),
+        'last_updated': ('generation_date', 1, 5)
+    },
+    'gst_reconciliation': {
+        'generation_date': ("-1y", "now"),
+        'last_updated': ('generation_date', 1, 5)
+    },
+    'gst_audit_reports': {
+        'generation_date': ("-1y", "now"),
+        'last_updated': ('generation_date', 1, 5)
+    }
+}
+
 # Generate HSN Codes
-def generate_hsn_codes(num_records=100):
-    codes = []
-    for _ in range(num_records):
+def iter_hsn_codes(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['hsn_codes']):
         code = {
             "hsn_id": fake.uuid4(),
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "gst_rate": random.choice([0, 5, 12, 18, 28]),
             "cgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "sgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "igst_rate": random.choice([0, 5, 12, 18, 28]),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        codes.append(code)
-    return codes
+        yield code
+
+def generate_hsn_codes(num_records=100):
+    return list(iter_hsn_codes(num_records))
 
 # Generate SAC Codes
-def generate_sac_codes(num_records=50):
-    codes = []
-    for _ in range(num_records):
+def iter_sac_codes(num_records=50):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['sac_codes']):
         code = {
             "sac_id": fake.uuid4(),
             "sac_code": f"{random.randint(99, 99)}{random.randint(1000, 9999)}",
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'gst'),
             "gst_rate": random.choice([0, 5, 12, 18, 28]),
             "cgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "sgst_rate": random.choice([0, 2.5, 6, 9, 14]),
             "igst_rate": random.choice([0, 5, 12, 18, 28]),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        codes.append(code)
-    return codes
+        yield code
+
+def generate_sac_codes(num_records=50):
+    return list(iter_sac_codes(num_records))
 
 # Generate GSTIN Records
-def generate_gstin_records(num_records=500):
-    records = []
-    for _ in range(num_records):
+def iter_gstin_records(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gstin_records']):
         record = {
             "gstin_id": fake.uuid4(),
             "gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
@@ -61,48 +119,49 @@ def generate_gstin_records(num_records=500):
             "address": fake.address(),
             "state_code": f"{random.randint(1, 37):02d}",
             "registration_type": random.choice(["Regular", "Composition", "Unregistered", "Input Service Distributor"]),
-            "registration_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
+            "registration_date": dates["registration_date"],
             "status": random.choice(["Active", "Inactive", "Suspended", "Cancelled"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        records.append(record)
-    return records
+        yield record
+
+def generate_gstin_records(num_records=500):
+    return list(iter_gstin_records(num_records))
 
 # Generate E-Invoices
-def generate_e_invoices(num_records=1000):
-    invoices = []
-    for _ in range(num_records):
-        invoice_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_e_invoices(num_records=1000):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['e_invoices']),
+                            amounts.amount_rows('tax', num_records)):
         invoice = {
-            "invoice_id": f"EINV{fake.random_number(digits=8)}",
-            "invoice_date": invoice_date.isoformat(),
+            "invoice_id": id_allocator.next_id("EINV", 8),
+            "invoice_date": dates["invoice_date"],
             "invoice_number": f"INV{fake.random_number(digits=8)}",
             "customer_gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
-            "taxable_amount": round(random.uniform(1000, 100000), 2),
-            "cgst_amount": round(random.uniform(50, 5000), 2),
-            "sgst_amount": round(random.uniform(50, 5000), 2),
-            "igst_amount": round(random.uniform(100, 10000), 2),
-            "total_amount": round(random.uniform(1100, 110000), 2),
+            "taxable_amount": money["taxable_amount"],
+            "cgst_amount": money["cgst_amount"],
+            "sgst_amount": money["sgst_amount"],
+            "igst_amount": money["igst_amount"],
+            "total_amount": money["total_amount"],
             "irn": fake.uuid4(),
             "qr_code": fake.uuid4(),
             "status": random.choice(["Generated", "Cancelled", "Amended"]),
             "created_by": fake.name(),
-            "created_date": invoice_date.isoformat(),
-            "last_updated": (invoice_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["invoice_date"],
+            "last_updated": dates["last_updated"]
         }
-        invoices.append(invoice)
-    return invoices
+        yield invoice
+
+def generate_e_invoices(num_records=1000):
+    return list(iter_e_invoices(num_records))
 
 # Generate E-Way Bills
-def generate_e_way_bills(num_records=500):
-    bills = []
-    for _ in range(num_records):
-        bill_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_e_way_bills(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['e_way_bills']):
         bill = {
-            "eway_bill_id": f"EWB{fake.random_number(digits=8)}",
-            "bill_date": bill_date.isoformat(),
+            "eway_bill_id": id_allocator.next_id("EWB", 8),
+            "bill_date": dates["bill_date"],
             "bill_number": f"EWB{fake.random_number(digits=8)}",
             "invoice_id": f"INV{fake.random_number(digits=8)}",
             "from_gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
@@ -113,72 +172,74 @@ def generate_e_way_bills(num_records=500):
             "value": round(random.uniform(50000, 500000), 2),
             "status": random.choice(["Generated", "Cancelled", "Expired"]),
             "created_by": fake.name(),
-            "created_date": bill_date.isoformat(),
-            "last_updated": (bill_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["bill_date"],
+            "last_updated": dates["last_updated"]
         }
-        bills.append(bill)
-    return bills
+        yield bill
+
+def generate_e_way_bills(num_records=500):
+    return list(iter_e_way_bills(num_records))
 
 # Generate Credit/Debit Notes
-def generate_credit_debit_notes(num_records=200):
-    notes = []
-    for _ in range(num_records):
-        note_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_credit_debit_notes(num_records=200):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['credit_debit_notes']),
+                            amounts.amount_rows('tax', num_records, low=1000, high=10000)):
         note = {
-            "note_id": f"CDN{fake.random_number(digits=8)}",
-            "note_date": note_date.isoformat(),
+            "note_id": id_allocator.next_id("CDN", 8),
+            "note_date": dates["note_date"],
             "note_number": f"CDN{fake.random_number(digits=8)}",
             "invoice_id": f"INV{fake.random_number(digits=8)}",
             "customer_gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
             "note_type": random.choice(["Credit", "Debit"]),
             "reason": random.choice(["Rate Difference", "Quantity Difference", "Quality Issue", "Service Issue"]),
-            "taxable_amount": round(random.uniform(1000, 10000), 2),
-            "cgst_amount": round(random.uniform(50, 500), 2),
-            "sgst_amount": round(random.uniform(50, 500), 2),
-            "igst_amount": round(random.uniform(100, 1000), 2),
-            "total_amount": round(random.uniform(1100, 11000), 2),
+            "taxable_amount": money["taxable_amount"],
+            "cgst_amount": money["cgst_amount"],
+            "sgst_amount": money["sgst_amount"],
+            "igst_amount": money["igst_amount"],
+            "total_amount": money["total_amount"],
             "status": random.choice(["Draft", "Posted", "Cancelled"]),
             "created_by": fake.name(),
-            "created_date": note_date.isoformat(),
-            "last_updated": (note_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["note_date"],
+            "last_updated": dates["last_updated"]
         }
-        notes.append(note)
-    return notes
+        yield note
+
+def generate_credit_debit_notes(num_records=200):
+    return list(iter_credit_debit_notes(num_records))
 
 # Generate RCM Transactions
-def generate_rcm_transactions(num_records=100):
-    transactions = []
-    for _ in range(num_records):
-        trans_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_rcm_transactions(num_records=100):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['rcm_transactions']),
+                            amounts.amount_rows('tax', num_records, low=1000, high=10000)):
         transaction = {
-            "rcm_id": f"RCM{fake.random_number(digits=8)}",
-            "transaction_date": trans_date.isoformat(),
+            "rcm_id": id_allocator.next_id("RCM", 8),
+            "transaction_date": dates["transaction_date"],
             "supplier_gstin": f"{random.randint(1, 37):02d}{fake.random_number(digits=10)}Z{fake.random_number(digits=1)}",
             "invoice_number": f"INV{fake.random_number(digits=8)}",
-            "invoice_date": trans_date.isoformat(),
+            "invoice_date": dates["transaction_date"],
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
-            "taxable_amount": round(random.uniform(1000, 10000), 2),
-            "cgst_amount": round(random.uniform(50, 500), 2),
-            "sgst_amount": round(random.uniform(50, 500), 2),
-            "igst_amount": round(random.uniform(100, 1000), 2),
-            "total_amount": round(random.uniform(1100, 11000), 2),
+            "taxable_amount": money["taxable_amount"],
+            "cgst_amount": money["cgst_amount"],
+            "sgst_amount": money["sgst_amount"],
+            "igst_amount": money["igst_amount"],
+            "total_amount": money["total_amount"],
             "status": random.choice(["Pending", "Paid", "Cancelled"]),
             "created_by": fake.name(),
-            "created_date": trans_date.isoformat(),
-            "last_updated": (trans_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["transaction_date"],
+            "last_updated": dates["last_updated"]
         }
-        transactions.append(transaction)
-    return transactions
+        yield transaction
+
+def generate_rcm_transactions(num_records=100):
+    return list(iter_rcm_transactions(num_records))
 
 # Generate GSTR-1 (Outward Supplies)
-def generate_gstr1(num_records=12):
-    returns = []
-    for _ in range(num_records):
-        return_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gstr1(num_records=12):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gstr1']):
         gstr1 = {
-            "return_id": f"GSTR1{fake.random_number(digits=8)}",
-            "return_period": return_date.strftime("%Y-%m"),
-            "filing_date": return_date.isoformat(),
+            "return_id": id_allocator.next_id("GSTR1", 8),
+            "return_period": dates["filing_date"][:7],
+            "filing_date": dates["filing_date"],
             "total_invoices": random.randint(100, 1000),
             "total_taxable_value": round(random.uniform(1000000, 10000000), 2),
             "total_cgst": round(random.uniform(50000, 500000), 2),
@@ -188,21 +249,21 @@ def generate_gstr1(num_records=12):
             "status": random.choice(["Draft", "Filed", "Amended"]),
             "filing_status": random.choice(["Pending", "Filed", "Late"]),
             "created_by": fake.name(),
-            "created_date": return_date.isoformat(),
-            "last_updated": (return_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["filing_date"],
+            "last_updated": dates["last_updated"]
         }
-        returns.append(gstr1)
-    return returns
+        yield gstr1
+
+def generate_gstr1(num_records=12):
+    return list(iter_gstr1(num_records))
 
 # Generate GSTR-3B (Monthly Summary)
-def generate_gstr3b(num_records=12):
-    returns = []
-    for _ in range(num_records):
-        return_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gstr3b(num_records=12):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gstr3b']):
         gstr3b = {
-            "return_id": f"GSTR3B{fake.random_number(digits=8)}",
-            "return_period": return_date.strftime("%Y-%m"),
-            "filing_date": return_date.isoformat(),
+            "return_id": id_allocator.next_id("GSTR3B", 8),
+            "return_period": dates["filing_date"][:7],
+            "filing_date": dates["filing_date"],
             "outward_supplies": round(random.uniform(1000000, 10000000), 2),
             "inward_supplies": round(random.uniform(800000, 8000000), 2),
             "input_tax_credit": round(random.uniform(100000, 1000000), 2),
@@ -211,21 +272,21 @@ def generate_gstr3b(num_records=12):
             "status": random.choice(["Draft", "Filed", "Amended"]),
             "filing_status": random.choice(["Pending", "Filed", "Late"]),
             "created_by": fake.name(),
-            "created_date": return_date.isoformat(),
-            "last_updated": (return_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["filing_date"],
+            "last_updated": dates["last_updated"]
         }
-        returns.append(gstr3b)
-    return returns
+        yield gstr3b
+
+def generate_gstr3b(num_records=12):
+    return list(iter_gstr3b(num_records))
 
 # Generate GSTR-2A (Auto-drafted Inward Supplies)
-def generate_gstr2a(num_records=12):
-    returns = []
-    for _ in range(num_records):
-        return_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gstr2a(num_records=12):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gstr2a']):
         gstr2a = {
-            "return_id": f"GSTR2A{fake.random_number(digits=8)}",
-            "return_period": return_date.strftime("%Y-%m"),
-            "generation_date": return_date.isoformat(),
+            "return_id": id_allocator.next_id("GSTR2A", 8),
+            "return_period": dates["generation_date"][:7],
+            "generation_date": dates["generation_date"],
             "total_invoices": random.randint(50, 500),
             "total_taxable_value": round(random.uniform(800000, 8000000), 2),
             "total_cgst": round(random.uniform(40000, 400000), 2),
@@ -234,91 +295,102 @@ def generate_gstr2a(num_records=12):
             "total_cess": round(random.uniform(8000, 80000), 2),
             "status": random.choice(["Generated", "Reconciled", "Pending"]),
             "created_by": fake.name(),
-            "created_date": return_date.isoformat(),
-            "last_updated": (return_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["generation_date"],
+            "last_updated": dates["last_updated"]
         }
-        returns.append(gstr2a)
-    return returns
+        yield gstr2a
+
+def generate_gstr2a(num_records=12):
+    return list(iter_gstr2a(num_records))
 
 # Generate GST Reconciliation Reports
-def generate_gst_reconciliation(num_records=12):
-    reports = []
-    for _ in range(num_records):
-        report_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gst_reconciliation(num_records=12):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gst_reconciliation']):
         report = {
-            "report_id": f"REC{fake.random_number(digits=8)}",
-            "report_period": report_date.strftime("%Y-%m"),
-            "generation_date": report_date.isoformat(),
+            "report_id": id_allocator.next_id("REC", 8),
+            "report_period": dates["generation_date"][:7],
+            "generation_date": dates["generation_date"],
             "gstr1_value": round(random.uniform(1000000, 10000000), 2),
             "gstr3b_value": round(random.uniform(1000000, 10000000), 2),
             "gstr2a_value": round(random.uniform(800000, 8000000), 2),
             "difference_amount": round(random.uniform(-100000, 100000), 2),
             "reconciliation_status": random.choice(["Matched", "Unmatched", "Partially Matched"]),
             "created_by": fake.name(),
-            "created_date": report_date.isoformat(),
-            "last_updated": (report_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["generation_date"],
+            "last_updated": dates["last_updated"]
         }
-        reports.append(report)
-    return reports
+        yield report
+
+def generate_gst_reconciliation(num_records=12):
+    return list(iter_gst_reconciliation(num_records))
 
 # Generate GST Audit Reports (GSTR-9, GSTR-9C)
-def generate_gst_audit_reports(num_records=2):
-    reports = []
-    for _ in range(num_records):
-        report_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_gst_audit_reports(num_records=2):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['gst_audit_reports']):
         report = {
-            "report_id": f"GSTR9{fake.random_number(digits=8)}",
+            "report_id": id_allocator.next_id("GSTR9", 8),
             "report_type": random.choice(["GSTR-9", "GSTR-9C"]),
-            "financial_year": report_date.strftime("%Y"),
-            "generation_date": report_date.isoformat(),
+            "financial_year": dates["generation_date"][:4],
+            "generation_date": dates["generation_date"],
             "total_turnover": round(random.uniform(10000000, 100000000), 2),
             "total_tax_paid": round(random.uniform(1000000, 10000000), 2),
             "total_input_tax_credit": round(random.uniform(800000, 8000000), 2),
             "audit_status": random.choice(["Draft", "Final", "Filed"]),
             "auditor_name": fake.name(),
             "created_by": fake.name(),
-            "created_date": report_date.isoformat(),
-            "last_updated": (report_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["generation_date"],
+            "last_updated": dates["last_updated"]
         }
-        reports.append(report)
-    return reports
+        yield report
+
+def generate_gst_audit_reports(num_records=2):
+    return list(iter_gst_audit_reports(num_records))
 
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    hsn_codes = generate_hsn_codes()
-    sac_codes = generate_sac_codes()
-    gstin_records = generate_gstin_records()
-    e_invoices = generate_e_invoices()
-    e_way_bills = generate_e_way_bills()
-    credit_debit_notes = generate_credit_debit_notes()
-    rcm_transactions = generate_rcm_transactions()
-    gstr1 = generate_gstr1()
-    gstr3b = generate_gstr3b()
-    gstr2a = generate_gstr2a()
-    gst_reconciliation = generate_gst_reconciliation()
-    gst_audit_reports = generate_gst_audit_reports()
+# Table generators keyed by output file
+TABLES = {
+    'hsn_codes.json': generate_hsn_codes,
+    'sac_codes.json': generate_sac_codes,
+    'gstin_records.json': generate_gstin_records,
+    'e_invoices.json': generate_e_invoices,
+    'e_way_bills.json': generate_e_way_bills,
+    'credit_debit_notes.json': generate_credit_debit_notes,
+    'rcm_transactions.json': generate_rcm_transactions,
+    'gstr1.json': generate_gstr1,
+    'gstr3b.json': generate_gstr3b,
+    'gstr2a.json': generate_gstr2a,
+    'gst_reconciliation.json': generate_gst_reconciliation,
+    'gst_audit_reports.json': generate_gst_audit_reports
+}
 
-    # Save datasets to JSON files
-    datasets = {
-        'hsn_codes.json': hsn_codes,
-        'sac_codes.json': sac_codes,
-        'gstin_records.json': gstin_records,
-        'e_invoices.json': e_invoices,
-        'e_way_bills.json': e_way_bills,
-        'credit_debit_notes.json': credit_debit_notes,
-        'rcm_transactions.json': rcm_transactions,
-        'gstr1.json': gstr1,
-        'gstr3b.json': gstr3b,
-        'gstr2a.json': gstr2a,
-        'gst_reconciliation.json': gst_reconciliation,
-        'gst_audit_reports.json': gst_audit_reports
-    }
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'hsn_codes.json': iter_hsn_codes,
+    'sac_codes.json': iter_sac_codes,
+    'gstin_records.json': iter_gstin_records,
+    'e_invoices.json': iter_e_invoices,
+    'e_way_bills.json': iter_e_way_bills,
+    'credit_debit_notes.json': iter_credit_debit_notes,
+    'rcm_transactions.json': iter_rcm_transactions,
+    'gstr1.json': iter_gstr1,
+    'gstr3b.json': iter_gstr3b,
+    'gstr2a.json': iter_gstr2a,
+    'gst_reconciliation.json': iter_gst_reconciliation,
+    'gst_audit_reports.json': iter_gst_audit_reports
+}
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(output_format='json'):
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        records = ITER_TABLES[filename](batch_engine.table_size(generator))
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    args = parser.parse_args()
+    amounts.configure(args.consistent_amounts)
+    generate_all_datasets(output_format=args.format)
     print("All GST compliance datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
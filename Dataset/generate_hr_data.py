@@ -1,8 +1,15 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import argparse
+import numpy as np
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import value_pools
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,16 +18,52 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'employee_records': {
+        'join_date': ("-5y", "now"),
+        'last_updated': ('after', 'join_date')
+    },
+    'payroll_details': {
+        'payroll_date': ("-1y", "now"),
+        'last_updated': ('payroll_date', 1, 5)
+    },
+    'role_permissions': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'user_access': {
+        'last_login': ("-1y", "now"),
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'payroll_processing': {
+        'process_date': ("-1y", "now"),
+        'last_updated': ('process_date', 1, 5)
+    },
+    'leave_management': {
+        'start_date': ("-1y", "now"),
+        'end_date': ('start_date', 1, 30),
+        'last_updated': ('start_date', 1, 5)
+    },
+    'employee_attendance': {
+        'date': ("-1y", "now"),
+        'last_updated': ('date', 1, 5)
+    },
+    'payroll_reports': {
+        'created_date': ("-1y", "now"),
+        'last_updated': ('created_date', 1, 5)
+    }
+}
+
 # Generate Employee Records
-def generate_employee_records(num_records=500):
-    employees = []
+def iter_employee_records(num_records=500):
     departments = ["HR", "Finance", "IT", "Sales", "Marketing", "Operations", "Production", "Quality", "R&D"]
     designations = ["Manager", "Senior Executive", "Executive", "Associate", "Trainee", "Director", "Head"]
     
-    for _ in range(num_records):
-        join_date = fake.date_time_between(start_date="-5y", end_date="now")
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['employee_records']):
         employee = {
-            "employee_id": f"EMP{fake.random_number(digits=6)}",
+            "employee_id": id_allocator.next_id("EMP", 6),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
             "email": fake.email(),
@@ -30,20 +73,20 @@ def generate_employee_records(num_records=500):
             "address": fake.address(),
             "department": random.choice(departments),
             "designation": random.choice(designations),
-            "join_date": join_date.isoformat(),
+            "join_date": dates["join_date"],
             "employment_type": random.choice(["Full Time", "Part Time", "Contract", "Temporary"]),
             "status": random.choice(["Active", "On Leave", "Terminated", "Resigned"]),
-            "created_date": join_date.isoformat(),
-            "last_updated": fake.date_time_between(start_date=join_date, end_date="now").isoformat()
+            "created_date": dates["join_date"],
+            "last_updated": dates["last_updated"]
         }
-        employees.append(employee)
-    return employees
+        yield employee
+
+def generate_employee_records(num_records=500):
+    return list(iter_employee_records(num_records))
 
 # Generate Payroll Details
-def generate_payroll_details(num_records=500):
-    payrolls = []
-    for _ in range(num_records):
-        payroll_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_payroll_details(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['payroll_details']):
         basic_salary = round(random.uniform(20000, 100000), 2)
         hra = round(basic_salary * random.uniform(0.2, 0.4), 2)
         da = round(basic_salary * random.uniform(0.1, 0.2), 2)
@@ -51,9 +94,9 @@ def generate_payroll_details(num_records=500):
         deductions = round(random.uniform(5000, 15000), 2)
         
         payroll = {
-            "payroll_id": f"PAY{fake.random_number(digits=8)}",
+            "payroll_id": id_allocator.next_id("PAY", 8),
             "employee_id": f"EMP{fake.random_number(digits=6)}",
-            "payroll_date": payroll_date.isoformat(),
+            "payroll_date": dates["payroll_date"],
             "basic_salary": basic_salary,
             "hra": hra,
             "da": da,
@@ -63,171 +106,361 @@ def generate_payroll_details(num_records=500):
             "payment_status": random.choice(["Pending", "Processed", "Paid", "Failed"]),
             "payment_mode": random.choice(["Bank Transfer", "Cheque", "Cash"]),
             "bank_account": fake.bban(),
-            "created_date": payroll_date.isoformat(),
-            "last_updated": (payroll_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["payroll_date"],
+            "last_updated": dates["last_updated"]
         }
-        payrolls.append(payroll)
-    return payrolls
+        yield payroll
+
+def generate_payroll_details(num_records=500):
+    return list(iter_payroll_details(num_records))
 
 # Generate Role-Based Permissions
-def generate_role_permissions(num_records=20):
-    roles = []
+def iter_role_permissions(num_records=20):
     permissions = [
         "View", "Create", "Edit", "Delete", "Approve", "Reject",
         "Export", "Import", "Print", "Share", "Admin"
     ]
     
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['role_permissions']):
         role = {
-            "role_id": f"ROL{fake.random_number(digits=4)}",
+            "role_id": id_allocator.next_id("ROL", 4),
             "role_name": random.choice([
                 "Admin", "Manager", "Supervisor", "Employee", "HR Manager",
                 "Finance Manager", "IT Admin", "Sales Manager", "Quality Manager"
             ]),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "permissions": random.sample(permissions, random.randint(1, len(permissions))),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        roles.append(role)
-    return roles
+        yield role
+
+def generate_role_permissions(num_records=20):
+    return list(iter_role_permissions(num_records))
 
 # Generate User Access Management
-def generate_user_access(num_records=500):
-    users = []
-    for _ in range(num_records):
+def iter_user_access(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['user_access']):
         user = {
-            "user_id": f"USR{fake.random_number(digits=6)}",
+            "user_id": id_allocator.next_id("USR", 6),
             "employee_id": f"EMP{fake.random_number(digits=6)}",
             "username": fake.user_name(),
             "email": fake.email(),
             "role_id": f"ROL{fake.random_number(digits=4)}",
             "is_active": random.choice([True, False]),
-            "last_login": fake.date_time_between(start_date="-1y", end_date="now").isoformat(),
+            "last_login": dates["last_login"],
             "password_hash": fake.sha256(),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        users.append(user)
-    return users
+        yield user
+
+def generate_user_access(num_records=500):
+    return list(iter_user_access(num_records))
 
 # Generate Payroll Processing Records
-def generate_payroll_processing(num_records=100):
-    processes = []
-    for _ in range(num_records):
-        process_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_payroll_processing(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['payroll_processing']):
         process = {
-            "process_id": f"PRC{fake.random_number(digits=8)}",
-            "payroll_month": process_date.strftime("%Y-%m"),
-            "process_date": process_date.isoformat(),
+            "process_id": id_allocator.next_id("PRC", 8),
+            "payroll_month": dates["process_date"][:7],
+            "process_date": dates["process_date"],
             "total_employees": random.randint(100, 500),
             "total_amount": round(random.uniform(5000000, 50000000), 2),
             "status": random.choice(["In Progress", "Completed", "Failed", "Cancelled"]),
             "processed_by": fake.name(),
-            "created_date": process_date.isoformat(),
-            "last_updated": (process_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["process_date"],
+            "last_updated": dates["last_updated"]
         }
-        processes.append(process)
-    return processes
+        yield process
+
+def generate_payroll_processing(num_records=100):
+    return list(iter_payroll_processing(num_records))
 
 # Generate Leave Management Records
-def generate_leave_management(num_records=1000):
-    leaves = []
+def iter_leave_management(num_records=1000, keys=None):
     leave_types = ["Annual", "Sick", "Maternity", "Paternity", "Bereavement", "Unpaid", "Other"]
+    employee_ids = keys.iter_sample('employee_records', num_records) if keys else None
     
-    for _ in range(num_records):
-        start_date = fake.date_time_between(start_date="-1y", end_date="now")
-        days = random.randint(1, 30)
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['leave_management']):
+        days = (datetime.fromisoformat(dates["end_date"]) - datetime.fromisoformat(dates["start_date"])).days
         leave = {
-            "leave_id": f"LEV{fake.random_number(digits=8)}",
-            "employee_id": f"EMP{fake.random_number(digits=6)}",
+            "leave_id": id_allocator.next_id("LEV", 8),
+            "employee_id": next(employee_ids) if keys else f"EMP{fake.random_number(digits=6)}",  # Sampled from employee_records when keys are given
             "leave_type": random.choice(leave_types),
-            "start_date": start_date.isoformat(),
-            "end_date": (start_date + timedelta(days=days)).isoformat(),
+            "start_date": dates["start_date"],
+            "end_date": dates["end_date"],
             "days": days,
-            "reason": fake.text(max_nb_chars=200),
+            "reason": text_engine.text('text'),
             "status": random.choice(["Pending", "Approved", "Rejected", "Cancelled"]),
             "approved_by": fake.name() if random.random() < 0.7 else None,
-            "created_date": start_date.isoformat(),
-            "last_updated": (start_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["start_date"],
+            "last_updated": dates["last_updated"]
         }
-        leaves.append(leave)
-    return leaves
+        yield leave
+
+def generate_leave_management(num_records=1000, keys=None):
+    return list(iter_leave_management(num_records, keys))
 
 # Generate Employee Attendance Records
-def generate_employee_attendance(num_records=5000):
-    attendance = []
-    for _ in range(num_records):
-        date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_employee_attendance(num_records=5000, keys=None):
+    employee_ids = keys.iter_sample('employee_records', num_records) if keys else None
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['employee_attendance']):
+        date = datetime.fromisoformat(dates["date"])
         check_in = date.replace(hour=random.randint(8, 10), minute=random.randint(0, 59))
         check_out = date.replace(hour=random.randint(17, 19), minute=random.randint(0, 59))
         
         record = {
-            "attendance_id": f"ATT{fake.random_number(digits=8)}",
-            "employee_id": f"EMP{fake.random_number(digits=6)}",
-            "date": date.isoformat(),
+            "attendance_id": id_allocator.next_id("ATT", 8),
+            "employee_id": next(employee_ids) if keys else f"EMP{fake.random_number(digits=6)}",  # Sampled from employee_records when keys are given
+            "date": dates["date"],
             "check_in": check_in.isoformat(),
             "check_out": check_out.isoformat(),
             "status": random.choice(["Present", "Late", "Early Exit", "Half Day", "Absent"]),
-            "remarks": fake.text(max_nb_chars=200) if random.random() < 0.3 else None,
-            "created_date": date.isoformat(),
-            "last_updated": (date + timedelta(days=random.randint(1, 5))).isoformat()
+            "remarks": text_engine.text('text') if random.random() < 0.3 else None,
+            "created_date": dates["date"],
+            "last_updated": dates["last_updated"]
         }
-        attendance.append(record)
-    return attendance
+        yield record
+
+def generate_employee_attendance(num_records=5000, keys=None):
+    return list(iter_employee_attendance(num_records, keys))
 
 # Generate Payroll Reports
-def generate_payroll_reports(num_records=100):
-    reports = []
-    for _ in range(num_records):
-        report_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_payroll_reports(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['payroll_reports']):
         report = {
-            "report_id": f"PRR{fake.random_number(digits=8)}",
+            "report_id": id_allocator.next_id("PRR", 8),
             "report_type": random.choice([
                 "Monthly Payroll", "Tax Summary", "Deduction Summary",
                 "Allowance Summary", "Department-wise Summary"
             ]),
-            "report_period": report_date.strftime("%Y-%m"),
+            "report_period": dates["created_date"][:7],
             "total_employees": random.randint(100, 500),
             "total_salary": round(random.uniform(5000000, 50000000), 2),
             "total_deductions": round(random.uniform(500000, 5000000), 2),
             "net_payment": round(random.uniform(4500000, 45000000), 2),
             "created_by": fake.name(),
-            "created_date": report_date.isoformat(),
-            "last_updated": (report_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        reports.append(report)
-    return reports
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    employee_records = generate_employee_records()
-    payroll_details = generate_payroll_details()
-    role_permissions = generate_role_permissions()
-    user_access = generate_user_access()
-    payroll_processing = generate_payroll_processing()
-    leave_management = generate_leave_management()
-    employee_attendance = generate_employee_attendance()
-    payroll_reports = generate_payroll_reports()
-
-    # Save datasets to JSON files
-    datasets = {
-        'employee_records.json': employee_records,
-        'payroll_details.json': payroll_details,
-        'role_permissions.json': role_permissions,
-        'user_access.json': user_access,
-        'payroll_processing.json': payroll_processing,
-        'leave_management.json': leave_management,
-        'employee_attendance.json': employee_attendance,
-        'payroll_reports.json': payroll_reports
+        yield report
+
+def generate_payroll_reports(num_records=100):
+    return list(iter_payroll_reports(num_records))
+
+# Generate Leave Management Records as NumPy columns (batch mode)
+def generate_leave_management_batch(num_records=1000, rng=None, keys=None):
+    leave_types = ["Annual", "Sick", "Maternity", "Paternity", "Bereavement", "Unpaid", "Other"]
+    columns = batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['leave_management'])
+    days = (columns['end_date'] - columns['start_date']).astype('timedelta64[D]').astype(np.int64)
+    dates = batch_engine.isoformat_columns(columns)
+    return {
+        "leave_id": id_allocator.id_column(num_records, "LEV", 8),
+        "employee_id": (keys.sample('employee_records', num_records, rng) if keys
+                        else batch_engine.number_id_column(rng, num_records, "EMP", 6)),  # Sampled from employee_records when keys are given
+        "leave_type": batch_engine.choice_column(rng, num_records, leave_types),
+        "start_date": dates["start_date"],
+        "end_date": dates["end_date"],
+        "days": days,
+        "reason": text_engine.column(rng, num_records, 'text'),
+        "status": batch_engine.choice_column(rng, num_records, ["Pending", "Approved", "Rejected", "Cancelled"]),
+        "approved_by": batch_engine.sparse_column(rng, num_records, 0.7,
+                                                  lambda count: value_pools.column(rng, count, "name")),
+        "created_date": dates["start_date"],
+        "last_updated": dates["last_updated"]
     }
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate Employee Attendance Records as NumPy columns (batch mode)
+def generate_employee_attendance_batch(num_records=5000, rng=None, keys=None):
+    columns = batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['employee_attendance'])
+    date = columns['date']
+    day = date.astype('datetime64[D]')
+    second = (date - day).astype(np.int64) % 60
+    check_in = (day + batch_engine.randint_column(rng, num_records, 8, 10).astype('timedelta64[h]')
+                + batch_engine.randint_column(rng, num_records, 0, 59).astype('timedelta64[m]') + second.astype('timedelta64[s]'))
+    check_out = (day + batch_engine.randint_column(rng, num_records, 17, 19).astype('timedelta64[h]')
+                 + batch_engine.randint_column(rng, num_records, 0, 59).astype('timedelta64[m]') + second.astype('timedelta64[s]'))
+    dates = batch_engine.isoformat_columns(dict(columns, check_in=check_in, check_out=check_out))
+    return {
+        "attendance_id": id_allocator.id_column(num_records, "ATT", 8),
+        "employee_id": (keys.sample('employee_records', num_records, rng) if keys
+                        else batch_engine.number_id_column(rng, num_records, "EMP", 6)),  # Sampled from employee_records when keys are given
+        "date": dates["date"],
+        "check_in": dates["check_in"],
+        "check_out": dates["check_out"],
+        "status": batch_engine.choice_column(rng, num_records, ["Present", "Late", "Early Exit", "Half Day", "Absent"]),
+        "remarks": batch_engine.sparse_column(rng, num_records, 0.3, lambda count: text_engine.column(rng, count, 'text')),
+        "created_date": dates["date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Working days for calendar attendance, Monday first (Monday to Saturday)
+WORKWEEK = '1111110'
+
+# How often each status occurs on working days outside approved leave
+ATTENDANCE_STATUS_WEIGHTS = {"Present": 0.84, "Late": 0.06, "Early Exit": 0.03, "Half Day": 0.03, "Absent": 0.04}
+
+# Employees (unique ids with their join dates) and approved leave intervals for
+# calendar attendance, from the employee_records and leave_management files
+def load_attendance_calendar(employees_path, leaves_path):
+    join_dates = {}
+    for employee in dataset_io.read_records(employees_path):
+        join_dates.setdefault(employee["employee_id"], employee["join_date"])
+    index = {employee_id: i for i, employee_id in enumerate(join_dates)}
+    leaves = [leave for leave in dataset_io.read_records(leaves_path)
+              if leave["status"] == "Approved" and leave["employee_id"] in index]
+    leaves.sort(key=lambda leave: index[leave["employee_id"]])
+    return {
+        "employee_id": np.array(list(join_dates), dtype=object),
+        "join_date": np.array(list(join_dates.values()), dtype='datetime64[s]').astype('datetime64[D]'),
+        "leave_employee": np.array([index[leave["employee_id"]] for leave in leaves], dtype=np.int64),
+        "leave_start": np.array([leave["start_date"] for leave in leaves], dtype='datetime64[s]').astype('datetime64[D]'),
+        "leave_end": np.array([leave["end_date"] for leave in leaves], dtype='datetime64[s]').astype('datetime64[D]')
+    }
+
+# Employees lo:hi x days grid that is True where the employee is on approved leave
+def _leave_grid(calendar, lo, hi, days):
+    first, last = np.searchsorted(calendar["leave_employee"], [lo, hi])
+    start, end = calendar["leave_start"][first:last], calendar["leave_end"][first:last]
+    overlaps = (start <= days[-1]) & (end >= days[0])
+    covered = (start[overlaps, None] <= days[None, :]) & (end[overlaps, None] >= days[None, :])
+    leave, day = np.nonzero(covered)
+    grid = np.zeros((hi - lo, len(days)), dtype=bool)
+    grid[calendar["leave_employee"][first:last][overlaps][leave] - lo, day] = True
+    return grid
+
+# Attendance columns for (employee, day) cells; ids come from id_allocator like the
+# per-record generators, so later appends continue the same id sequence
+def _attendance_columns(rng, employee_ids, day, on_leave):
+    n = len(day)
+    statuses = list(ATTENDANCE_STATUS_WEIGHTS)
+    status = np.asarray(statuses, dtype=object)[rng.choice(len(statuses), n, p=list(ATTENDANCE_STATUS_WEIGHTS.values()))]
+    status[on_leave] = "On Leave"
+    midnight = day.astype('datetime64[s]')
+    check_in_minutes = np.where(status == "Late", rng.integers(600, 660, n), rng.integers(480, 600, n))
+    check_out_minutes = np.select([status == "Early Exit", status == "Half Day"],
+                                  [rng.integers(840, 1020, n), rng.integers(780, 840, n)], rng.integers(1020, 1200, n))
+    seconds = rng.integers(0, 60, n).astype('timedelta64[s]')
+    check_in = midnight + check_in_minutes.astype('timedelta64[m]') + seconds
+    check_out = midnight + check_out_minutes.astype('timedelta64[m]') + seconds
+    worked = (status != "Absent") & (status != "On Leave")
+    date = batch_engine.isoformat_column(midnight)
+    check_in_text = batch_engine.isoformat_column(check_in)
+    return {
+        "attendance_id": id_allocator.id_column(n, "ATT", 8),
+        "employee_id": employee_ids,
+        "date": date,
+        "check_in": batch_engine.where_column(worked, check_in_text),
+        "check_out": batch_engine.where_column(worked, batch_engine.isoformat_column(check_out)),
+        "status": status,
+        "remarks": batch_engine.sparse_column(rng, n, 0.3, lambda count: text_engine.column(rng, count, 'text')),
+        "created_date": np.where(worked, check_in_text, date),
+        "last_updated": batch_engine.isoformat_column(batch_engine.offset_column(rng, np.where(worked, check_out, midnight), 1, 5))
+    }
+
+# Generate Employee Attendance as a dense employee x working-day grid (calendar mode),
+# as NumPy columns for one month and block of employees at a time so memory stays
+# bounded by chunk_size. Employees appear from their join date; days inside an
+# approved leave are "On Leave" and absent/leave days have no check-in or check-out.
+def generate_employee_attendance_calendar(calendar, start_date="-1y", end_date="now", rng=None,
+                                          chunk_size=batch_engine.DEFAULT_CHUNK_SIZE, weekmask=WORKWEEK, holidays=()):
+    rng = rng if rng is not None else batch_engine.make_rng()
+    first = np.datetime64(batch_engine.resolve_date(start_date), 'D')
+    last = np.datetime64(batch_engine.resolve_date(end_date), 'D')
+    employee_ids, join_date = calendar["employee_id"], calendar["join_date"]
+    id_allocator.start(0)
+    month = first.astype('datetime64[M]')
+    while month <= last.astype('datetime64[M]'):
+        days = np.arange(max(month.astype('datetime64[D]'), first), min((month + 1).astype('datetime64[D]'), last + 1))
+        days = days[np.is_busday(days, weekmask=weekmask, holidays=holidays)]
+        month += 1
+        if not len(days):
+            continue
+        block = max(1, chunk_size // len(days))
+        for lo in range(0, len(employee_ids), block):
+            hi = min(lo + block, len(employee_ids))
+            employee, day = np.nonzero(join_date[lo:hi, None] <= days[None, :])
+            if not len(employee):
+                continue
+            on_leave = _leave_grid(calendar, lo, hi, days)[employee, day]
+            yield _attendance_columns(rng, employee_ids[lo + employee], days[day], on_leave)
+
+# Write employee_attendance.json in calendar mode from the employee_records and
+# leave_management files already in output_dir; returns the number of rows
+def write_employee_attendance_calendar(output_dir='data', output_format='json', rng=None):
+    calendar = load_attendance_calendar(dataset_io.output_path(output_dir, 'employee_records.json', output_format),
+                                        dataset_io.output_path(output_dir, 'leave_management.json', output_format))
+    records = (record for columns in generate_employee_attendance_calendar(calendar, rng=rng)
+               for record in batch_engine.iter_records(columns))
+    return dataset_io.write_records(dataset_io.output_path(output_dir, 'employee_attendance.json', output_format),
+                                    records, output_format)
+
+# Table generators keyed by output file
+TABLES = {
+    'employee_records.json': generate_employee_records,
+    'payroll_details.json': generate_payroll_details,
+    'role_permissions.json': generate_role_permissions,
+    'user_access.json': generate_user_access,
+    'payroll_processing.json': generate_payroll_processing,
+    'leave_management.json': generate_leave_management,
+    'employee_attendance.json': generate_employee_attendance,
+    'payroll_reports.json': generate_payroll_reports
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'employee_records.json': iter_employee_records,
+    'payroll_details.json': iter_payroll_details,
+    'role_permissions.json': iter_role_permissions,
+    'user_access.json': iter_user_access,
+    'payroll_processing.json': iter_payroll_processing,
+    'leave_management.json': iter_leave_management,
+    'employee_attendance.json': iter_employee_attendance,
+    'payroll_reports.json': iter_payroll_reports
+}
+
+# Column generators used instead of TABLES in batch mode
+BATCH_TABLES = {
+    'leave_management.json': generate_leave_management_batch,
+    'employee_attendance.json': generate_employee_attendance_batch
+}
+
+# Tables that can be generated whole from other tables' output instead of by row count
+CALENDAR_TABLES = {
+    'employee_attendance.json': write_employee_attendance_calendar
+}
+
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(batch=False, output_format='json', key_distribution='uniform', calendar=False):
+    rng = batch_engine.make_rng()
+    keys = key_registry.KeyRegistry(key_distribution)
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        table = key_registry.table_name(filename)
+        if calendar and filename in CALENDAR_TABLES:
+            CALENDAR_TABLES[filename]('data', output_format, rng=rng)
+            continue
+        num_records = batch_engine.table_size(generator)
+        options = {'keys': keys} if key_registry.parents(table) else {}
+        if batch and filename in BATCH_TABLES:
+            records = batch_engine.iter_batch_records(BATCH_TABLES[filename], num_records, rng=rng, **options)
+        else:
+            records = ITER_TABLES[filename](num_records, **options)
+        if table in key_registry.PARENT_TABLES:
+            records = keys.collect(table, records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
-    print("All HR & Admin datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', action='store_true', help="Generate high-volume tables as NumPy columns")
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    parser.add_argument('--calendar', action='store_true',
+                        help="Build employee_attendance as an employee x working-day grid honouring approved leave")
+    args = parser.parse_args()
+    generate_all_datasets(batch=args.batch, output_format=args.format, key_distribution=args.key_distribution,
+                          calendar=args.calendar)
+    print("All HR & Admin datasets have been generated successfully in the 'data' folder!")
\ No newline at end of file
@@ -1,8 +1,10 @@
-import json
 import os
 import random
+import argparse
 from datetime import datetime, timedelta
 
+import dataset_io
+
 # Constants for data generation
 MODULES = ['Sales', 'Purchase', 'Finance', 'Inventory', 'HR', 'GST']
 GST_TYPES = ['CGST', 'SGST', 'IGST', 'UTGST']
@@ -160,9 +162,8 @@ def generate_structured_response(query: dict) -> str:
     
     return response.format(**placeholder_values)
 
-def generate_faq_dataset(num_records=200):
+def iter_faq_dataset(num_records=200):
     """Generate FAQ dataset"""
-    faqs = []
     for _ in range(num_records):
         module = random.choice(MODULES)
         query = generate_structured_query(module)
@@ -176,12 +177,14 @@ def generate_faq_dataset(num_records=200):
             "transaction_type": query["transaction_type"],
             "user_role": query["user_role"]
         }
-        faqs.append(faq)
-    return faqs
+        yield faq
 
-def generate_conversation_dataset(num_records=200):
+def generate_faq_dataset(num_records=200):
+    """Generate FAQ dataset as a list"""
+    return list(iter_faq_dataset(num_records))
+
+def iter_conversation_dataset(num_records=200):
     """Generate conversation dataset"""
-    conversations = []
     for _ in range(num_records):
         module = random.choice(MODULES)
         initial_query = generate_structured_query(module)
@@ -211,26 +214,42 @@ def generate_conversation_dataset(num_records=200):
                 "timestamp": (datetime.now() + timedelta(minutes=turn*5)).isoformat()
             })
         
-        conversations.append(conversation)
-    return conversations
-
-def generate_all_datasets():
-    """Generate all datasets"""
-    datasets = {
-        'faqs.json': generate_faq_dataset(200),
-        'conversations.json': generate_conversation_dataset(200)
-    }
+        yield conversation
 
+def generate_conversation_dataset(num_records=200):
+    """Generate conversation dataset as a list"""
+    return list(iter_conversation_dataset(num_records))
+
+# Table generators keyed by output file
+TABLES = {
+    'faqs.json': generate_faq_dataset,
+    'conversations.json': generate_conversation_dataset
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'faqs.json': iter_faq_dataset,
+    'conversations.json': iter_conversation_dataset
+}
+
+# Ids are numbered by row position, so these tables are generated in one piece
+UNSHARDED_TABLES = {'faqs.json', 'conversations.json'}
+
+def generate_all_datasets(output_format='json'):
+    """Generate all datasets and stream them to disk"""
     if not os.path.exists('data'):
         os.makedirs('data')
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    for filename, generator in ITER_TABLES.items():
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), generator(),
+                                 output_format, ensure_ascii=False)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    args = parser.parse_args()
     print("Starting data generation...")
-    generate_all_datasets()
+    generate_all_datasets(output_format=args.format)
     print("All datasets have been generated successfully in the 'data' folder!")
 
     # import json
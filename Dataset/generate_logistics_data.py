@@ -1,8 +1,12 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,30 +15,61 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'shipping_modes': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'transport_partners': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'sales_dispatches': {
+        'dispatch_date': ("-1y", "now"),
+        'expected_delivery_date': ('dispatch_date', 1, 30),
+        'last_updated': ('dispatch_date', 1, 10)
+    },
+    'advance_shipment_notices': {
+        'asn_date': ("-1y", "now"),
+        'expected_arrival_date': ('asn_date', 1, 30),
+        'last_updated': ('asn_date', 1, 10)
+    },
+    'dispatch_status_reports': {
+        'report_date': ("-1y", "now"),
+        'estimated_delivery_date': ('report_date', 1, 10),
+        'last_updated': ('report_date', 1, 24, 'h')
+    },
+    'sales_register': {
+        'sale_date': ("-1y", "now"),
+        'last_updated': ('sale_date', 1, 10)
+    }
+}
+
 # Generate Shipping Modes
-def generate_shipping_modes(num_records=20):
-    modes = []
-    for _ in range(num_records):
+def iter_shipping_modes(num_records=20):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['shipping_modes']):
         mode = {
             "mode_id": fake.uuid4(),
             "mode_code": f"SHM{fake.random_number(digits=6)}",
             "mode_name": random.choice(["Road Transport", "Rail Transport", "Air Freight", "Sea Freight", "Express Delivery"]),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'dispatch'),
             "transit_time_days": random.randint(1, 30),
             "cost_per_kg": round(random.uniform(10, 1000), 2),
             "max_weight_kg": random.randint(100, 10000),
             "max_volume_cbm": round(random.uniform(1, 100), 2),
             "is_active": random.choice([True, False]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        modes.append(mode)
-    return modes
+        yield mode
+
+def generate_shipping_modes(num_records=20):
+    return list(iter_shipping_modes(num_records))
 
 # Generate Transport Partners
-def generate_transport_partners(num_records=100):
-    partners = []
-    for _ in range(num_records):
+def iter_transport_partners(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['transport_partners']):
         partner = {
             "partner_id": fake.uuid4(),
             "partner_code": f"TP{fake.random_number(digits=8)}",
@@ -49,23 +84,23 @@ def generate_transport_partners(num_records=100):
             "shipping_modes": random.sample([f"SHM{fake.random_number(digits=6)}" for _ in range(5)], random.randint(1, 5)),
             "rating": round(random.uniform(1, 5), 1),
             "status": random.choice(["Active", "Inactive", "Suspended"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        partners.append(partner)
-    return partners
+        yield partner
+
+def generate_transport_partners(num_records=100):
+    return list(iter_transport_partners(num_records))
 
 # Generate Sales Order Dispatches (DRN)
-def generate_sales_dispatches(num_records=1000):
-    dispatches = []
-    for _ in range(num_records):
-        dispatch_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_sales_dispatches(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['sales_dispatches']):
         dispatch = {
-            "drn_id": f"DRN{fake.random_number(digits=8)}",
+            "drn_id": id_allocator.next_id("DRN", 8),
             "order_id": f"SO{fake.random_number(digits=8)}",  # This should match with sales_orders
             "customer_id": fake.uuid4(),  # This should match with customer_master
-            "dispatch_date": dispatch_date.isoformat(),
-            "expected_delivery_date": (dispatch_date + timedelta(days=random.randint(1, 30))).isoformat(),
+            "dispatch_date": dates["dispatch_date"],
+            "expected_delivery_date": dates["expected_delivery_date"],
             "transport_partner_id": fake.uuid4(),  # This should match with transport_partners
             "shipping_mode_id": fake.uuid4(),  # This should match with shipping_modes
             "vehicle_number": f"VEH{fake.random_number(digits=6)}",
@@ -76,25 +111,26 @@ def generate_sales_dispatches(num_records=1000):
             "total_volume_cbm": round(random.uniform(1, 50), 2),
             "status": random.choice(["Pending", "In Transit", "Delivered", "Cancelled"]),
             "tracking_number": fake.uuid4(),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'dispatch'),
             "created_by": fake.name(),
-            "created_date": dispatch_date.isoformat(),
-            "last_updated": (dispatch_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["dispatch_date"],
+            "last_updated": dates["last_updated"]
         }
-        dispatches.append(dispatch)
-    return dispatches
+        yield dispatch
+
+def generate_sales_dispatches(num_records=1000):
+    return list(iter_sales_dispatches(num_records))
 
 # Generate Advance Shipment Notices (ASN)
-def generate_advance_shipment_notices(num_records=500):
-    asns = []
-    for _ in range(num_records):
-        asn_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_advance_shipment_notices(num_records=500, keys=None):
+    drn_ids = keys.iter_sample('sales_dispatches', num_records) if keys else None
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['advance_shipment_notices']):
         asn = {
-            "asn_id": f"ASN{fake.random_number(digits=8)}",
-            "drn_id": f"DRN{fake.random_number(digits=8)}",  # This should match with sales_dispatches
+            "asn_id": id_allocator.next_id("ASN", 8),
+            "drn_id": next(drn_ids) if keys else f"DRN{fake.random_number(digits=8)}",  # Sampled from sales_dispatches when keys are given
             "customer_id": fake.uuid4(),  # This should match with customer_master
-            "asn_date": asn_date.isoformat(),
-            "expected_arrival_date": (asn_date + timedelta(days=random.randint(1, 30))).isoformat(),
+            "asn_date": dates["asn_date"],
+            "expected_arrival_date": dates["expected_arrival_date"],
             "transport_partner_id": fake.uuid4(),  # This should match with transport_partners
             "shipping_mode_id": fake.uuid4(),  # This should match with shipping_modes
             "vehicle_number": f"VEH{fake.random_number(digits=6)}",
@@ -105,45 +141,45 @@ def generate_advance_shipment_notices(num_records=500):
             "total_volume_cbm": round(random.uniform(1, 50), 2),
             "status": random.choice(["Pending", "In Transit", "Delivered", "Cancelled"]),
             "tracking_number": fake.uuid4(),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'dispatch'),
             "created_by": fake.name(),
-            "created_date": asn_date.isoformat(),
-            "last_updated": (asn_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["asn_date"],
+            "last_updated": dates["last_updated"]
         }
-        asns.append(asn)
-    return asns
+        yield asn
+
+def generate_advance_shipment_notices(num_records=500, keys=None):
+    return list(iter_advance_shipment_notices(num_records, keys))
 
 # Generate Dispatch Status Reports
-def generate_dispatch_status_reports(num_records=1000):
-    reports = []
-    for _ in range(num_records):
-        report_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_dispatch_status_reports(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['dispatch_status_reports']):
         report = {
-            "report_id": f"DSR{fake.random_number(digits=8)}",
+            "report_id": id_allocator.next_id("DSR", 8),
             "drn_id": f"DRN{fake.random_number(digits=8)}",  # This should match with sales_dispatches
-            "report_date": report_date.isoformat(),
+            "report_date": dates["report_date"],
             "current_location": fake.city(),
             "current_status": random.choice(["In Transit", "At Hub", "Out for Delivery", "Delivered"]),
-            "estimated_delivery_date": (report_date + timedelta(days=random.randint(1, 10))).isoformat(),
+            "estimated_delivery_date": dates["estimated_delivery_date"],
             "delay_reason": random.choice(["Traffic", "Weather", "Vehicle Breakdown", "Customer Not Available", "None"]) if random.choice([True, False]) else None,
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'dispatch'),
             "created_by": fake.name(),
-            "created_date": report_date.isoformat(),
-            "last_updated": (report_date + timedelta(hours=random.randint(1, 24))).isoformat()
+            "created_date": dates["report_date"],
+            "last_updated": dates["last_updated"]
         }
-        reports.append(report)
-    return reports
+        yield report
+
+def generate_dispatch_status_reports(num_records=1000):
+    return list(iter_dispatch_status_reports(num_records))
 
 # Generate Sales Register
-def generate_sales_register(num_records=1000):
-    register = []
-    for _ in range(num_records):
-        sale_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_sales_register(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['sales_register']):
         sale = {
-            "sale_id": f"SALE{fake.random_number(digits=8)}",
+            "sale_id": id_allocator.next_id("SALE", 8),
             "order_id": f"SO{fake.random_number(digits=8)}",  # This should match with sales_orders
             "customer_id": fake.uuid4(),  # This should match with customer_master
-            "sale_date": sale_date.isoformat(),
+            "sale_date": dates["sale_date"],
             "product_code": f"PRD{fake.random_number(digits=8)}",  # This should match with sku_master
             "quantity": random.randint(1, 1000),
             "unit_price": round(random.uniform(100, 10000), 2),
@@ -154,36 +190,51 @@ def generate_sales_register(num_records=1000):
             "payment_status": random.choice(["Pending", "Partial", "Completed"]),
             "payment_terms": random.choice(["Net 30", "Net 45", "Net 60", "Immediate"]),
             "created_by": fake.name(),
-            "created_date": sale_date.isoformat(),
-            "last_updated": (sale_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["sale_date"],
+            "last_updated": dates["last_updated"]
         }
-        register.append(sale)
-    return register
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    shipping_modes = generate_shipping_modes()
-    transport_partners = generate_transport_partners()
-    sales_dispatches = generate_sales_dispatches()
-    advance_shipment_notices = generate_advance_shipment_notices()
-    dispatch_status_reports = generate_dispatch_status_reports()
-    sales_register = generate_sales_register()
-
-    # Save datasets to JSON files
-    datasets = {
-        'shipping_modes.json': shipping_modes,
-        'transport_partners.json': transport_partners,
-        'sales_dispatches.json': sales_dispatches,
-        'advance_shipment_notices.json': advance_shipment_notices,
-        'dispatch_status_reports.json': dispatch_status_reports,
-        'sales_register.json': sales_register
-    }
+        yield sale
+
+def generate_sales_register(num_records=1000):
+    return list(iter_sales_register(num_records))
+
+# Table generators keyed by output file
+TABLES = {
+    'shipping_modes.json': generate_shipping_modes,
+    'transport_partners.json': generate_transport_partners,
+    'sales_dispatches.json': generate_sales_dispatches,
+    'advance_shipment_notices.json': generate_advance_shipment_notices,
+    'dispatch_status_reports.json': generate_dispatch_status_reports,
+    'sales_register.json': generate_sales_register
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'shipping_modes.json': iter_shipping_modes,
+    'transport_partners.json': iter_transport_partners,
+    'sales_dispatches.json': iter_sales_dispatches,
+    'advance_shipment_notices.json': iter_advance_shipment_notices,
+    'dispatch_status_reports.json': iter_dispatch_status_reports,
+    'sales_register.json': iter_sales_register
+}
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(output_format='json', key_distribution='uniform'):
+    keys = key_registry.KeyRegistry(key_distribution)
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        table = key_registry.table_name(filename)
+        options = {'keys': keys} if key_registry.parents(table) else {}
+        records = ITER_TABLES[filename](batch_engine.table_size(generator), **options)
+        if table in key_registry.PARENT_TABLES:
+            records = keys.collect(table, records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    args = parser.parse_args()
+    generate_all_datasets(output_format=args.format, key_distribution=args.key_distribution)
     print("All dispatch and logistics module datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
@@ -1,8 +1,13 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import value_pools
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,13 +16,48 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'raw_material_master': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'process_definitions': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'batch_cards': {
+        'start_date': ("-1y", "now"),
+        'planned_end_date': ('start_date', 1, 30),
+        'actual_end_date': ('start_date', 1, 30),
+        'last_updated': ('start_date', 1, 10)
+    },
+    'work_orders': {
+        'order_date': ("-1y", "now"),
+        'planned_start_date': ('order_date', 1, 5),
+        'planned_end_date': ('order_date', 6, 30),
+        'actual_start_date': ('order_date', 1, 5),
+        'actual_end_date': ('order_date', 6, 30),
+        'last_updated': ('order_date', 1, 10)
+    },
+    'job_cards': {
+        'start_time': ("-1y", "now"),
+        'end_time': ('start_time', 1, 8, 'h'),
+        'last_updated': ('start_time', 1, 8, 'h')
+    },
+    'production_inventory': {
+        'created_date': ("-1y", "now"),
+        'last_updated': ('created_date', 1, 5),
+        'last_movement_date': ("-1y", "now")
+    }
+}
+
 # Generate Raw Material Master Data
-def generate_raw_material_master(num_records=1000):
-    materials = []
+def iter_raw_material_master(num_records=1000):
     categories = ["Chemicals", "Metals", "Plastics", "Textiles", "Electronics", "Packaging"]
     product_types = ["Raw", "Processed", "Refined", "Basic", "Premium", "Industrial"]
     
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['raw_material_master']):
         # Generate a realistic material name by combining words
         material_name = f"{random.choice(product_types)} {random.choice(categories)} {fake.word()}"
         
@@ -26,7 +66,7 @@ def generate_raw_material_master(num_records=1000):
             "material_code": f"RM{fake.random_number(digits=8)}",
             "material_name": material_name,  # Using our custom material name
             "category": random.choice(categories),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "unit_of_measure": random.choice(["KG", "PCS", "MTR", "LTR", "BOX"]),
             "standard_cost": round(random.uniform(100, 10000), 2),
             "minimum_stock": random.randint(100, 1000),
@@ -40,22 +80,23 @@ def generate_raw_material_master(num_records=1000):
                 "parameter3": random.choice(["Size", "Shape", "Hardness", "Flexibility"])
             },
             "status": random.choice(["Active", "Discontinued", "Under Review"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        materials.append(material)
-    return materials
+        yield material
+
+def generate_raw_material_master(num_records=1000):
+    return list(iter_raw_material_master(num_records))
 
 # Generate Production Process Definitions
-def generate_process_definitions(num_records=100):
-    processes = []
+def iter_process_definitions(num_records=100):
     process_types = ["Assembly", "Mixing", "Molding", "Cutting", "Welding", "Testing", "Packaging"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['process_definitions']):
         process = {
             "process_id": fake.uuid4(),
             "process_code": f"PRC{fake.random_number(digits=8)}",
             "process_name": random.choice(process_types),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "standard_time_minutes": random.randint(5, 480),
             "setup_time_minutes": random.randint(5, 120),
             "cleanup_time_minutes": random.randint(5, 60),
@@ -67,92 +108,94 @@ def generate_process_definitions(num_records=100):
                 "max": random.randint(25, 35)
             } if random.choice([True, False]) else None,
             "status": random.choice(["Active", "Inactive", "Under Review"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        processes.append(process)
-    return processes
+        yield process
+
+def generate_process_definitions(num_records=100):
+    return list(iter_process_definitions(num_records))
 
 # Generate Batch Card Entries
-def generate_batch_cards(num_records=1000):
-    batches = []
-    for _ in range(num_records):
-        batch_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_batch_cards(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['batch_cards']):
         batch = {
-            "batch_id": f"BCH{fake.random_number(digits=8)}",
+            "batch_id": id_allocator.next_id("BCH", 8),
             "product_code": f"PRD{fake.random_number(digits=8)}",
             "batch_number": f"B{fake.random_number(digits=6)}",
-            "start_date": batch_date.isoformat(),
-            "planned_end_date": (batch_date + timedelta(days=random.randint(1, 30))).isoformat(),
-            "actual_end_date": (batch_date + timedelta(days=random.randint(1, 30))).isoformat(),
+            "start_date": dates["start_date"],
+            "planned_end_date": dates["planned_end_date"],
+            "actual_end_date": dates["actual_end_date"],
             "planned_quantity": random.randint(100, 10000),
             "actual_quantity": random.randint(100, 10000),
             "status": random.choice(["Planned", "In Progress", "Completed", "Cancelled", "On Hold"]),
             "quality_status": random.choice(["Pending", "Passed", "Failed", "Under Review"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": batch_date.isoformat(),
-            "last_updated": (batch_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["start_date"],
+            "last_updated": dates["last_updated"]
         }
-        batches.append(batch)
-    return batches
+        yield batch
+
+def generate_batch_cards(num_records=1000):
+    return list(iter_batch_cards(num_records))
 
 # Generate Work Orders
-def generate_work_orders(num_records=1000):
-    orders = []
-    for _ in range(num_records):
-        order_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_work_orders(num_records=1000, keys=None):
+    batch_ids = keys.iter_sample('batch_cards', num_records) if keys else None
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['work_orders']):
         order = {
-            "work_order_id": f"WO{fake.random_number(digits=8)}",
-            "batch_id": f"BCH{fake.random_number(digits=8)}",  # This should match with batch_cards
+            "work_order_id": id_allocator.next_id("WO", 8),
+            "batch_id": next(batch_ids) if keys else f"BCH{fake.random_number(digits=8)}",  # Sampled from batch_cards when keys are given
             "process_id": fake.uuid4(),  # This should match with process_definitions
-            "order_date": order_date.isoformat(),
-            "planned_start_date": (order_date + timedelta(days=random.randint(1, 5))).isoformat(),
-            "planned_end_date": (order_date + timedelta(days=random.randint(6, 30))).isoformat(),
-            "actual_start_date": (order_date + timedelta(days=random.randint(1, 5))).isoformat(),
-            "actual_end_date": (order_date + timedelta(days=random.randint(6, 30))).isoformat(),
+            "order_date": dates["order_date"],
+            "planned_start_date": dates["planned_start_date"],
+            "planned_end_date": dates["planned_end_date"],
+            "actual_start_date": dates["actual_start_date"],
+            "actual_end_date": dates["actual_end_date"],
             "planned_quantity": random.randint(100, 10000),
             "actual_quantity": random.randint(100, 10000),
             "status": random.choice(["Planned", "In Progress", "Completed", "Cancelled", "On Hold"]),
             "priority": random.choice(["Low", "Medium", "High", "Urgent"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": order_date.isoformat(),
-            "last_updated": (order_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["order_date"],
+            "last_updated": dates["last_updated"]
         }
-        orders.append(order)
-    return orders
+        yield order
+
+def generate_work_orders(num_records=1000, keys=None):
+    return list(iter_work_orders(num_records, keys))
 
 # Generate Job Card Entries
-def generate_job_cards(num_records=2000):
-    jobs = []
-    for _ in range(num_records):
-        job_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_job_cards(num_records=2000, keys=None):
+    work_order_ids = keys.iter_sample('work_orders', num_records) if keys else None
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['job_cards']):
         job = {
-            "job_card_id": f"JC{fake.random_number(digits=8)}",
-            "work_order_id": f"WO{fake.random_number(digits=8)}",  # This should match with work_orders
+            "job_card_id": id_allocator.next_id("JC", 8),
+            "work_order_id": next(work_order_ids) if keys else f"WO{fake.random_number(digits=8)}",  # Sampled from work_orders when keys are given
             "operator_id": f"OP{fake.random_number(digits=6)}",
             "machine_id": f"MCH{fake.random_number(digits=6)}",
-            "start_time": job_date.isoformat(),
-            "end_time": (job_date + timedelta(hours=random.randint(1, 8))).isoformat(),
+            "start_time": dates["start_time"],
+            "end_time": dates["end_time"],
             "planned_quantity": random.randint(10, 1000),
             "actual_quantity": random.randint(10, 1000),
             "rejected_quantity": random.randint(0, 50),
             "status": random.choice(["In Progress", "Completed", "Paused", "Cancelled"]),
             "quality_status": random.choice(["Pending", "Passed", "Failed", "Under Review"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": job_date.isoformat(),
-            "last_updated": (job_date + timedelta(hours=random.randint(1, 8))).isoformat()
+            "created_date": dates["start_time"],
+            "last_updated": dates["last_updated"]
         }
-        jobs.append(job)
-    return jobs
+        yield job
+
+def generate_job_cards(num_records=2000, keys=None):
+    return list(iter_job_cards(num_records, keys))
 
 # Generate Production Inventory
-def generate_production_inventory(num_records=1000):
-    inventory = []
-    for _ in range(num_records):
-        inventory_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_production_inventory(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['production_inventory']):
         inventory_entry = {
             "inventory_id": fake.uuid4(),
             "product_code": f"PRD{fake.random_number(digits=8)}",
@@ -162,37 +205,148 @@ def generate_production_inventory(num_records=1000):
             "unit_of_measure": random.choice(["KG", "PCS", "MTR", "LTR", "BOX"]),
             "status": random.choice(["Available", "Reserved", "In Transit", "Blocked"]),
             "quality_status": random.choice(["Pending", "Passed", "Failed", "Under Review"]),
-            "last_movement_date": fake.date_time_between(start_date="-1y", end_date="now").isoformat(),
-            "created_date": inventory_date.isoformat(),
-            "last_updated": (inventory_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "last_movement_date": dates["last_movement_date"],
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        inventory.append(inventory_entry)
-    return inventory
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    raw_material_master = generate_raw_material_master()
-    process_definitions = generate_process_definitions()
-    batch_cards = generate_batch_cards()
-    work_orders = generate_work_orders()
-    job_cards = generate_job_cards()
-    production_inventory = generate_production_inventory()
-
-    # Save datasets to JSON files
-    datasets = {
-        'raw_material_master.json': raw_material_master,
-        'process_definitions.json': process_definitions,
-        'batch_cards.json': batch_cards,
-        'work_orders.json': work_orders,
-        'job_cards.json': job_cards,
-        'production_inventory.json': production_inventory
+        yield inventory_entry
+
+def generate_production_inventory(num_records=1000):
+    return list(iter_production_inventory(num_records))
+
+# Generate Batch Card Entries as NumPy columns (batch mode)
+def generate_batch_cards_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['batch_cards']))
+    return {
+        "batch_id": id_allocator.id_column(num_records, "BCH", 8),
+        "product_code": batch_engine.number_id_column(rng, num_records, "PRD", 8),
+        "batch_number": batch_engine.number_id_column(rng, num_records, "B", 6),
+        "start_date": dates["start_date"],
+        "planned_end_date": dates["planned_end_date"],
+        "actual_end_date": dates["actual_end_date"],
+        "planned_quantity": batch_engine.randint_column(rng, num_records, 100, 10000),
+        "actual_quantity": batch_engine.randint_column(rng, num_records, 100, 10000),
+        "status": batch_engine.choice_column(rng, num_records, ["Planned", "In Progress", "Completed", "Cancelled", "On Hold"]),
+        "quality_status": batch_engine.choice_column(rng, num_records, ["Pending", "Passed", "Failed", "Under Review"]),
+        "remarks": text_engine.column(rng, num_records, 'text'),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["start_date"],
+        "last_updated": dates["last_updated"]
     }
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate Work Orders as NumPy columns (batch mode)
+def generate_work_orders_batch(num_records=1000, rng=None, keys=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['work_orders']))
+    return {
+        "work_order_id": id_allocator.id_column(num_records, "WO", 8),
+        "batch_id": (keys.sample('batch_cards', num_records, rng) if keys
+                     else batch_engine.number_id_column(rng, num_records, "BCH", 8)),  # Sampled from batch_cards when keys are given
+        "process_id": batch_engine.uuid4_column(rng, num_records),  # This should match with process_definitions
+        "order_date": dates["order_date"],
+        "planned_start_date": dates["planned_start_date"],
+        "planned_end_date": dates["planned_end_date"],
+        "actual_start_date": dates["actual_start_date"],
+        "actual_end_date": dates["actual_end_date"],
+        "planned_quantity": batch_engine.randint_column(rng, num_records, 100, 10000),
+        "actual_quantity": batch_engine.randint_column(rng, num_records, 100, 10000),
+        "status": batch_engine.choice_column(rng, num_records, ["Planned", "In Progress", "Completed", "Cancelled", "On Hold"]),
+        "priority": batch_engine.choice_column(rng, num_records, ["Low", "Medium", "High", "Urgent"]),
+        "remarks": text_engine.column(rng, num_records, 'text'),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["order_date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Generate Job Card Entries as NumPy columns (batch mode)
+def generate_job_cards_batch(num_records=2000, rng=None, keys=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['job_cards']))
+    return {
+        "job_card_id": id_allocator.id_column(num_records, "JC", 8),
+        "work_order_id": (keys.sample('work_orders', num_records, rng) if keys
+                          else batch_engine.number_id_column(rng, num_records, "WO", 8)),  # Sampled from work_orders when keys are given
+        "operator_id": batch_engine.number_id_column(rng, num_records, "OP", 6),
+        "machine_id": batch_engine.number_id_column(rng, num_records, "MCH", 6),
+        "start_time": dates["start_time"],
+        "end_time": dates["end_time"],
+        "planned_quantity": batch_engine.randint_column(rng, num_records, 10, 1000),
+        "actual_quantity": batch_engine.randint_column(rng, num_records, 10, 1000),
+        "rejected_quantity": batch_engine.randint_column(rng, num_records, 0, 50),
+        "status": batch_engine.choice_column(rng, num_records, ["In Progress", "Completed", "Paused", "Cancelled"]),
+        "quality_status": batch_engine.choice_column(rng, num_records, ["Pending", "Passed", "Failed", "Under Review"]),
+        "remarks": text_engine.column(rng, num_records, 'text'),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["start_time"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Generate Production Inventory as NumPy columns (batch mode)
+def generate_production_inventory_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['production_inventory']))
+    return {
+        "inventory_id": batch_engine.uuid4_column(rng, num_records),
+        "product_code": batch_engine.number_id_column(rng, num_records, "PRD", 8),
+        "batch_id": batch_engine.number_id_column(rng, num_records, "BCH", 8),  # This should match with batch_cards
+        "location": batch_engine.choice_column(rng, num_records, ["Raw Material Store", "Work in Progress", "Finished Goods", "Quality Control"]),
+        "quantity": batch_engine.randint_column(rng, num_records, 0, 10000),
+        "unit_of_measure": batch_engine.choice_column(rng, num_records, ["KG", "PCS", "MTR", "LTR", "BOX"]),
+        "status": batch_engine.choice_column(rng, num_records, ["Available", "Reserved", "In Transit", "Blocked"]),
+        "quality_status": batch_engine.choice_column(rng, num_records, ["Pending", "Passed", "Failed", "Under Review"]),
+        "last_movement_date": dates["last_movement_date"],
+        "created_date": dates["created_date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Table generators keyed by output file
+TABLES = {
+    'raw_material_master.json': generate_raw_material_master,
+    'process_definitions.json': generate_process_definitions,
+    'batch_cards.json': generate_batch_cards,
+    'work_orders.json': generate_work_orders,
+    'job_cards.json': generate_job_cards,
+    'production_inventory.json': generate_production_inventory
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'raw_material_master.json': iter_raw_material_master,
+    'process_definitions.json': iter_process_definitions,
+    'batch_cards.json': iter_batch_cards,
+    'work_orders.json': iter_work_orders,
+    'job_cards.json': iter_job_cards,
+    'production_inventory.json': iter_production_inventory
+}
+
+# Column generators used instead of TABLES in batch mode
+BATCH_TABLES = {
+    'batch_cards.json': generate_batch_cards_batch,
+    'work_orders.json': generate_work_orders_batch,
+    'job_cards.json': generate_job_cards_batch,
+    'production_inventory.json': generate_production_inventory_batch
+}
+
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(batch=False, output_format='json', key_distribution='uniform'):
+    rng = batch_engine.make_rng()
+    keys = key_registry.KeyRegistry(key_distribution)
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        table = key_registry.table_name(filename)
+        num_records = batch_engine.table_size(generator)
+        options = {'keys': keys} if key_registry.parents(table) else {}
+        if batch and filename in BATCH_TABLES:
+            records = batch_engine.iter_batch_records(BATCH_TABLES[filename], num_records, rng=rng, **options)
+        else:
+            records = ITER_TABLES[filename](num_records, **options)
+        if table in key_registry.PARENT_TABLES:
+            records = keys.collect(table, records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', action='store_true', help="Generate high-volume tables as NumPy columns")
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    args = parser.parse_args()
+    generate_all_datasets(batch=args.batch, output_format=args.format, key_distribution=args.key_distribution)
     print("All production module datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
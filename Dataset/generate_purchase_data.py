@@ -1,8 +1,11 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import batch_engine
+import dataset_io
+import id_allocator
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,10 +14,39 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'supplier_master': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'item_master': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'purchase_orders': {
+        'order_date': ("-1y", "now"),
+        'expected_delivery_date': ('order_date', 1, 30),
+        'last_updated': ('order_date', 1, 10)
+    },
+    'grn': {
+        'receipt_date': ("-1y", "now"),
+        'last_updated': ('receipt_date', 1, 5)
+    },
+    'job_work_orders': {
+        'order_date': ("-1y", "now"),
+        'expected_completion_date': ('order_date', 5, 60),
+        'last_updated': ('order_date', 1, 10)
+    },
+    'purchase_debit_notes': {
+        'note_date': ("-1y", "now"),
+        'last_updated': ('note_date', 1, 10)
+    }
+}
+
 # Generate Supplier Master Data
-def generate_supplier_master(num_records=1000):
-    suppliers = []
-    for _ in range(num_records):
+def iter_supplier_master(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['supplier_master']):
         supplier = {
             "supplier_id": fake.uuid4(),
             "supplier_name": fake.company(),
@@ -36,25 +68,26 @@ def generate_supplier_master(num_records=1000):
                 "ifsc_code": f"IFSC{fake.random_number(digits=8)}"
             },
             "status": random.choice(["Active", "Inactive", "Blocked"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        suppliers.append(supplier)
-    return suppliers
+        yield supplier
+
+def generate_supplier_master(num_records=1000):
+    return list(iter_supplier_master(num_records))
 
 # Generate Item Master Data
-def generate_item_master(num_records=1000):
-    items = []
+def iter_item_master(num_records=1000):
     categories = ["Raw Materials", "Packaging", "Machinery", "Spare Parts", "Consumables", "Services"]
     units = ["KG", "PCS", "MTR", "LTR", "BOX", "SET", "HRS"]
     
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['item_master']):
         item = {
             "item_id": fake.uuid4(),
             "item_code": f"ITEM{fake.random_number(digits=8)}",
-            "item_name": fake.product_name(),
+            "item_name": f"{fake.word().title()} {random.choice(categories).rstrip('s')}",
             "category": random.choice(categories),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "unit_of_measure": random.choice(units),
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
             "gst_percentage": random.choice([0, 5, 12, 18, 28]),
@@ -63,125 +96,133 @@ def generate_item_master(num_records=1000):
             "lead_time_days": random.randint(1, 30),
             "reorder_level": random.randint(10, 100),
             "status": random.choice(["Active", "Discontinued", "Out of Stock"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        items.append(item)
-    return items
+        yield item
+
+def generate_item_master(num_records=1000):
+    return list(iter_item_master(num_records))
 
 # Generate Purchase Orders
-def generate_purchase_orders(num_records=1000):
-    orders = []
-    for _ in range(num_records):
-        order_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_purchase_orders(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['purchase_orders']):
         order = {
-            "po_id": f"PO{fake.random_number(digits=8)}",
+            "po_id": id_allocator.next_id("PO", 8),
             "supplier_id": fake.uuid4(),  # This should match with supplier_master
-            "order_date": order_date.isoformat(),
-            "expected_delivery_date": (order_date + timedelta(days=random.randint(1, 30))).isoformat(),
+            "order_date": dates["order_date"],
+            "expected_delivery_date": dates["expected_delivery_date"],
             "order_status": random.choice(["Draft", "Sent", "Acknowledged", "In Transit", "Received", "Cancelled"]),
             "payment_status": random.choice(["Pending", "Partial", "Completed"]),
             "total_amount": round(random.uniform(10000, 500000), 2),
             "tax_amount": round(random.uniform(1000, 50000), 2),
             "shipping_amount": round(random.uniform(500, 5000), 2),
             "grand_total": round(random.uniform(11500, 555000), 2),
-            "terms_and_conditions": fake.text(max_nb_chars=500),
+            "terms_and_conditions": text_engine.text('long_text'),
             "created_by": fake.name(),
-            "created_date": order_date.isoformat(),
-            "last_updated": (order_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["order_date"],
+            "last_updated": dates["last_updated"]
         }
-        orders.append(order)
-    return orders
+        yield order
+
+def generate_purchase_orders(num_records=1000):
+    return list(iter_purchase_orders(num_records))
 
 # Generate Goods Receipt Notes
-def generate_grn(num_records=1000):
-    grns = []
-    for _ in range(num_records):
-        grn_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_grn(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['grn']):
         grn = {
-            "grn_id": f"GRN{fake.random_number(digits=8)}",
+            "grn_id": id_allocator.next_id("GRN", 8),
             "po_id": f"PO{fake.random_number(digits=8)}",  # This should match with purchase_orders
             "supplier_id": fake.uuid4(),  # This should match with supplier_master
-            "receipt_date": grn_date.isoformat(),
+            "receipt_date": dates["receipt_date"],
             "receipt_status": random.choice(["Partial", "Complete", "Rejected"]),
             "quality_status": random.choice(["Accepted", "Rejected", "Under Review"]),
             "total_quantity": random.randint(10, 1000),
             "total_amount": round(random.uniform(10000, 500000), 2),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": grn_date.isoformat(),
-            "last_updated": (grn_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["receipt_date"],
+            "last_updated": dates["last_updated"]
         }
-        grns.append(grn)
-    return grns
+        yield grn
+
+def generate_grn(num_records=1000):
+    return list(iter_grn(num_records))
 
 # Generate Job Work Orders
-def generate_job_work_orders(num_records=500):
-    jwos = []
-    for _ in range(num_records):
-        jwo_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_job_work_orders(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['job_work_orders']):
         jwo = {
-            "jwo_id": f"JWO{fake.random_number(digits=8)}",
+            "jwo_id": id_allocator.next_id("JWO", 8),
             "supplier_id": fake.uuid4(),  # This should match with supplier_master
-            "order_date": jwo_date.isoformat(),
-            "expected_completion_date": (jwo_date + timedelta(days=random.randint(5, 60))).isoformat(),
+            "order_date": dates["order_date"],
+            "expected_completion_date": dates["expected_completion_date"],
             "work_status": random.choice(["Draft", "In Progress", "Completed", "Cancelled"]),
-            "work_description": fake.text(max_nb_chars=500),
+            "work_description": text_engine.text('long_text'),
             "total_amount": round(random.uniform(5000, 200000), 2),
             "advance_payment": round(random.uniform(1000, 50000), 2),
             "payment_status": random.choice(["Pending", "Partial", "Completed"]),
             "created_by": fake.name(),
-            "created_date": jwo_date.isoformat(),
-            "last_updated": (jwo_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["order_date"],
+            "last_updated": dates["last_updated"]
         }
-        jwos.append(jwo)
-    return jwos
+        yield jwo
+
+def generate_job_work_orders(num_records=500):
+    return list(iter_job_work_orders(num_records))
 
 # Generate Purchase Debit Notes
-def generate_purchase_debit_notes(num_records=200):
-    debit_notes = []
-    for _ in range(num_records):
-        note_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_purchase_debit_notes(num_records=200):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['purchase_debit_notes']):
         note = {
-            "debit_note_id": f"DN{fake.random_number(digits=8)}",
+            "debit_note_id": id_allocator.next_id("DN", 8),
             "po_id": f"PO{fake.random_number(digits=8)}",  # This should match with purchase_orders
             "supplier_id": fake.uuid4(),  # This should match with supplier_master
-            "note_date": note_date.isoformat(),
+            "note_date": dates["note_date"],
             "reason": random.choice(["Quality Issue", "Price Adjustment", "Quantity Discrepancy", "Service Issue"]),
             "amount": round(random.uniform(1000, 50000), 2),
             "status": random.choice(["Draft", "Sent", "Acknowledged", "Settled"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": note_date.isoformat(),
-            "last_updated": (note_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["note_date"],
+            "last_updated": dates["last_updated"]
         }
-        debit_notes.append(note)
-    return debit_notes
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    supplier_master = generate_supplier_master()
-    item_master = generate_item_master()
-    purchase_orders = generate_purchase_orders()
-    grn = generate_grn()
-    job_work_orders = generate_job_work_orders()
-    purchase_debit_notes = generate_purchase_debit_notes()
-
-    # Save datasets to JSON files
-    datasets = {
-        'supplier_master.json': supplier_master,
-        'item_master.json': item_master,
-        'purchase_orders.json': purchase_orders,
-        'grn.json': grn,
-        'job_work_orders.json': job_work_orders,
-        'purchase_debit_notes.json': purchase_debit_notes
-    }
+        yield note
+
+def generate_purchase_debit_notes(num_records=200):
+    return list(iter_purchase_debit_notes(num_records))
+
+# Table generators keyed by output file
+TABLES = {
+    'supplier_master.json': generate_supplier_master,
+    'item_master.json': generate_item_master,
+    'purchase_orders.json': generate_purchase_orders,
+    'grn.json': generate_grn,
+    'job_work_orders.json': generate_job_work_orders,
+    'purchase_debit_notes.json': generate_purchase_debit_notes
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'supplier_master.json': iter_supplier_master,
+    'item_master.json': iter_item_master,
+    'purchase_orders.json': iter_purchase_orders,
+    'grn.json': iter_grn,
+    'job_work_orders.json': iter_job_work_orders,
+    'purchase_debit_notes.json': iter_purchase_debit_notes
+}
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(output_format='json'):
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        records = ITER_TABLES[filename](batch_engine.table_size(generator))
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    args = parser.parse_args()
+    generate_all_datasets(output_format=args.format)
     print("All purchase module datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
@@ -1,8 +1,11 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import batch_engine
+import dataset_io
+import id_allocator
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,43 +14,72 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'inspection_checklists': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'standard_specifications': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'material_inspections': {
+        'inspection_date': ("-1y", "now"),
+        'last_updated': ('inspection_date', 1, 5)
+    },
+    'pdir_entries': {
+        'inspection_date': ("-1y", "now"),
+        'last_updated': ('inspection_date', 1, 5)
+    },
+    'batch_releases': {
+        'release_date': ("-1y", "now"),
+        'last_updated': ('release_date', 1, 5)
+    },
+    'material_revalidation': {
+        'revalidation_date': ("-1y", "now"),
+        'valid_until': ('revalidation_date', 30, 365),
+        'last_updated': ('revalidation_date', 1, 5)
+    }
+}
+
 # Generate Inspection Checklists
-def generate_inspection_checklists(num_records=100):
-    checklists = []
-    for _ in range(num_records):
+def iter_inspection_checklists(num_records=100):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['inspection_checklists']):
         checklist = {
             "checklist_id": fake.uuid4(),
             "checklist_code": f"CHK{fake.random_number(digits=8)}",
             "checklist_name": fake.word() + " Inspection Checklist",
             "category": random.choice(["Raw Material", "In-Process", "Final Product", "Packaging"]),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'qc'),
             "checkpoints": [
                 {
                     "point_id": fake.uuid4(),
                     "checkpoint_name": fake.word() + " Check",
-                    "description": fake.text(max_nb_chars=100),
-                    "acceptance_criteria": fake.text(max_nb_chars=100),
+                    "description": text_engine.text('short_text', 'qc'),
+                    "acceptance_criteria": text_engine.text('short_text', 'qc'),
                     "measurement_unit": random.choice(["mm", "cm", "kg", "°C", "pH", "N/A"]),
                     "is_mandatory": random.choice([True, False])
                 } for _ in range(random.randint(3, 8))
             ],
             "status": random.choice(["Active", "Inactive", "Under Review"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        checklists.append(checklist)
-    return checklists
+        yield checklist
+
+def generate_inspection_checklists(num_records=100):
+    return list(iter_inspection_checklists(num_records))
 
 # Generate Standard Specifications
-def generate_standard_specifications(num_records=200):
-    specifications = []
-    for _ in range(num_records):
+def iter_standard_specifications(num_records=200):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['standard_specifications']):
         spec = {
             "specification_id": fake.uuid4(),
             "specification_code": f"SPEC{fake.random_number(digits=8)}",
             "specification_name": fake.word() + " Specification",
             "category": random.choice(["Physical", "Chemical", "Microbiological", "Visual"]),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text', 'qc'),
             "parameters": [
                 {
                     "parameter_id": fake.uuid4(),
@@ -59,22 +91,22 @@ def generate_standard_specifications(num_records=200):
                 } for _ in range(random.randint(2, 5))
             ],
             "status": random.choice(["Active", "Inactive", "Under Review"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        specifications.append(spec)
-    return specifications
+        yield spec
+
+def generate_standard_specifications(num_records=200):
+    return list(iter_standard_specifications(num_records))
 
 # Generate Material Inspections (MRN)
-def generate_material_inspections(num_records=1000):
-    inspections = []
-    for _ in range(num_records):
-        inspection_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_material_inspections(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['material_inspections']):
         inspection = {
-            "inspection_id": f"MRN{fake.random_number(digits=8)}",
+            "inspection_id": id_allocator.next_id("MRN", 8),
             "material_code": f"RM{fake.random_number(digits=8)}",
             "batch_number": f"B{fake.random_number(digits=6)}",
-            "inspection_date": inspection_date.isoformat(),
+            "inspection_date": dates["inspection_date"],
             "checklist_id": fake.uuid4(),  # This should match with inspection_checklists
             "specification_id": fake.uuid4(),  # This should match with standard_specifications
             "inspector_id": f"INS{fake.random_number(digits=6)}",
@@ -83,28 +115,28 @@ def generate_material_inspections(num_records=1000):
                     "checkpoint_id": fake.uuid4(),
                     "measured_value": round(random.uniform(0, 200), 2),
                     "status": random.choice(["Pass", "Fail", "Marginal"]),
-                    "remarks": fake.text(max_nb_chars=100)
+                    "remarks": text_engine.text('short_text', 'qc')
                 } for _ in range(random.randint(3, 8))
             ],
             "overall_status": random.choice(["Passed", "Failed", "Conditional Pass"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'qc'),
             "created_by": fake.name(),
-            "created_date": inspection_date.isoformat(),
-            "last_updated": (inspection_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["inspection_date"],
+            "last_updated": dates["last_updated"]
         }
-        inspections.append(inspection)
-    return inspections
+        yield inspection
+
+def generate_material_inspections(num_records=1000):
+    return list(iter_material_inspections(num_records))
 
 # Generate PDIR Entries
-def generate_pdir_entries(num_records=500):
-    pdirs = []
-    for _ in range(num_records):
-        pdir_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_pdir_entries(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['pdir_entries']):
         pdir = {
-            "pdir_id": f"PDIR{fake.random_number(digits=8)}",
+            "pdir_id": id_allocator.next_id("PDIR", 8),
             "product_code": f"PRD{fake.random_number(digits=8)}",
             "batch_number": f"B{fake.random_number(digits=6)}",
-            "inspection_date": pdir_date.isoformat(),
+            "inspection_date": dates["inspection_date"],
             "checklist_id": fake.uuid4(),  # This should match with inspection_checklists
             "specification_id": fake.uuid4(),  # This should match with standard_specifications
             "inspector_id": f"INS{fake.random_number(digits=6)}",
@@ -113,98 +145,106 @@ def generate_pdir_entries(num_records=500):
                     "checkpoint_id": fake.uuid4(),
                     "measured_value": round(random.uniform(0, 200), 2),
                     "status": random.choice(["Pass", "Fail", "Marginal"]),
-                    "remarks": fake.text(max_nb_chars=100)
+                    "remarks": text_engine.text('short_text', 'qc')
                 } for _ in range(random.randint(3, 8))
             ],
             "overall_status": random.choice(["Passed", "Failed", "Conditional Pass"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text', 'qc'),
             "created_by": fake.name(),
-            "created_date": pdir_date.isoformat(),
-            "last_updated": (pdir_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["inspection_date"],
+            "last_updated": dates["last_updated"]
         }
-        pdirs.append(pdir)
-    return pdirs
+        yield pdir
+
+def generate_pdir_entries(num_records=500):
+    return list(iter_pdir_entries(num_records))
 
 # Generate Batch Release Records
-def generate_batch_releases(num_records=1000):
-    releases = []
-    for _ in range(num_records):
-        release_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_batch_releases(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['batch_releases']):
         release = {
-            "release_id": f"REL{fake.random_number(digits=8)}",
+            "release_id": id_allocator.next_id("REL", 8),
             "batch_id": f"BCH{fake.random_number(digits=8)}",
             "product_code": f"PRD{fake.random_number(digits=8)}",
-            "release_date": release_date.isoformat(),
+            "release_date": dates["release_date"],
             "quality_status": random.choice(["Released", "On Hold", "Rejected"]),
             "release_type": random.choice(["Full", "Conditional", "Rejected"]),
             "conditions": [
                 {
                     "condition_id": fake.uuid4(),
-                    "description": fake.text(max_nb_chars=100),
+                    "description": text_engine.text('short_text', 'qc'),
                     "status": random.choice(["Met", "Not Met", "Pending"])
                 } for _ in range(random.randint(1, 3))
             ],
             "approved_by": fake.name(),
-            "remarks": fake.text(max_nb_chars=200),
-            "created_date": release_date.isoformat(),
-            "last_updated": (release_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "remarks": text_engine.text('text', 'qc'),
+            "created_date": dates["release_date"],
+            "last_updated": dates["last_updated"]
         }
-        releases.append(release)
-    return releases
+        yield release
+
+def generate_batch_releases(num_records=1000):
+    return list(iter_batch_releases(num_records))
 
 # Generate Material Re-validation Records
-def generate_material_revalidation(num_records=200):
-    revalidations = []
-    for _ in range(num_records):
-        reval_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_material_revalidation(num_records=200):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['material_revalidation']):
         reval = {
-            "revalidation_id": f"REV{fake.random_number(digits=8)}",
+            "revalidation_id": id_allocator.next_id("REV", 8),
             "material_code": f"RM{fake.random_number(digits=8)}",
             "batch_number": f"B{fake.random_number(digits=6)}",
-            "revalidation_date": reval_date.isoformat(),
+            "revalidation_date": dates["revalidation_date"],
             "reason": random.choice(["Storage Extension", "Temperature Deviation", "Customer Request", "Regulatory Requirement"]),
             "test_results": [
                 {
                     "parameter_id": fake.uuid4(),
                     "measured_value": round(random.uniform(0, 200), 2),
                     "status": random.choice(["Pass", "Fail", "Marginal"]),
-                    "remarks": fake.text(max_nb_chars=100)
+                    "remarks": text_engine.text('short_text', 'qc')
                 } for _ in range(random.randint(2, 5))
             ],
             "overall_status": random.choice(["Passed", "Failed", "Conditional Pass"]),
-            "valid_until": (reval_date + timedelta(days=random.randint(30, 365))).isoformat(),
+            "valid_until": dates["valid_until"],
             "approved_by": fake.name(),
-            "remarks": fake.text(max_nb_chars=200),
-            "created_date": reval_date.isoformat(),
-            "last_updated": (reval_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "remarks": text_engine.text('text', 'qc'),
+            "created_date": dates["revalidation_date"],
+            "last_updated": dates["last_updated"]
         }
-        revalidations.append(reval)
-    return revalidations
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    inspection_checklists = generate_inspection_checklists()
-    standard_specifications = generate_standard_specifications()
-    material_inspections = generate_material_inspections()
-    pdir_entries = generate_pdir_entries()
-    batch_releases = generate_batch_releases()
-    material_revalidation = generate_material_revalidation()
-
-    # Save datasets to JSON files
-    datasets = {
-        'inspection_checklists.json': inspection_checklists,
-        'standard_specifications.json': standard_specifications,
-        'material_inspections.json': material_inspections,
-        'pdir_entries.json': pdir_entries,
-        'batch_releases.json': batch_releases,
-        'material_revalidation.json': material_revalidation
-    }
+        yield reval
+
+def generate_material_revalidation(num_records=200):
+    return list(iter_material_revalidation(num_records))
+
+# Table generators keyed by output file
+TABLES = {
+    'inspection_checklists.json': generate_inspection_checklists,
+    'standard_specifications.json': generate_standard_specifications,
+    'material_inspections.json': generate_material_inspections,
+    'pdir_entries.json': generate_pdir_entries,
+    'batch_releases.json': generate_batch_releases,
+    'material_revalidation.json': generate_material_revalidation
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'inspection_checklists.json': iter_inspection_checklists,
+    'standard_specifications.json': iter_standard_specifications,
+    'material_inspections.json': iter_material_inspections,
+    'pdir_entries.json': iter_pdir_entries,
+    'batch_releases.json': iter_batch_releases,
+    'material_revalidation.json': iter_material_revalidation
+}
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(output_format='json'):
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        records = ITER_TABLES[filename](batch_engine.table_size(generator))
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    args = parser.parse_args()
+    generate_all_datasets(output_format=args.format)
     print("All quality module datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
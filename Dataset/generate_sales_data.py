@@ -1,8 +1,14 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import amounts
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import value_pools
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,10 +17,39 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'customer_master': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'sku_master': {
+        'created_date': ("-1y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'logistics_master': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'sales_orders': {
+        'order_date': ("-1y", "now"),
+        'delivery_date': ('order_date', 1, 30),
+        'last_updated': ('order_date', 1, 10)
+    },
+    'dispatch_requests': {
+        'dispatch_date': ("-1y", "now"),
+        'last_updated': ('dispatch_date', 1, 5)
+    },
+    'invoices': {
+        'invoice_date': ("-1y", "now"),
+        'due_date': ('invoice_date', 15, 60),
+        'last_updated': ('invoice_date', 1, 10)
+    }
+}
+
 # Generate Customer Master Data
-def generate_customer_master(num_records=1000):
-    customers = []
-    for _ in range(num_records):
+def iter_customer_master(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['customer_master']):
         customer = {
             "customer_id": fake.uuid4(),
             "customer_name": fake.company(),
@@ -30,42 +65,44 @@ def generate_customer_master(num_records=1000):
             "credit_limit": round(random.uniform(10000, 1000000), 2),
             "payment_terms": random.choice(["Net 30", "Net 45", "Net 60", "Immediate"]),
             "status": random.choice(["Active", "Inactive", "Blocked"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        customers.append(customer)
-    return customers
+        yield customer
+
+def generate_customer_master(num_records=1000):
+    return list(iter_customer_master(num_records))
 
 # Generate SKU Master Data
-def generate_sku_master(num_records=1000):
-    skus = []
+def iter_sku_master(num_records=1000):
     categories = ["Electronics", "Clothing", "Food", "Furniture", "Books", "Sports"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['sku_master']):
         category = random.choice(categories)
         sku = {
-            "sku_id": f"SKU{fake.random_number(digits=6)}",
+            "sku_id": id_allocator.next_id("SKU", 6),
             "product_name": f"{fake.word().title()} {category.rstrip('s')}",
             "category": category,
             "unit_price": round(random.uniform(100, 10000), 2),
             "unit_cost": round(random.uniform(50, 8000), 2),
             "stock_quantity": random.randint(0, 1000),
             "manufacturer": fake.company(),
-            "description": fake.sentence(),
-            "created_date": fake.date_time_this_year().isoformat(),
+            "description": text_engine.text('sentence'),
+            "created_date": dates["created_date"],
             "hsn_code": f"{random.randint(1, 99):02d}{random.randint(1000, 9999)}",
             "gst_percentage": random.choice([0, 5, 12, 18, 28]),
             "reorder_level": random.randint(10, 100),
             "status": random.choice(["Active", "Discontinued", "Out of Stock"]),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "last_updated": dates["last_updated"]
         }
-        skus.append(sku)
-    return skus
+        yield sku
+
+def generate_sku_master(num_records=1000):
+    return list(iter_sku_master(num_records))
 
 # Generate Logistics Master Data
-def generate_logistics_master(num_records=100):
-    logistics = []
+def iter_logistics_master(num_records=100):
     transport_modes = ["Road", "Rail", "Air", "Sea"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['logistics_master']):
         logistics_entry = {
             "partner_id": fake.uuid4(),
             "partner_name": fake.company(),
@@ -77,104 +114,220 @@ def generate_logistics_master(num_records=100):
             "service_area": random.choice(["Local", "Regional", "National", "International"]),
             "rating": round(random.uniform(1, 5), 1),
             "status": random.choice(["Active", "Inactive", "Suspended"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        logistics.append(logistics_entry)
-    return logistics
+        yield logistics_entry
+
+def generate_logistics_master(num_records=100):
+    return list(iter_logistics_master(num_records))
 
 # Generate Sales Orders
-def generate_sales_orders(num_records=1000):
-    orders = []
-    for _ in range(num_records):
-        order_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_sales_orders(num_records=1000, keys=None):
+    customer_ids = keys.iter_sample('customer_master', num_records) if keys else None
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['sales_orders']),
+                            amounts.amount_rows('order', num_records)):
         order = {
-            "order_id": f"SO{fake.random_number(digits=8)}",
-            "customer_id": fake.uuid4(),  # This should match with customer_master
-            "order_date": order_date.isoformat(),
-            "delivery_date": (order_date + timedelta(days=random.randint(1, 30))).isoformat(),
+            "order_id": id_allocator.next_id("SO", 8),
+            "customer_id": next(customer_ids) if keys else fake.uuid4(),  # Sampled from customer_master when keys are given
+            "order_date": dates["order_date"],
+            "delivery_date": dates["delivery_date"],
             "order_status": random.choice(["Draft", "Confirmed", "Processing", "Shipped", "Delivered", "Cancelled"]),
             "payment_status": random.choice(["Pending", "Partial", "Completed"]),
-            "total_amount": round(random.uniform(1000, 100000), 2),
-            "tax_amount": round(random.uniform(100, 10000), 2),
-            "shipping_amount": round(random.uniform(50, 1000), 2),
-            "grand_total": round(random.uniform(1150, 111000), 2),
+            "total_amount": money["total_amount"],
+            "tax_amount": money["tax_amount"],
+            "shipping_amount": money["shipping_amount"],
+            "grand_total": money["grand_total"],
             "created_by": fake.name(),
-            "created_date": order_date.isoformat(),
-            "last_updated": (order_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["order_date"],
+            "last_updated": dates["last_updated"]
         }
-        orders.append(order)
-    return orders
+        yield order
+
+def generate_sales_orders(num_records=1000, keys=None):
+    return list(iter_sales_orders(num_records, keys))
 
 # Generate Dispatch Requests
-def generate_dispatch_requests(num_records=1000):
-    dispatches = []
-    for _ in range(num_records):
-        dispatch_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_dispatch_requests(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['dispatch_requests']):
         dispatch = {
-            "drn_id": f"DRN{fake.random_number(digits=8)}",
+            "drn_id": id_allocator.next_id("DRN", 8),
             "order_id": f"SO{fake.random_number(digits=8)}",  # This should match with sales_orders
             "customer_id": fake.uuid4(),  # This should match with customer_master
-            "dispatch_date": dispatch_date.isoformat(),
+            "dispatch_date": dates["dispatch_date"],
             "transport_partner_id": fake.uuid4(),  # This should match with logistics_master
             "status": random.choice(["Pending", "In Transit", "Delivered", "Cancelled"]),
             "shipping_address": fake.address(),
             "tracking_number": fake.uuid4(),
             "created_by": fake.name(),
-            "created_date": dispatch_date.isoformat(),
-            "last_updated": (dispatch_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["dispatch_date"],
+            "last_updated": dates["last_updated"]
         }
-        dispatches.append(dispatch)
-    return dispatches
+        yield dispatch
+
+def generate_dispatch_requests(num_records=1000):
+    return list(iter_dispatch_requests(num_records))
 
 # Generate Invoices
-def generate_invoices(num_records=1000):
-    invoices = []
-    for _ in range(num_records):
-        invoice_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_invoices(num_records=1000):
+    for dates, money in zip(batch_engine.timestamp_rows(num_records, TIMESTAMPS['invoices']),
+                            amounts.amount_rows('order', num_records)):
         invoice = {
-            "invoice_id": f"INV{fake.random_number(digits=8)}",
+            "invoice_id": id_allocator.next_id("INV", 8),
             "order_id": f"SO{fake.random_number(digits=8)}",  # This should match with sales_orders
             "customer_id": fake.uuid4(),  # This should match with customer_master
-            "invoice_date": invoice_date.isoformat(),
-            "due_date": (invoice_date + timedelta(days=random.randint(15, 60))).isoformat(),
+            "invoice_date": dates["invoice_date"],
+            "due_date": dates["due_date"],
             "payment_status": random.choice(["Pending", "Partial", "Completed", "Overdue"]),
-            "total_amount": round(random.uniform(1000, 100000), 2),
-            "tax_amount": round(random.uniform(100, 10000), 2),
-            "shipping_amount": round(random.uniform(50, 1000), 2),
-            "grand_total": round(random.uniform(1150, 111000), 2),
+            "total_amount": money["total_amount"],
+            "tax_amount": money["tax_amount"],
+            "shipping_amount": money["shipping_amount"],
+            "grand_total": money["grand_total"],
             "eway_bill_number": f"EWB{fake.random_number(digits=12)}",
             "created_by": fake.name(),
-            "created_date": invoice_date.isoformat(),
-            "last_updated": (invoice_date + timedelta(days=random.randint(1, 10))).isoformat()
+            "created_date": dates["invoice_date"],
+            "last_updated": dates["last_updated"]
         }
-        invoices.append(invoice)
-    return invoices
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    customer_master = generate_customer_master()
-    sku_master = generate_sku_master()
-    logistics_master = generate_logistics_master()
-    sales_orders = generate_sales_orders()
-    dispatch_requests = generate_dispatch_requests()
-    invoices = generate_invoices()
-
-    # Save datasets to JSON files
-    datasets = {
-        'customer_master.json': customer_master,
-        'sku_master.json': sku_master,
-        'logistics_master.json': logistics_master,
-        'sales_orders.json': sales_orders,
-        'dispatch_requests.json': dispatch_requests,
-        'invoices.json': invoices
+        yield invoice
+
+def generate_invoices(num_records=1000):
+    return list(iter_invoices(num_records))
+
+# Generate Customer Master Data as NumPy columns (batch mode)
+def generate_customer_master_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['customer_master']))
+    return {
+        "customer_id": batch_engine.uuid4_column(rng, num_records),
+        "customer_name": value_pools.column(rng, num_records, "company"),
+        "contact_person": value_pools.column(rng, num_records, "name"),
+        "email": value_pools.column(rng, num_records, "email"),
+        "phone": value_pools.column(rng, num_records, "phone_number"),
+        "address": value_pools.column(rng, num_records, "address"),
+        "city": value_pools.column(rng, num_records, "city"),
+        "state": value_pools.column(rng, num_records, "state"),
+        "country": value_pools.column(rng, num_records, "country"),
+        "pincode": value_pools.column(rng, num_records, "postcode"),
+        "gst_number": batch_engine.number_id_column(rng, num_records, "GST", 10),
+        "credit_limit": batch_engine.uniform_column(rng, num_records, 10000, 1000000),
+        "payment_terms": batch_engine.choice_column(rng, num_records, ["Net 30", "Net 45", "Net 60", "Immediate"]),
+        "status": batch_engine.choice_column(rng, num_records, ["Active", "Inactive", "Blocked"]),
+        "created_date": dates["created_date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Generate Sales Orders as NumPy columns (batch mode)
+def generate_sales_orders_batch(num_records=1000, rng=None, keys=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['sales_orders']))
+    money = amounts.amount_columns(rng, num_records, 'order')
+    return {
+        "order_id": id_allocator.id_column(num_records, "SO", 8),
+        "customer_id": (keys.sample('customer_master', num_records, rng) if keys
+                        else batch_engine.uuid4_column(rng, num_records)),  # Sampled from customer_master when keys are given
+        "order_date": dates["order_date"],
+        "delivery_date": dates["delivery_date"],
+        "order_status": batch_engine.choice_column(rng, num_records, ["Draft", "Confirmed", "Processing", "Shipped", "Delivered", "Cancelled"]),
+        "payment_status": batch_engine.choice_column(rng, num_records, ["Pending", "Partial", "Completed"]),
+        "total_amount": money["total_amount"],
+        "tax_amount": money["tax_amount"],
+        "shipping_amount": money["shipping_amount"],
+        "grand_total": money["grand_total"],
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["order_date"],
+        "last_updated": dates["last_updated"]
     }
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate Dispatch Requests as NumPy columns (batch mode)
+def generate_dispatch_requests_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['dispatch_requests']))
+    return {
+        "drn_id": id_allocator.id_column(num_records, "DRN", 8),
+        "order_id": batch_engine.number_id_column(rng, num_records, "SO", 8),  # This should match with sales_orders
+        "customer_id": batch_engine.uuid4_column(rng, num_records),  # This should match with customer_master
+        "dispatch_date": dates["dispatch_date"],
+        "transport_partner_id": batch_engine.uuid4_column(rng, num_records),  # This should match with logistics_master
+        "status": batch_engine.choice_column(rng, num_records, ["Pending", "In Transit", "Delivered", "Cancelled"]),
+        "shipping_address": value_pools.column(rng, num_records, "address"),
+        "tracking_number": batch_engine.uuid4_column(rng, num_records),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["dispatch_date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Generate Invoices as NumPy columns (batch mode)
+def generate_invoices_batch(num_records=1000, rng=None):
+    dates = batch_engine.isoformat_columns(batch_engine.timestamp_columns(rng, num_records, TIMESTAMPS['invoices']))
+    money = amounts.amount_columns(rng, num_records, 'order')
+    return {
+        "invoice_id": id_allocator.id_column(num_records, "INV", 8),
+        "order_id": batch_engine.number_id_column(rng, num_records, "SO", 8),  # This should match with sales_orders
+        "customer_id": batch_engine.uuid4_column(rng, num_records),  # This should match with customer_master
+        "invoice_date": dates["invoice_date"],
+        "due_date": dates["due_date"],
+        "payment_status": batch_engine.choice_column(rng, num_records, ["Pending", "Partial", "Completed", "Overdue"]),
+        "total_amount": money["total_amount"],
+        "tax_amount": money["tax_amount"],
+        "shipping_amount": money["shipping_amount"],
+        "grand_total": money["grand_total"],
+        "eway_bill_number": batch_engine.number_id_column(rng, num_records, "EWB", 12),
+        "created_by": value_pools.column(rng, num_records, "name"),
+        "created_date": dates["invoice_date"],
+        "last_updated": dates["last_updated"]
+    }
+
+# Table generators keyed by output file
+TABLES = {
+    'customer_master.json': generate_customer_master,
+    'sku_master.json': generate_sku_master,
+    'logistics_master.json': generate_logistics_master,
+    'sales_orders.json': generate_sales_orders,
+    'dispatch_requests.json': generate_dispatch_requests,
+    'invoices.json': generate_invoices
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'customer_master.json': iter_customer_master,
+    'sku_master.json': iter_sku_master,
+    'logistics_master.json': iter_logistics_master,
+    'sales_orders.json': iter_sales_orders,
+    'dispatch_requests.json': iter_dispatch_requests,
+    'invoices.json': iter_invoices
+}
+
+# Column generators used instead of TABLES in batch mode
+BATCH_TABLES = {
+    'customer_master.json': generate_customer_master_batch,
+    'sales_orders.json': generate_sales_orders_batch,
+    'dispatch_requests.json': generate_dispatch_requests_batch,
+    'invoices.json': generate_invoices_batch
+}
+
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(batch=False, output_format='json', key_distribution='uniform'):
+    rng = batch_engine.make_rng()
+    keys = key_registry.KeyRegistry(key_distribution)
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        table = key_registry.table_name(filename)
+        num_records = batch_engine.table_size(generator)
+        options = {'keys': keys} if key_registry.parents(table) else {}
+        if batch and filename in BATCH_TABLES:
+            records = batch_engine.iter_batch_records(BATCH_TABLES[filename], num_records, rng=rng, **options)
+        else:
+            records = ITER_TABLES[filename](num_records, **options)
+        if table in key_registry.PARENT_TABLES:
+            records = keys.collect(table, records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', action='store_true', help="Generate high-volume tables as NumPy columns")
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    args = parser.parse_args()
+    amounts.configure(args.consistent_amounts)
+    generate_all_datasets(batch=args.batch, output_format=args.format, key_distribution=args.key_distribution)
     print("All datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
@@ -1,8 +1,12 @@
-import json
 from faker import Faker
 import random
-from datetime import datetime, timedelta
 import os
+import argparse
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import text_engine
 
 # Initialize Faker
 fake = Faker()
@@ -11,16 +15,46 @@ fake = Faker()
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# Timestamp fields of each table, drawn as columns (see batch_engine.timestamp_columns)
+TIMESTAMPS = {
+    'inventory_zones': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'stock_categories': {
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'stock_items': {
+        'last_received_date': ("-1y", "now"),
+        'last_issued_date': ("-1y", "now"),
+        'created_date': ("-2y", "now"),
+        'last_updated': ('after', 'created_date')
+    },
+    'goods_issue_notes': {
+        'issue_date': ("-1y", "now"),
+        'last_updated': ('issue_date', 1, 5)
+    },
+    'stock_transfers': {
+        'transfer_date': ("-1y", "now"),
+        'last_updated': ('transfer_date', 1, 5)
+    },
+    'stock_aging': {
+        'aging_date': ("-1y", "now"),
+        'last_updated': ('aging_date', 1, 5),
+        'last_movement_date': ("-1y", "now")
+    }
+}
+
 # Generate Inventory Zones Data
-def generate_inventory_zones(num_records=10):
-    zones = []
+def iter_inventory_zones(num_records=10):
     zone_types = ["Main Store", "Stock Preparation Store", "Raw Material Store", "Finished Goods Store", "Quality Control Store"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['inventory_zones']):
         zone = {
             "zone_id": fake.uuid4(),
             "zone_name": random.choice(zone_types),
             "location_code": f"LOC{fake.random_number(digits=6)}",
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "capacity": random.randint(1000, 10000),
             "current_occupancy": random.randint(0, 100),
             "temperature_controlled": random.choice([True, False]),
@@ -29,41 +63,43 @@ def generate_inventory_zones(num_records=10):
                 "max": random.randint(25, 35)
             } if random.choice([True, False]) else None,
             "status": random.choice(["Active", "Maintenance", "Full", "Inactive"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        zones.append(zone)
-    return zones
+        yield zone
+
+def generate_inventory_zones(num_records=10):
+    return list(iter_inventory_zones(num_records))
 
 # Generate Stock Categories Data
-def generate_stock_categories(num_records=50):
-    categories = []
+def iter_stock_categories(num_records=50):
     main_categories = ["Raw Materials", "Work in Progress", "Finished Goods", "Spare Parts", "Consumables", "Packaging"]
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['stock_categories']):
         category = {
             "category_id": fake.uuid4(),
             "category_name": random.choice(main_categories),
             "sub_category": fake.word(),
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "unit_of_measure": random.choice(["KG", "PCS", "MTR", "LTR", "BOX", "SET"]),
             "reorder_level": random.randint(10, 100),
             "maximum_level": random.randint(100, 1000),
             "shelf_life_days": random.randint(30, 365),
             "storage_requirements": random.choice(["Room Temperature", "Refrigerated", "Frozen", "Humidity Controlled"]),
             "status": random.choice(["Active", "Inactive"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        categories.append(category)
-    return categories
+        yield category
+
+def generate_stock_categories(num_records=50):
+    return list(iter_stock_categories(num_records))
 
 # Generate Stock Items Data
-def generate_stock_items(num_records=1000):
-    items = []
+def iter_stock_items(num_records=1000):
     item_types = ["Standard", "Premium", "Basic", "Industrial", "Commercial", "Professional"]
     item_categories = ["Tool", "Component", "Material", "Supply", "Equipment", "Accessory"]
     
-    for _ in range(num_records):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['stock_items']):
         # Generate a realistic item name by combining words
         item_name = f"{random.choice(item_types)} {random.choice(item_categories)} {fake.word()}"
         
@@ -72,51 +108,51 @@ def generate_stock_items(num_records=1000):
             "item_code": f"STK{fake.random_number(digits=8)}",
             "item_name": item_name,  # Using our custom item name
             "category_id": fake.uuid4(),  # This should match with stock_categories
-            "description": fake.text(max_nb_chars=200),
+            "description": text_engine.text('text'),
             "unit_of_measure": random.choice(["KG", "PCS", "MTR", "LTR", "BOX", "SET"]),
             "current_stock": random.randint(0, 1000),
             "reorder_level": random.randint(10, 100),
             "maximum_level": random.randint(100, 1000),
             "average_consumption": random.randint(1, 100),
-            "last_received_date": fake.date_time_between(start_date="-1y", end_date="now").isoformat(),
-            "last_issued_date": fake.date_time_between(start_date="-1y", end_date="now").isoformat(),
+            "last_received_date": dates["last_received_date"],
+            "last_issued_date": dates["last_issued_date"],
             "status": random.choice(["Active", "Discontinued", "Out of Stock"]),
-            "created_date": fake.date_time_between(start_date="-2y", end_date="now").isoformat(),
-            "last_updated": fake.date_time_between(start_date="-1y", end_date="now").isoformat()
+            "created_date": dates["created_date"],
+            "last_updated": dates["last_updated"]
         }
-        items.append(item)
-    return items
+        yield item
+
+def generate_stock_items(num_records=1000):
+    return list(iter_stock_items(num_records))
 
 # Generate Goods Issue Notes
-def generate_goods_issue_notes(num_records=1000):
-    gins = []
-    for _ in range(num_records):
-        gin_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_goods_issue_notes(num_records=1000):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['goods_issue_notes']):
         gin = {
-            "gin_id": f"GIN{fake.random_number(digits=8)}",
-            "issue_date": gin_date.isoformat(),
+            "gin_id": id_allocator.next_id("GIN", 8),
+            "issue_date": dates["issue_date"],
             "requisition_number": f"REQ{fake.random_number(digits=8)}",
             "department": random.choice(["Production", "Maintenance", "Quality Control", "Sales", "R&D"]),
             "purpose": random.choice(["Production", "Maintenance", "Quality Testing", "Sales", "Sample"]),
             "total_quantity": random.randint(10, 1000),
             "total_value": round(random.uniform(1000, 100000), 2),
             "status": random.choice(["Draft", "Approved", "Issued", "Cancelled"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": gin_date.isoformat(),
-            "last_updated": (gin_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["issue_date"],
+            "last_updated": dates["last_updated"]
         }
-        gins.append(gin)
-    return gins
+        yield gin
+
+def generate_goods_issue_notes(num_records=1000):
+    return list(iter_goods_issue_notes(num_records))
 
 # Generate Stock Transfers
-def generate_stock_transfers(num_records=500):
-    transfers = []
-    for _ in range(num_records):
-        transfer_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_stock_transfers(num_records=500):
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['stock_transfers']):
         transfer = {
-            "transfer_id": f"TRF{fake.random_number(digits=8)}",
-            "transfer_date": transfer_date.isoformat(),
+            "transfer_id": id_allocator.next_id("TRF", 8),
+            "transfer_date": dates["transfer_date"],
             "source_zone_id": fake.uuid4(),  # This should match with inventory_zones
             "destination_zone_id": fake.uuid4(),  # This should match with inventory_zones
             "transfer_type": random.choice(["Internal", "Inter-Company", "Customer Return"]),
@@ -124,23 +160,24 @@ def generate_stock_transfers(num_records=500):
             "total_quantity": random.randint(10, 1000),
             "total_value": round(random.uniform(1000, 100000), 2),
             "status": random.choice(["Draft", "In Transit", "Completed", "Cancelled"]),
-            "remarks": fake.text(max_nb_chars=200),
+            "remarks": text_engine.text('text'),
             "created_by": fake.name(),
-            "created_date": transfer_date.isoformat(),
-            "last_updated": (transfer_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "created_date": dates["transfer_date"],
+            "last_updated": dates["last_updated"]
         }
-        transfers.append(transfer)
-    return transfers
+        yield transfer
+
+def generate_stock_transfers(num_records=500):
+    return list(iter_stock_transfers(num_records))
 
 # Generate Stock Aging Data
-def generate_stock_aging(num_records=1000):
-    aging = []
-    for _ in range(num_records):
-        aging_date = fake.date_time_between(start_date="-1y", end_date="now")
+def iter_stock_aging(num_records=1000, keys=None):
+    item_ids = keys.iter_sample('stock_items', num_records) if keys else None
+    for dates in batch_engine.timestamp_rows(num_records, TIMESTAMPS['stock_aging']):
         aging_entry = {
             "aging_id": fake.uuid4(),
-            "item_id": fake.uuid4(),  # This should match with stock_items
-            "aging_date": aging_date.isoformat(),
+            "item_id": next(item_ids) if keys else fake.uuid4(),  # Sampled from stock_items when keys are given
+            "aging_date": dates["aging_date"],
             "current_stock": random.randint(0, 1000),
             "stock_value": round(random.uniform(1000, 100000), 2),
             "age_brackets": {
@@ -149,37 +186,52 @@ def generate_stock_aging(num_records=1000):
                 "61-90_days": random.randint(0, 200),
                 "90_plus_days": random.randint(0, 100)
             },
-            "last_movement_date": fake.date_time_between(start_date="-1y", end_date="now").isoformat(),
-            "created_date": aging_date.isoformat(),
-            "last_updated": (aging_date + timedelta(days=random.randint(1, 5))).isoformat()
+            "last_movement_date": dates["last_movement_date"],
+            "created_date": dates["aging_date"],
+            "last_updated": dates["last_updated"]
         }
-        aging.append(aging_entry)
-    return aging
-
-# Generate and save all datasets
-def generate_all_datasets():
-    # Generate datasets
-    inventory_zones = generate_inventory_zones()
-    stock_categories = generate_stock_categories()
-    stock_items = generate_stock_items()
-    goods_issue_notes = generate_goods_issue_notes()
-    stock_transfers = generate_stock_transfers()
-    stock_aging = generate_stock_aging()
-
-    # Save datasets to JSON files
-    datasets = {
-        'inventory_zones.json': inventory_zones,
-        'stock_categories.json': stock_categories,
-        'stock_items.json': stock_items,
-        'goods_issue_notes.json': goods_issue_notes,
-        'stock_transfers.json': stock_transfers,
-        'stock_aging.json': stock_aging
-    }
+        yield aging_entry
+
+def generate_stock_aging(num_records=1000, keys=None):
+    return list(iter_stock_aging(num_records, keys))
+
+# Table generators keyed by output file
+TABLES = {
+    'inventory_zones.json': generate_inventory_zones,
+    'stock_categories.json': generate_stock_categories,
+    'stock_items.json': generate_stock_items,
+    'goods_issue_notes.json': generate_goods_issue_notes,
+    'stock_transfers.json': generate_stock_transfers,
+    'stock_aging.json': generate_stock_aging
+}
+
+# Lazy record generators keyed by output file; TABLES holds their list-returning wrappers
+ITER_TABLES = {
+    'inventory_zones.json': iter_inventory_zones,
+    'stock_categories.json': iter_stock_categories,
+    'stock_items.json': iter_stock_items,
+    'goods_issue_notes.json': iter_goods_issue_notes,
+    'stock_transfers.json': iter_stock_transfers,
+    'stock_aging.json': iter_stock_aging
+}
 
-    for filename, data in datasets.items():
-        with open(os.path.join('data', filename), 'w') as f:
-            json.dump(data, f, indent=2)
+# Generate and stream all datasets to disk chunk by chunk
+def generate_all_datasets(output_format='json', key_distribution='uniform'):
+    keys = key_registry.KeyRegistry(key_distribution)
+    for filename, generator in TABLES.items():
+        id_allocator.start()
+        table = key_registry.table_name(filename)
+        options = {'keys': keys} if key_registry.parents(table) else {}
+        records = ITER_TABLES[filename](batch_engine.table_size(generator), **options)
+        if table in key_registry.PARENT_TABLES:
+            records = keys.collect(table, records)
+        dataset_io.write_records(dataset_io.output_path('data', filename, output_format), records, output_format)
 
 if __name__ == "__main__":
-    generate_all_datasets()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    args = parser.parse_args()
+    generate_all_datasets(output_format=args.format, key_distribution=args.key_distribution)
     print("All stores module datasets have been generated successfully in the 'data' folder!") 
\ No newline at end of file
@@ -0,0 +1,99 @@
+import argparse
+import hashlib
+
+import numpy as np
+
+# Feistel rounds of the id permutation
+ROUNDS = 4
+
+# Ids handed out per refill by next_id()
+BLOCK_SIZE = 1024
+
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Row the ids of the current table (or shard) start at, ids allocated so far per
+# (prefix, digits) and the unused ids of next_id()'s current block
+_start = 0
+_allocated = {}
+_blocks = {}
+
+
+# Round keys of the permutation of a prefix's digit space. They depend only on the
+# prefix and digit count, so every process, shard and later append agrees on them.
+def _round_keys(prefix, digits):
+    digest = hashlib.sha256(f"{prefix}:{digits}".encode()).digest()
+    return [np.uint64(int.from_bytes(digest[8 * i:8 * i + 8], 'big')) for i in range(ROUNDS)]
+
+
+# Feistel network over the 2 * half_bits bit numbers (a bijection on that range)
+def _feistel(values, keys, half_bits):
+    mask = np.uint64((1 << half_bits) - 1)
+    shift = np.uint64(half_bits)
+    left, right = values >> shift, values & mask
+    for key in keys:
+        # Round function: multiply-xorshift-multiply, keeping the well-mixed high bits
+        mixed = (right ^ key) * _MULTIPLIER
+        mixed ^= mixed >> np.uint64(31)
+        mixed *= _MULTIPLIER
+        left, right = right, left ^ (mixed >> np.uint64(64 - half_bits))
+    return (left << shift) | right
+
+
+# Keyed permutation of 0 .. 10**digits - 1: a Feistel network over the smallest even
+# bit width that covers the range, cycle-walked until each value lands inside it.
+# Distinct positions always give distinct numbers, in an order that does not look sequential.
+def permute(positions, prefix, digits):
+    size = 10 ** digits
+    positions = np.asarray(positions, dtype=np.uint64)
+    if len(positions) and int(positions.max()) >= size:
+        raise ValueError(f"{prefix} ids with {digits} digits run out after {size} rows")
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    keys = _round_keys(prefix, digits)
+    numbers = _feistel(positions, keys, half_bits)
+    outside = numbers >= np.uint64(size)
+    while outside.any():
+        numbers[outside] = _feistel(numbers[outside], keys, half_bits)
+        outside = numbers >= np.uint64(size)
+    return numbers.astype(np.int64)
+
+
+# Start allocating ids at a row position: the first row of a shard, or the current
+# row count of a table being appended to. Ids are a function of the row position,
+# so shards and appends never hand out the same id without coordinating.
+def start(row=0):
+    global _start
+    _start = row
+    _allocated.clear()
+    _blocks.clear()
+
+
+# The next n ids of a prefix, like f"{prefix}{fake.random_number(digits=digits)}"
+# but unique, as a column
+def id_column(n, prefix, digits):
+    first = _start + _allocated.get((prefix, digits), 0)
+    _allocated[(prefix, digits)] = first - _start + n
+    numbers = permute(np.arange(first, first + n, dtype=np.uint64), prefix, digits)
+    return np.char.add(prefix, numbers.astype(str))
+
+
+# The next id of a prefix, for per-record generators; ids are permuted a block at a time.
+# A block never reaches past the end of the digit space, so every id that fits is handed out.
+def next_id(prefix, digits):
+    block = _blocks.get((prefix, digits))
+    if not block:
+        remaining = 10 ** digits - _start - _allocated.get((prefix, digits), 0)
+        size = max(1, min(BLOCK_SIZE, remaining))
+        block = _blocks[(prefix, digits)] = id_column(size, prefix, digits).tolist()[::-1]
+    return block.pop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the ids allocated at a range of row positions")
+    parser.add_argument('prefix', help="Id prefix, e.g. SO")
+    parser.add_argument('digits', type=int, help="Digits after the prefix, e.g. 8")
+    parser.add_argument('--start', type=int, default=0, help="First row position")
+    parser.add_argument('--count', type=int, default=10)
+    args = parser.parse_args()
+    start(args.start)
+    for row, value in enumerate(id_column(args.count, args.prefix, args.digits), args.start):
+        print(f"{row:>12} {value}")
@@ -0,0 +1,204 @@
+import argparse
+import importlib
+import json
+import os
+
+import amounts
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import parallel_generation
+import seeding
+
+# Sidecar directory, next to the data files, holding each table's append state
+STATE_DIR = '.state'
+
+# Fields whose distinct values are kept in the sidecar so appended rows can
+# reuse them without re-reading the table
+STATE_FIELDS = {
+    'pdir_entries': ['product_code', 'batch_number']
+}
+
+
+# Data file of a table in output_dir in whichever format it was written, or None
+def existing_path(output_dir, filename):
+    for fmt in dataset_io.FORMATS:
+        path = dataset_io.output_path(output_dir, filename, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# Sidecar state file of a data file, e.g. data/.state/pdir_entries.json
+def state_path(path):
+    return os.path.join(os.path.dirname(path), STATE_DIR, key_registry.table_name(path) + '.json')
+
+
+# Empty state of a table: row count, number of appends, the tracked field values
+# and the data file size the state matches
+def new_state(table):
+    return {'rows': 0, 'appends': 0, 'size': 0, 'values': {field: [] for field in STATE_FIELDS.get(table, [])}}
+
+
+# State of a data file from its sidecar. Without a sidecar, or when the file was
+# rewritten since (its size no longer matches), the file is scanned once to build
+# it; later appends only read the sidecar.
+def load_state(path):
+    sidecar = state_path(path)
+    size = dataset_io.data_size(path) if os.path.exists(path) else 0
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            state = json.load(f)
+        if state['size'] == size:
+            return state
+    table = key_registry.table_name(path)
+    state = new_state(table)
+    if os.path.exists(path):
+        for _ in track(state, table, dataset_io.read_records(path)):
+            pass
+    state['size'] = size
+    return state
+
+
+# Write a data file's sidecar state (atomically, so an interrupted run keeps the old one)
+def save_state(path, state):
+    sidecar = state_path(path)
+    os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, sidecar)
+
+
+# Pass records through unchanged while counting them and adding their
+# tracked field values to the state
+def track(state, table, records):
+    fields = STATE_FIELDS.get(table, [])
+    seen = {field: set(state['values'][field]) for field in fields}
+    for record in records:
+        for field in fields:
+            seen[field].add(record[field])
+        state['rows'] += 1
+        yield record
+    for field in fields:
+        state['values'][field] = sorted(seen[field])
+
+
+# Append records to a data file and update its sidecar, without reading the existing records
+def append_records(path, records, state=None, ensure_ascii=True):
+    state = state if state is not None else load_state(path)
+    table = key_registry.table_name(path)
+    count = dataset_io.write_records(path, track(state, table, records), dataset_io.format_of(path),
+                                     ensure_ascii=ensure_ascii, append=True)
+    state['appends'] += 1
+    state['size'] = dataset_io.data_size(path)
+    save_state(path, state)
+    return count
+
+
+# Registry of parent keys saved under output_dir/.keys. Parents without a saved
+# key file, or rewritten since it was saved (e.g. by a module script), are
+# scanned once and saved.
+def load_keys(output_dir, table, key_distribution='uniform'):
+    keys_dir = os.path.join(output_dir, '.keys')
+    keys = key_registry.KeyRegistry.load(keys_dir, key_distribution)
+    for parent in key_registry.parents(table) + ([table] if table in key_registry.PARENT_TABLES else []):
+        path = existing_path(output_dir, parent + '.json')
+        keys_path = os.path.join(keys_dir, f"{parent}.npy")
+        if not os.path.exists(keys_path) or (path and os.path.getmtime(path) > os.path.getmtime(keys_path)):
+            if path is None:
+                if parent == table:
+                    continue  # A new parent table: its keys start with this append
+                raise FileNotFoundError(f"{table} needs {parent}; generate it first")
+            scanned = key_registry.KeyRegistry()
+            for _ in scanned.collect(parent, dataset_io.read_records(path)):
+                pass
+            scanned.save_table(keys_dir, parent)
+    return keys
+
+
+# Module script and generator of a table file, e.g. 'job_cards.json'
+def find_table(filename, modules=parallel_generation.MODULES):
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        if filename in module.TABLES:
+            return module
+    raise KeyError(f"No module generates {filename}")
+
+
+# Append count new rows to a table in output_dir (a new file is started if there is none).
+# With a seed each append is reproducible and differs from the previous ones.
+def append_table(filename, count, output_dir='data', output_format='json', seed=None, batch=False,
+                 key_distribution='uniform', consistent_amounts=False):
+    module = find_table(filename)
+    amounts.configure(consistent_amounts)
+    table = key_registry.table_name(filename)
+    os.makedirs(output_dir, exist_ok=True)
+    path = existing_path(output_dir, filename) or dataset_io.output_path(output_dir, filename, output_format)
+    state = load_state(path)
+    id_allocator.start(state['rows'])
+    rng = None
+    if seed is not None:
+        rng = seeding.seed_module(module, seeding.derive_seed(seed, filename, 'append', state['appends']))
+    options = {}
+    keys = None
+    if key_registry.parents(table) or table in key_registry.PARENT_TABLES:
+        keys = load_keys(output_dir, table, key_distribution)
+    if key_registry.parents(table):
+        options['keys'] = keys
+    batch_tables = getattr(module, 'BATCH_TABLES', {})
+    if batch and filename in batch_tables:
+        records = batch_engine.iter_batch_records(batch_tables[filename], count, rng=rng, **options)
+    else:
+        records = module.ITER_TABLES[filename](count, **options)
+    if table in key_registry.PARENT_TABLES:
+        records = keys.collect(table, records)
+    appended = append_records(path, records, state)
+    if table in key_registry.PARENT_TABLES:
+        keys.save_table(os.path.join(output_dir, '.keys'), table)
+    return path, appended
+
+
+# Tables ordered so parents are appended before the children that sample their keys
+def append_order(filenames):
+    ordered, done = [], set()
+
+    def visit(filename):
+        if filename in done:
+            return
+        done.add(filename)
+        for parent in key_registry.parents(key_registry.table_name(filename)):
+            if parent + '.json' in filenames:
+                visit(parent + '.json')
+        ordered.append(filename)
+
+    for filename in filenames:
+        visit(filename)
+    return ordered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new rows to existing tables without rewriting them")
+    parser.add_argument('tables', nargs='*', help="Table files to extend, e.g. pdir_entries.json (default: every table)")
+    parser.add_argument('--count', type=int, default=None,
+                        help="Rows to append per table (default: a tenth of each table's default size)")
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json',
+                        help="Format of tables that do not exist yet")
+    parser.add_argument('--seed', type=int, default=None, help="Global seed; each append gets its own derived seed")
+    parser.add_argument('--batch', action='store_true', help="Use NumPy column generators where available")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    args = parser.parse_args()
+    filenames = args.tables or [filename for module_name in parallel_generation.MODULES
+                                for filename in importlib.import_module(module_name).TABLES]
+    for filename in append_order(filenames):
+        count = args.count
+        if count is None:
+            count = max(1, batch_engine.table_size(find_table(filename).TABLES[filename]) // 10)
+        path, appended = append_table(filename, count, args.output_dir, args.format, args.seed, args.batch,
+                                      args.key_distribution, args.consistent_amounts)
+        print(f"Appended {appended} records to {path}")
@@ -0,0 +1,155 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dataset_io
+import key_registry
+
+# Secondary indexes of every collection, built after the bulk load: foreign keys, then
+# common date and status filters. An entry is a field or a tuple of fields for a compound
+# index; a '-' prefix sorts that field descending. Every collection also gets a unique
+# index on its natural key (key_registry.PRIMARY_KEYS), see indexes().
+INDEX_PLAN = {
+    # generate_sales_data.py
+    'customer_master': ['email', 'status'],
+    'sku_master': ['category', 'hsn_code', 'status'],
+    'logistics_master': ['status'],
+    'sales_orders': ['customer_id', 'order_date', ('order_status', '-order_date'), 'payment_status'],
+    'dispatch_requests': ['order_id', 'customer_id', 'transport_partner_id', 'dispatch_date', ('status', '-dispatch_date')],
+    'invoices': ['order_id', 'customer_id', 'invoice_date', 'due_date', ('payment_status', 'due_date')],
+    # generate_purchase_data.py
+    'supplier_master': ['email', 'status'],
+    'item_master': ['category', 'hsn_code', 'status'],
+    'purchase_orders': ['supplier_id', 'order_date', ('order_status', '-order_date'), 'payment_status'],
+    'grn': ['po_id', 'supplier_id', 'receipt_date', 'receipt_status', 'quality_status'],
+    'job_work_orders': ['supplier_id', 'order_date', 'work_status'],
+    'purchase_debit_notes': ['po_id', 'supplier_id', 'note_date', 'status'],
+    # generate_stores_data.py
+    'inventory_zones': ['status'],
+    'stock_categories': ['status'],
+    'stock_items': ['category_id', 'status'],
+    'goods_issue_notes': ['issue_date', 'department', 'status'],
+    'stock_transfers': ['source_zone_id', 'destination_zone_id', 'transfer_date', 'status'],
+    'stock_aging': ['item_id', 'aging_date'],
+    # generate_production_data.py
+    'raw_material_master': ['category', 'status'],
+    'process_definitions': ['status'],
+    'batch_cards': ['product_code', 'batch_number', 'start_date', ('status', '-start_date'), 'quality_status'],
+    'work_orders': ['batch_id', 'process_id', 'order_date', ('status', '-order_date')],
+    'job_cards': ['work_order_id', 'operator_id', 'machine_id', 'status'],
+    'production_inventory': ['product_code', 'batch_id', 'status'],
+    # generate_quality_data.py
+    'inspection_checklists': ['category', 'status'],
+    'standard_specifications': ['category', 'status'],
+    'material_inspections': ['batch_number', 'checklist_id', 'specification_id', 'inspection_date',
+                             ('overall_status', '-inspection_date')],
+    'pdir_entries': [('product_code', 'batch_number'), 'checklist_id', 'inspection_date',
+                     ('overall_status', '-inspection_date')],
+    'batch_releases': ['batch_id', 'product_code', 'release_date', 'quality_status'],
+    'material_revalidation': ['batch_number', 'revalidation_date', 'overall_status'],
+    # generate_logistics_data.py
+    'shipping_modes': [],
+    'transport_partners': ['status'],
+    'sales_dispatches': ['order_id', 'customer_id', 'transport_partner_id', 'shipping_mode_id', 'dispatch_date',
+                         ('status', '-dispatch_date')],
+    'advance_shipment_notices': ['drn_id', 'customer_id', 'asn_date', 'status'],
+    'dispatch_status_reports': [('drn_id', '-report_date'), 'current_status'],
+    'sales_register': ['order_id', 'customer_id', 'product_code', 'sale_date', 'payment_status'],
+    # generate_finance_data.py
+    'ledger_accounts': ['account_type'],
+    'gst_configurations': ['hsn_code'],
+    'payment_terms': [],
+    'tax_codes': [],
+    'payment_processing': ['reference_id', 'account_id', 'payment_date', ('status', '-payment_date')],
+    'journal_entries': ['entry_date', 'status'],
+    'gst_invoices': ['invoice_number', 'invoice_date', 'hsn_code', 'status'],
+    'gst_returns': [('return_type', 'return_period'), 'filing_status'],
+    'ledger_balance_reports': [('account_id', '-report_date')],
+    # generate_hr_data.py
+    'employee_records': ['email', 'department', 'join_date', 'status'],
+    'payroll_details': [('employee_id', '-payroll_date'), 'payment_status'],
+    'role_permissions': [],
+    'user_access': ['employee_id', 'username', 'role_id'],
+    'payroll_processing': ['process_date', 'status'],
+    'leave_management': [('employee_id', 'start_date'), ('status', 'start_date')],
+    'employee_attendance': [('employee_id', 'date'), ('date', 'status')],
+    'payroll_reports': ['report_type'],
+    # generate_gst_data.py
+    'hsn_codes': ['hsn_code'],
+    'sac_codes': [],
+    'gstin_records': ['gstin', 'registration_date', 'status'],
+    'e_invoices': ['invoice_number', 'invoice_date', 'hsn_code', 'status'],
+    'e_way_bills': ['invoice_id', 'bill_date', 'status'],
+    'credit_debit_notes': ['invoice_id', 'note_date', ('note_type', 'status')],
+    'rcm_transactions': ['invoice_number', 'transaction_date', 'hsn_code', 'status'],
+    'gstr1': ['return_period', 'filing_status'],
+    'gstr3b': ['return_period', 'filing_status'],
+    'gstr2a': ['return_period', 'status'],
+    'gst_reconciliation': ['generation_date', 'reconciliation_status'],
+    'gst_audit_reports': ['report_type', 'audit_status'],
+    # generate_interaction_data.py
+    'faqs': ['category', 'gst_type', 'transaction_type'],
+    'conversations': [('module', 'category')]
+}
+
+# Collections whose index builds run at the same time
+DEFAULT_WORKERS = 4
+
+
+# Index keys of one plan entry as [(field, direction)], e.g. ('status', '-order_date')
+# -> [('status', 1), ('order_date', -1)]
+def index_keys(entry):
+    fields = (entry,) if isinstance(entry, str) else entry
+    return [(field[1:], -1) if field.startswith('-') else (field, 1) for field in fields]
+
+
+# MongoDB's default name for an index on keys, e.g. status_1_order_date_-1
+def index_name(keys):
+    return '_'.join(f"{field}_{direction}" for field, direction in keys)
+
+
+# Every index of a collection as (keys, unique): the natural key, then its INDEX_PLAN entries
+def indexes(collection_name):
+    planned = [(index_keys(entry), False) for entry in INDEX_PLAN.get(collection_name, [])]
+    if collection_name in key_registry.PRIMARY_KEYS:
+        planned.insert(0, (index_keys(key_registry.PRIMARY_KEYS[collection_name]), True))
+    return planned
+
+
+# Build the planned indexes of the given collections in a sink (see sinks.py) after
+# they have been loaded, a few collections at a time and each collection's indexes one
+# after another. on_index_done(collection, name, seconds, error) is called as each
+# build finishes. Returns the builds as a list of (collection, name, seconds, error).
+def build_indexes(sink, collection_names, workers=DEFAULT_WORKERS, on_index_done=None):
+    builds = []
+    report_lock = threading.Lock()
+
+    def build_collection(collection_name):
+        for keys, unique in indexes(collection_name):
+            name = index_name(keys)
+            started = time.perf_counter()
+            try:
+                sink.create_index(collection_name, keys, name, unique)
+                error = None
+            except Exception as e:
+                error = e
+            build = (collection_name, name, time.perf_counter() - started, error)
+            builds.append(build)
+            if on_index_done is not None:
+                with report_lock:
+                    on_index_done(*build)
+
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(build_collection, collection_names))
+    return builds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the index plan of the collections seeded from a data folder")
+    parser.add_argument('--data-folder', default='data')
+    args = parser.parse_args()
+    for filename in dataset_io.data_files(args.data_folder):
+        collection_name = key_registry.table_name(filename)
+        for keys, unique in indexes(collection_name):
+            print(f"{collection_name:<28} {index_name(keys):<40} {'unique' if unique else ''}")
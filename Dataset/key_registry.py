@@ -0,0 +1,286 @@
+import os
+import random
+
+import numpy as np
+
+# Primary (natural) key of every table
+PRIMARY_KEYS = {
+    # generate_sales_data.py
+    'customer_master': 'customer_id',
+    'sku_master': 'sku_id',
+    'logistics_master': 'partner_id',
+    'sales_orders': 'order_id',
+    'dispatch_requests': 'drn_id',
+    'invoices': 'invoice_id',
+    # generate_purchase_data.py
+    'supplier_master': 'supplier_id',
+    'item_master': 'item_id',
+    'purchase_orders': 'po_id',
+    'grn': 'grn_id',
+    'job_work_orders': 'jwo_id',
+    'purchase_debit_notes': 'debit_note_id',
+    # generate_stores_data.py
+    'inventory_zones': 'zone_id',
+    'stock_categories': 'category_id',
+    'stock_items': 'item_id',
+    'goods_issue_notes': 'gin_id',
+    'stock_transfers': 'transfer_id',
+    'stock_aging': 'aging_id',
+    # generate_production_data.py
+    'raw_material_master': 'material_id',
+    'process_definitions': 'process_id',
+    'batch_cards': 'batch_id',
+    'work_orders': 'work_order_id',
+    'job_cards': 'job_card_id',
+    'production_inventory': 'inventory_id',
+    # generate_quality_data.py
+    'inspection_checklists': 'checklist_id',
+    'standard_specifications': 'specification_id',
+    'material_inspections': 'inspection_id',
+    'pdir_entries': 'pdir_id',
+    'batch_releases': 'release_id',
+    'material_revalidation': 'revalidation_id',
+    # generate_logistics_data.py
+    'shipping_modes': 'mode_id',
+    'transport_partners': 'partner_id',
+    'sales_dispatches': 'drn_id',
+    'advance_shipment_notices': 'asn_id',
+    'dispatch_status_reports': 'report_id',
+    'sales_register': 'sale_id',
+    # generate_finance_data.py
+    'ledger_accounts': 'account_id',
+    'gst_configurations': 'config_id',
+    'payment_terms': 'term_id',
+    'tax_codes': 'code_id',
+    'payment_processing': 'payment_id',
+    'journal_entries': 'entry_id',
+    'gst_invoices': 'invoice_id',
+    'gst_returns': 'return_id',
+    'ledger_balance_reports': 'report_id',
+    # generate_hr_data.py
+    'employee_records': 'employee_id',
+    'payroll_details': 'payroll_id',
+    'role_permissions': 'role_id',
+    'user_access': 'user_id',
+    'payroll_processing': 'process_id',
+    'leave_management': 'leave_id',
+    'employee_attendance': 'attendance_id',
+    'payroll_reports': 'report_id',
+    # generate_gst_data.py
+    'hsn_codes': 'hsn_id',
+    'sac_codes': 'sac_id',
+    'gstin_records': 'gstin_id',
+    'e_invoices': 'invoice_id',
+    'e_way_bills': 'eway_bill_id',
+    'credit_debit_notes': 'note_id',
+    'rcm_transactions': 'rcm_id',
+    'gstr1': 'return_id',
+    'gstr3b': 'return_id',
+    'gstr2a': 'return_id',
+    'gst_reconciliation': 'report_id',
+    'gst_audit_reports': 'report_id',
+    # generate_interaction_data.py
+    'faqs': 'id',
+    'conversations': 'id'
+}
+
+# Prefix and digit count of the primary keys id_allocator hands out, per table. A table
+# can hold at most 10 ** digits rows before its ids run out (see scale.py).
+ID_SPACES = {
+    # generate_sales_data.py
+    'sku_master': ('SKU', 6),
+    'sales_orders': ('SO', 8),
+    'dispatch_requests': ('DRN', 8),
+    'invoices': ('INV', 8),
+    # generate_purchase_data.py
+    'purchase_orders': ('PO', 8),
+    'grn': ('GRN', 8),
+    'job_work_orders': ('JWO', 8),
+    'purchase_debit_notes': ('DN', 8),
+    # generate_stores_data.py
+    'goods_issue_notes': ('GIN', 8),
+    'stock_transfers': ('TRF', 8),
+    # generate_production_data.py
+    'batch_cards': ('BCH', 8),
+    'work_orders': ('WO', 8),
+    'job_cards': ('JC', 8),
+    # generate_quality_data.py
+    'material_inspections': ('MRN', 8),
+    'pdir_entries': ('PDIR', 8),
+    'batch_releases': ('REL', 8),
+    'material_revalidation': ('REV', 8),
+    # generate_logistics_data.py
+    'sales_dispatches': ('DRN', 8),
+    'advance_shipment_notices': ('ASN', 8),
+    'dispatch_status_reports': ('DSR', 8),
+    'sales_register': ('SALE', 8),
+    # generate_finance_data.py
+    'payment_processing': ('PAY', 8),
+    'journal_entries': ('JRN', 8),
+    'gst_invoices': ('GST', 8),
+    'gst_returns': ('GSR', 8),
+    'ledger_balance_reports': ('LBR', 8),
+    # generate_hr_data.py
+    'employee_records': ('EMP', 6),
+    'payroll_details': ('PAY', 8),
+    'role_permissions': ('ROL', 4),
+    'user_access': ('USR', 6),
+    'payroll_processing': ('PRC', 8),
+    'leave_management': ('LEV', 8),
+    'employee_attendance': ('ATT', 8),
+    'payroll_reports': ('PRR', 8),
+    # generate_gst_data.py
+    'e_invoices': ('EINV', 8),
+    'e_way_bills': ('EWB', 8),
+    'credit_debit_notes': ('CDN', 8),
+    'rcm_transactions': ('RCM', 8),
+    'gstr1': ('GSTR1', 8),
+    'gstr3b': ('GSTR3B', 8),
+    'gstr2a': ('GSTR2A', 8),
+    'gst_reconciliation': ('REC', 8),
+    'gst_audit_reports': ('GSTR9', 8)
+}
+
+# Foreign keys that child generators sample from their parent table's primary keys
+FOREIGN_KEYS = {
+    ('sales_orders', 'customer_id'): 'customer_master',
+    ('work_orders', 'batch_id'): 'batch_cards',
+    ('job_cards', 'work_order_id'): 'work_orders',
+    ('stock_aging', 'item_id'): 'stock_items',
+    ('advance_shipment_notices', 'drn_id'): 'sales_dispatches',
+    ('leave_management', 'employee_id'): 'employee_records',
+    ('employee_attendance', 'employee_id'): 'employee_records'
+}
+
+# Tables whose primary keys child tables sample from
+PARENT_TABLES = set(FOREIGN_KEYS.values())
+
+DISTRIBUTIONS = ('uniform', 'zipf')
+
+
+# Parent tables a table samples foreign keys from
+def parents(table):
+    return sorted({parent for (child, _), parent in FOREIGN_KEYS.items() if child == table})
+
+
+# Table name of an output file, e.g. 'sales_orders.json' -> 'sales_orders'
+def table_name(filename):
+    return os.path.basename(filename).split('.')[0]
+
+
+# Alias table (Vose) for O(1) sampling from a discrete distribution
+def build_alias_table(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(weights)
+    scaled = (weights * n / weights.sum()).tolist()
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return np.array(prob), np.array(alias)
+
+
+# Stores each parent table's primary keys in compact fixed-width byte arrays
+# and samples child foreign keys from them in O(1) per row
+class KeyRegistry:
+    def __init__(self, distribution='uniform', zipf_s=1.1):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown key distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+        self.distribution = distribution
+        self.zipf_s = zipf_s
+        self._keys = {}
+        self._pending = {}
+        self._alias = {}
+        self.directory = None
+
+    def __contains__(self, table):
+        return table in self._keys or table in self._pending
+
+    # Add primary keys for a table (may be called once per chunk), after any saved ones
+    def register(self, table, keys):
+        if table not in self:
+            self._load_table(table)
+        self._pending.setdefault(table, []).append(np.asarray(list(keys), dtype='S'))
+        self._alias.pop(table, None)
+
+    # Pass records through unchanged while registering their primary keys
+    def collect(self, table, records):
+        key_field = PRIMARY_KEYS[table]
+        chunk = []
+        for record in records:
+            chunk.append(record[key_field])
+            if len(chunk) >= 100000:
+                self.register(table, chunk)
+                chunk = []
+            yield record
+        self.register(table, chunk)
+
+    # All registered keys of a table as a byte array
+    def keys(self, table):
+        if table in self._pending:
+            arrays = self._pending.pop(table)
+            if table in self._keys:
+                arrays.insert(0, self._keys[table])
+            width = max(array.dtype.itemsize for array in arrays)
+            self._keys[table] = np.concatenate([array.astype(f'S{width}') for array in arrays])
+        if table not in self._keys:
+            self._load_table(table)
+        if table not in self._keys:
+            raise KeyError(f"No keys registered for {table}; generate it before its child tables")
+        return self._keys[table]
+
+    # n foreign keys drawn from a parent table. Without an rng one is derived from
+    # the random module, so seeded per-record generators stay reproducible.
+    def sample(self, table, n, rng=None):
+        keys = self.keys(table)
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        if self.distribution == 'uniform':
+            indices = rng.integers(0, len(keys), n)
+        else:
+            if table not in self._alias:
+                ranks = np.arange(1, len(keys) + 1, dtype=np.float64)
+                self._alias[table] = build_alias_table(ranks ** -self.zipf_s)
+            prob, alias = self._alias[table]
+            slots = rng.integers(0, len(keys), n)
+            indices = np.where(rng.random(n) < prob[slots], slots, alias[slots])
+        return np.char.decode(keys[indices], 'utf-8')
+
+    # The same draws as sample(), as an iterator that draws chunk_size keys at a time,
+    # for per-record generators that should not hold a key per row
+    def iter_sample(self, table, n, rng=None, chunk_size=10000):
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        return self._iter_sample(table, n, rng, chunk_size)
+
+    def _iter_sample(self, table, n, rng, chunk_size):
+        for start in range(0, n, chunk_size):
+            yield from self.sample(table, min(chunk_size, n - start), rng).tolist()
+
+    # Save one table's keys as a .npy file so other processes can load it
+    def save_table(self, directory, table):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, f"{table}.npy"), self.keys(table))
+
+    # Save every table's keys
+    def save(self, directory):
+        for table in list(self._pending) + list(self._keys):
+            self.save_table(directory, table)
+
+    # Registry that memory-maps saved keys from directory as tables are first sampled
+    @classmethod
+    def load(cls, directory, distribution='uniform', zipf_s=1.1):
+        registry = cls(distribution, zipf_s)
+        registry.directory = directory
+        return registry
+
+    def _load_table(self, table):
+        path = os.path.join(self.directory, f"{table}.npy") if self.directory else None
+        if path and os.path.exists(path):
+            self._keys[table] = np.load(path, mmap_mode='r')
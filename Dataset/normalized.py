@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+import columnar
+import key_registry
+
+MANIFEST = 'manifest.json'
+
+# Nested list field of each table that is split into its own child table
+NESTED_FIELDS = {
+    'material_inspections': 'results',
+    'pdir_entries': 'results',
+    'batch_releases': 'conditions',
+    'material_revalidation': 'test_results',
+    'journal_entries': 'entries'
+}
+
+PARENT = 'parent.columns'
+
+
+# Paths of the child table and its offsets inside a normalized table directory
+def child_paths(path, field):
+    return os.path.join(path, f"{field}.columns"), os.path.join(path, f"{field}.offsets")
+
+
+# Streams records into a normalized table: a directory holding the parent rows without
+# the nested field (parent.columns), every nested item as a flat child row
+# (<field>.columns) and rows + 1 offsets linking them (<field>.offsets), so parent row i
+# owns child rows offsets[i]:offsets[i + 1]. Both tables are columnar (see columnar.py).
+# Tables without a nested field only get the parent table.
+class NormalizedWriter:
+    def __init__(self, path, field=None, chunk_size=columnar.DEFAULT_CHUNK_SIZE, append=False):
+        self.path = path
+        self.field = field if field is not None else NESTED_FIELDS.get(key_registry.table_name(path))
+        self.count = 0
+        self.position = None
+        self._end = 0
+        self._offsets = []
+        manifest_path = os.path.join(path, MANIFEST)
+        append = append and os.path.exists(manifest_path)
+        if append:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest['field'] != self.field:
+                raise ValueError(f"{path} splits {manifest['field']!r}, not {self.field!r}")
+            self.position = manifest['position']
+            self._rows = manifest['rows']
+        else:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.makedirs(path)
+            self._rows = 0
+        self.parent = columnar.ColumnarWriter(os.path.join(path, PARENT), chunk_size, append)
+        self.child = None
+        if self.field is None:
+            return
+        child_path, self._offsets_path = child_paths(path, self.field)
+        self.child = columnar.ColumnarWriter(child_path, chunk_size, append)
+        if append:
+            # Cut off offsets written after the last manifest
+            with open(self._offsets_path, 'r+b') as f:
+                f.truncate((self._rows + 1) * 8)
+                f.seek(self._rows * 8)
+                self._end = int(np.frombuffer(f.read(8), dtype='<i8')[0])
+        else:
+            np.zeros(1, dtype='<i8').tofile(self._offsets_path)
+
+    def write(self, record):
+        if self.field is None:
+            self.parent.write(record)
+            self.count += 1
+            return
+        if self.position is None:
+            self.position = list(record).index(self.field) if self.field in record else len(record)
+        items = record.get(self.field) or []
+        self.parent.write({name: value for name, value in record.items() if name != self.field})
+        self.child.write_many(items)
+        self._end += len(items)
+        self._offsets.append(self._end)
+        self.count += 1
+        if len(self._offsets) >= self.parent.chunk_size:
+            self._flush_offsets()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def _flush_offsets(self):
+        with open(self._offsets_path, 'ab') as f:
+            f.write(np.asarray(self._offsets, dtype='<i8').tobytes())
+        self._offsets = []
+
+    def close(self):
+        self.parent.close()
+        manifest = {'format': 'normalized', 'version': 1, 'rows': self._rows + self.count,
+                    'field': self.field, 'position': self.position, 'children': None}
+        if self.child is not None:
+            self.child.close()
+            self._flush_offsets()
+            manifest['children'] = self._end
+        tmp_path = os.path.join(self.path, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Reads a normalized table. Child-level analytics work on the memory-mapped child
+# columns and offsets without building a dict per record, e.g. the failed
+# checkpoints of every inspection:
+#   table = NormalizedTable('data/material_inspections.normalized')
+#   failed = table.child.column('status') == table.code('status', 'Fail')
+#   table.per_parent(failed)
+class NormalizedTable:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.rows = self.manifest['rows']
+        self.field = self.manifest['field']
+        self.parent = columnar.ColumnarTable(os.path.join(path, PARENT))
+        self.child = None
+        if self.field is not None:
+            child_path, self._offsets_path = child_paths(path, self.field)
+            self.child = columnar.ColumnarTable(child_path)
+
+    def __len__(self):
+        return self.rows
+
+    # rows + 1 offsets into the child table; parent row i owns child rows offsets[i]:offsets[i + 1]
+    def offsets(self):
+        return np.memmap(self._offsets_path, dtype='<i8', mode='r', shape=(self.rows + 1,))
+
+    # Number of child rows of every parent row
+    def child_counts(self):
+        return np.diff(self.offsets())
+
+    # Parent row of every child row, for joining child columns to parent columns
+    def parent_index(self):
+        return np.repeat(np.arange(self.rows), self.child_counts())
+
+    # Code of a value in a dictionary-encoded child column, -1 if it never occurs
+    def code(self, name, value):
+        dictionary = self.child.dictionary(name)[:-1].tolist()
+        return dictionary.index(value) if value in dictionary else -1
+
+    # Sum of a per-child-row array (e.g. a boolean mask) over each parent row's children
+    def per_parent(self, values):
+        return np.bincount(self.parent_index(), weights=np.asarray(values, dtype=np.float64), minlength=self.rows)
+
+    # Rebuild the nested records chunk by chunk, with the nested field back in its place
+    def iter_records(self, chunk_size=columnar.DEFAULT_CHUNK_SIZE):
+        if self.field is None:
+            yield from self.parent.iter_records(chunk_size)
+            return
+        offsets = self.offsets()
+        columns = self.child.columns
+        for start in range(0, self.rows, chunk_size):
+            stop = min(start + chunk_size, self.rows)
+            bounds = offsets[start:stop + 1].tolist()
+            child_values = {name: self.child.values(name, bounds[0], bounds[-1]) for name in columns}
+            items = [dict(zip(columns, row)) for row in zip(*child_values.values())] if columns else []
+            parents = {name: self.parent.values(name, start, stop) for name in self.parent.columns}
+            names = list(parents)
+            names.insert(self.manifest['position'], self.field)
+            for i, row in enumerate(zip(*parents.values())):
+                values = list(row)
+                values.insert(self.manifest['position'], items[bounds[i] - bounds[0]:bounds[i + 1] - bounds[0]])
+                yield dict(zip(names, values))
+
+    def to_records(self):
+        return list(self.iter_records())
+
+
+if __name__ == "__main__":
+    import dataset_io
+
+    parser = argparse.ArgumentParser(description="Convert data files to normalized parent/child tables")
+    parser.add_argument('paths', nargs='+', help="Data files, e.g. data/material_inspections.json")
+    args = parser.parse_args()
+    for path in args.paths:
+        target = path[:-len(dataset_io.FORMATS[dataset_io.format_of(path)])] + dataset_io.FORMATS['normalized']
+        count = dataset_io.write_records(target, dataset_io.read_records(path), 'normalized')
+        print(f"{path} ({dataset_io.data_size(path)} bytes) -> {target} "
+              f"({dataset_io.data_size(target)} bytes, {count} records)")
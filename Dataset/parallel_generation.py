@@ -0,0 +1,226 @@
+import argparse
+import importlib
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import amounts
+import batch_engine
+import dataset_io
+import id_allocator
+import key_registry
+import seeding
+import value_pools
+
+# Module scripts whose TABLES are generated in parallel mode
+MODULES = [
+    'generate_sales_data',
+    'generate_purchase_data',
+    'generate_stores_data',
+    'generate_production_data',
+    'generate_quality_data',
+    'generate_logistics_data',
+    'generate_finance_data',
+    'generate_hr_data',
+    'generate_gst_data'
+]
+
+# Rows per shard. Shards are cut by row count, never by worker count,
+# so the same seed gives the same shards whatever --workers is.
+DEFAULT_SHARD_SIZE = 10000
+
+
+# Split num_records rows into (shard_index, count) pairs
+def plan_shards(num_records, shard_size=DEFAULT_SHARD_SIZE):
+    return [(index, min(shard_size, num_records - start))
+            for index, start in enumerate(range(0, num_records, shard_size))]
+
+
+# Generate one shard of a table in a worker process. Tables with foreign keys
+# sample them from the parent keys saved in keys_dir. Primary key ids are
+# allocated from the shard's first row, so shards never repeat each other's ids.
+# consistent_amounts switches on amounts.py's derived tax, totals and balanced journals.
+def run_shard(module_name, filename, shard_index, count, seed, as_of, batch=False,
+              keys_dir=None, key_distribution='uniform', first_row=0, consistent_amounts=False):
+    module = importlib.import_module(module_name)
+    amounts.configure(consistent_amounts)
+    seeding.freeze_clock(as_of, [module])
+    value_pools.set_seed(seed)
+    id_allocator.start(first_row)
+    rng = seeding.seed_module(module, seeding.derive_seed(seed, filename, shard_index))
+    options = {}
+    if key_registry.parents(key_registry.table_name(filename)):
+        options['keys'] = key_registry.KeyRegistry.load(keys_dir, key_distribution)
+    batch_tables = getattr(module, 'BATCH_TABLES', {})
+    if batch and filename in batch_tables:
+        return list(batch_engine.iter_batch_records(batch_tables[filename], count, rng=rng, **options))
+    return module.TABLES[filename](count, **options)
+
+
+# Generate a whole table in a worker process with one of a module's CALENDAR_TABLES
+# writers, which read their input tables from output_dir and write the output
+# themselves. Returns the row count and how long it took.
+def run_table_task(module_name, filename, seed, as_of, output_dir, output_format):
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    seeding.freeze_clock(as_of, [module])
+    value_pools.set_seed(seed)
+    rng = seeding.seed_module(module, seeding.derive_seed(seed, filename))
+    count = module.CALENDAR_TABLES[filename](output_dir, output_format, rng=rng)
+    return count, time.perf_counter() - started
+
+
+# run_shard that also reports how long the shard took to generate
+def run_timed_shard(*args):
+    started = time.perf_counter()
+    records = run_shard(*args)
+    return records, time.perf_counter() - started
+
+
+# Generate every table of the given modules across a process pool and stream
+# the shards to disk in shard order as soon as they are contiguous. A table is
+# started once the parent tables it samples keys from, and any tables listed for
+# it in dependencies ({table: [upstream tables]}), are complete; dependencies on
+# tables outside the run are ignored. on_table_done(filename, stats) is called
+# as each table is written. sizes ({filename: rows}) overrides the default row
+# counts, e.g. from scale.table_sizes(). Tables in cached ({filename: rows}) are
+# already up to date in output_dir: they are not regenerated but still release
+# the tables waiting on them. With calendar=True, tables a module lists in
+# CALENDAR_TABLES are built whole by run_table_task (they cannot be parent tables).
+# consistent_amounts is passed on to every shard (see run_shard).
+# Returns the as-of time and per-table stats
+# (rows, shards, start/end seconds from the start of the run, wall seconds from
+# submission to written, generation seconds summed over shards, longest shard).
+def generate_parallel(modules=MODULES, seed=0, workers=None, shard_size=DEFAULT_SHARD_SIZE,
+                      as_of=None, batch=False, output_dir='data', output_format='json',
+                      key_distribution='uniform', dependencies=None, on_table_done=None, sizes=None,
+                      cached=None, calendar=False, consistent_amounts=False):
+    as_of = as_of or seeding.default_as_of()
+    os.makedirs(output_dir, exist_ok=True)
+    keys_dir = os.path.join(output_dir, '.keys')
+    keys = key_registry.KeyRegistry(key_distribution)
+    dependencies = dependencies or {}
+    cached = cached or {}
+
+    tables = {}
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        for filename, generator in module.TABLES.items():
+            unsharded = filename in getattr(module, 'UNSHARDED_TABLES', ())
+            task = calendar and filename in getattr(module, 'CALENDAR_TABLES', {})
+            tables[filename] = (module_name, generator, unsharded, task)
+    in_run = {key_registry.table_name(filename) for filename in tables}
+    waiting_on = {}
+    for filename in tables:
+        table = key_registry.table_name(filename)
+        upstream = set(key_registry.parents(table)) | set(dependencies.get(table, ()))
+        waiting_on[filename] = upstream & in_run - {table}
+
+    started = time.perf_counter()
+    stats = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures, shard_counts = {}, {}
+
+        def submit(filename):
+            if filename in cached:
+                now = time.perf_counter() - started
+                shard_counts[filename] = 0
+                stats[filename] = {'start': now, 'seconds': 0.0, 'longest_shard': 0.0, 'cached': True}
+                finish(filename, cached[filename])
+                return
+            module_name, generator, unsharded, task = tables[filename]
+            if task:
+                shard_counts[filename] = 1
+                stats[filename] = {'start': time.perf_counter() - started}
+                future = executor.submit(run_table_task, module_name, filename, seed, as_of, output_dir, output_format)
+                futures[future] = (filename, None)
+                return
+            num_records = sizes[filename] if sizes and filename in sizes else batch_engine.table_size(generator)
+            shards = plan_shards(num_records, max(num_records, 1) if unsharded else shard_size)
+            shard_counts[filename] = len(shards)
+            stats[filename] = {'start': time.perf_counter() - started, 'seconds': 0.0, 'longest_shard': 0.0}
+            for shard_index, count in shards:
+                future = executor.submit(run_timed_shard, module_name, filename, shard_index, count, seed, as_of,
+                                         batch, keys_dir, key_distribution, shard_index * shard_size,
+                                         consistent_amounts)
+                futures[future] = (filename, shard_index)
+            if not shards:
+                dataset_io.write_records(dataset_io.output_path(output_dir, filename, output_format), [], output_format)
+                finish(filename, 0)
+
+        def finish(filename, count):
+            table = key_registry.table_name(filename)
+            table_stats = stats[filename]
+            table_stats['end'] = time.perf_counter() - started
+            table_stats['wall'] = table_stats['end'] - table_stats['start']
+            table_stats['rows'] = count
+            table_stats['shards'] = shard_counts[filename]
+            if table in key_registry.PARENT_TABLES and not table_stats.get('cached'):
+                keys.save_table(keys_dir, table)
+            if on_table_done is not None:
+                on_table_done(filename, table_stats)
+            for child, upstream in waiting_on.items():
+                if table in upstream:
+                    upstream.discard(table)
+                    if not upstream:
+                        submit(child)
+
+        # Taken before any submit(): a cached or empty table finishes inside submit() and
+        # submits the children it releases itself, so they must not be submitted again here
+        ready = [filename for filename in tables if not waiting_on[filename]]
+        for filename in ready:
+            submit(filename)
+
+        writers, pending, next_shard = {}, {}, {}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                filename, shard_index = futures.pop(future)
+                table = key_registry.table_name(filename)
+                if shard_index is None:
+                    count, seconds = future.result()
+                    stats[filename].update(seconds=seconds, longest_shard=seconds)
+                    finish(filename, count)
+                    continue
+                records, seconds = future.result()
+                pending.setdefault(filename, {})[shard_index] = records
+                stats[filename]['seconds'] += seconds
+                stats[filename]['longest_shard'] = max(stats[filename]['longest_shard'], seconds)
+                if filename not in writers:
+                    writers[filename] = dataset_io.open_writer(dataset_io.output_path(output_dir, filename, output_format), output_format)
+                    next_shard[filename] = 0
+                while next_shard[filename] in pending[filename]:
+                    records = pending[filename].pop(next_shard[filename])
+                    if table in key_registry.PARENT_TABLES:
+                        records = keys.collect(table, records)
+                    writers[filename].write_many(records)
+                    next_shard[filename] += 1
+                if next_shard[filename] == shard_counts[filename]:
+                    writer = writers.pop(filename)
+                    writer.close()
+                    finish(filename, writer.count)
+    return as_of, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate module datasets in parallel with reproducible per-shard seeds")
+    parser.add_argument('modules', nargs='*', default=MODULES, help="Module scripts to run (default: all nine)")
+    parser.add_argument('--seed', type=int, default=0, help="Global seed; the same seed gives byte-identical files")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help="Rows per shard")
+    parser.add_argument('--as-of', default=None, help="Reference 'now' for relative dates (default: today 00:00)")
+    parser.add_argument('--batch', action='store_true', help="Use NumPy column generators where available")
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='json', help="Output file format")
+    parser.add_argument('--key-distribution', choices=key_registry.DISTRIBUTIONS, default='uniform',
+                        help="How child tables sample parent keys")
+    parser.add_argument('--consistent-amounts', action='store_true',
+                        help="Derive tax from GST rates, totals from their parts and balance journal entries")
+    args = parser.parse_args()
+    def report(filename, stats):
+        print(f"Wrote {filename} ({stats['rows']} records, {stats['shards']} shards)")
+
+    as_of, _ = generate_parallel(args.modules, args.seed, args.workers, args.shard_size, args.as_of, args.batch,
+                                 args.output_dir, args.format, args.key_distribution, on_table_done=report,
+                                 consistent_amounts=args.consistent_amounts)
+    print(f"All datasets have been generated in '{args.output_dir}' (seed={args.seed}, as-of={as_of})")
@@ -0,0 +1,178 @@
+import argparse
+import ast
+import importlib
+import inspect
+import time
+import types
+from collections import defaultdict
+
+import faker
+
+import benchmark
+import key_registry
+import scale
+
+# Name the instrumented code looks the active profile up by in its module
+PROFILE_NAME = '_field_profile'
+
+# Module functions that write files rather than generate rows
+SKIPPED_FUNCTIONS = {'generate_all_datasets'}
+
+# Tables of generators whose entries are swapped for the instrumented functions
+TABLE_DICTS = ('TABLES', 'BATCH_TABLES')
+
+
+# Rewrites a module's functions so every value of a dict literal with string keys
+# (one field of a record, or one column of a batch) runs through profile.field(name, ...)
+# and every call of a module or Faker function (fake.address(), random.choice(),
+# text_engine.text(), ...) through profile.call(name, ...). Nested dicts (bank_details)
+# and helper functions called from a field nest under that field.
+class _Instrumenter(ast.NodeTransformer):
+    def __init__(self, providers):
+        self.providers = providers
+
+    def _wrap(self, method, name, node):
+        thunk = ast.Lambda(args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+                           body=node)
+        call = ast.Call(func=ast.Attribute(value=ast.Name(id=PROFILE_NAME, ctx=ast.Load()), attr=method, ctx=ast.Load()),
+                        args=[ast.Constant(name), thunk], keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_Dict(self, node):
+        self.generic_visit(node)
+        node.values = [self._wrap('field', key.value, value)
+                       if isinstance(key, ast.Constant) and isinstance(key.value, str) else value
+                       for key, value in zip(node.keys, node.values)]
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in self.providers:
+            return self._wrap('call', ast.unparse(func), node)
+        return node
+
+
+# Cumulative time per field and per provider call across profiled generator runs.
+# Every frame (generator, field, provider call) records its inclusive time and its
+# self time (inclusive minus its child frames), the latter keyed by the whole stack
+# for flamegraph output.
+class FieldProfile:
+    def __init__(self):
+        self.stack = []
+        self.tables = {}
+        self.fields = defaultdict(lambda: [0, 0.0, 0.0])
+        self.providers = defaultdict(lambda: [0, 0.0])
+        self.folded = defaultdict(float)
+        self._children = [0.0]
+
+    def _timed(self, kind, name, thunk):
+        self.stack.append((kind, name))
+        self._children.append(0.0)
+        started = time.perf_counter()
+        try:
+            return thunk()
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._children.pop()
+            self._children[-1] += elapsed
+            self.folded[';'.join(frame for _, frame in self.stack)] += elapsed - children
+            if kind == 'field':
+                stats = self.fields[(self.stack[0][1], '.'.join(frame for k, frame in self.stack if k == 'field'))]
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += elapsed - children
+            elif kind == 'call':
+                stats = self.providers[name]
+                stats[0] += 1
+                stats[1] += elapsed
+            else:
+                self.tables[name] = self.tables.get(name, 0.0) + elapsed
+            self.stack.pop()
+
+    def field(self, name, thunk):
+        return self._timed('field', name, thunk)
+
+    def call(self, name, thunk):
+        return self._timed('call', name, thunk)
+
+    # Generate num_records rows of a table (seeded as in benchmark.py) under a root frame
+    def run(self, module, filename, mode, num_records):
+        generator = (module.BATCH_TABLES if mode == 'batch' else module.TABLES)[filename]
+        return self._timed('table', generator.__name__,
+                           lambda: benchmark.generate(module, filename, mode, num_records))
+
+    # Folded stacks ("generator;field;provider microseconds" per line) for flamegraph.pl,
+    # speedscope or inferno
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            for stack, seconds in sorted(self.folded.items()):
+                if round(seconds * 1e6):
+                    f.write(f"{stack} {round(seconds * 1e6)}\n")
+
+    def print_report(self, top=30):
+        print(f"{'generator':<36} {'field':<28} {'calls':>9} {'total ms':>10} {'self ms':>10} {'% of gen':>8}")
+        for (generator, field), (calls, total, own) in sorted(self.fields.items(), key=lambda item: -item[1][1])[:top]:
+            share = total / self.tables[generator] if self.tables.get(generator) else 0
+            print(f"{generator:<36} {field:<28} {calls:>9} {total * 1e3:>10.1f} {own * 1e3:>10.1f} {share:>8.1%}")
+        run_total = sum(self.tables.values())
+        print()
+        print(f"{'provider':<36} {'calls':>9} {'total ms':>10} {'us/call':>9} {'% of run':>8}")
+        for name, (calls, total) in sorted(self.providers.items(), key=lambda item: -item[1][1])[:top]:
+            print(f"{name:<36} {calls:>9} {total * 1e3:>10.1f} {total / calls * 1e6:>9.2f} "
+                  f"{total / run_total if run_total else 0:>8.1%}")
+
+
+# Replace a module's generator functions (and its TABLES/BATCH_TABLES entries) with
+# copies that report to profile. The module source is untouched; instrumented code is
+# compiled against the module's file, so tracebacks and line numbers still match it.
+def instrument(module, profile):
+    path = inspect.getsourcefile(module)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    functions = [node for node in tree.body
+                 if isinstance(node, ast.FunctionDef) and node.name not in SKIPPED_FUNCTIONS]
+    providers = {name for name, value in vars(module).items()
+                 if isinstance(value, (types.ModuleType, faker.Faker)) and name != PROFILE_NAME}
+    instrumented = _Instrumenter(providers).visit(ast.Module(body=functions, type_ignores=[]))
+    code = compile(ast.fix_missing_locations(instrumented), path, 'exec')
+    setattr(module, PROFILE_NAME, profile)
+    exec(code, vars(module))
+    for table_dict in TABLE_DICTS:
+        tables = getattr(module, table_dict, {})
+        for filename, generator in tables.items():
+            tables[filename] = getattr(module, generator.__name__)
+
+
+# Profile the generators of the given modules (optionally only tables whose name
+# contains match) at num_records rows each. Each generator runs once uninstrumented
+# first, so one-off caches (value pools, text corpora) are not billed to a field.
+def profile_tables(modules=scale.ALL_MODULES, num_records=1000, batch=False, match=None):
+    profile = FieldProfile()
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        selected = [(filename, mode) for _, filename, mode in benchmark.cases([module_name])
+                    if (mode == 'batch') == batch and (match is None or match in key_registry.table_name(filename))]
+        for filename, mode in selected:
+            benchmark.generate(module, filename, mode, 10)
+        instrument(module, profile)
+        for filename, mode in selected:
+            profile.run(module, filename, mode, num_records)
+    return profile
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every field and provider call of the table generators")
+    parser.add_argument('modules', nargs='*', default=scale.ALL_MODULES, help="Module scripts to profile (default: all)")
+    parser.add_argument('--rows', type=int, default=1000, help="Rows generated per table")
+    parser.add_argument('--match', default=None, help="Only tables whose name contains this, e.g. supplier_master")
+    parser.add_argument('--batch', action='store_true', help="Profile the BATCH_TABLES column generators instead")
+    parser.add_argument('--top', type=int, default=30, help="Rows shown per report table")
+    parser.add_argument('--folded', default=None, help="Write flamegraph folded stacks (microseconds) to this file")
+    args = parser.parse_args()
+
+    result = profile_tables(args.modules, args.rows, args.batch, args.match)
+    result.print_report(args.top)
+    if args.folded:
+        result.write_folded(args.folded)
+        print(f"Wrote folded stacks to {args.folded} (e.g. flamegraph.pl {args.folded} > profile.svg)")
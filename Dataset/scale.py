@@ -0,0 +1,139 @@
+import argparse
+import importlib
+
+import batch_engine
+import key_registry
+import parallel_generation
+
+# Every module script with tables to size
+ALL_MODULES = parallel_generation.MODULES + ['generate_interaction_data']
+
+
+# Reference tables whose size does not grow with the data volume
+FIXED_TABLES = {
+    'inventory_zones', 'stock_categories', 'shipping_modes', 'gst_configurations', 'payment_terms',
+    'tax_codes', 'role_permissions', 'hsn_codes', 'sac_codes', 'inspection_checklists',
+    'gstr1', 'gstr3b', 'gstr2a', 'gst_reconciliation', 'gst_audit_reports', 'faqs', 'conversations'
+}
+
+# Tables sized per row of another table: table -> (driving table, rows per driving row).
+# The ratios match the default sizes, so scale factor 1 gives the usual row counts.
+RATIOS = {
+    # Sales
+    'sales_orders': ('customer_master', 1),
+    'dispatch_requests': ('sales_orders', 1),
+    'invoices': ('sales_orders', 1),
+    # Purchase
+    'purchase_orders': ('supplier_master', 1),
+    'grn': ('purchase_orders', 1),
+    'purchase_debit_notes': ('purchase_orders', 0.2),
+    # Stores
+    'goods_issue_notes': ('stock_items', 1),
+    'stock_transfers': ('stock_items', 0.5),
+    'stock_aging': ('stock_items', 1),
+    # Production
+    'work_orders': ('batch_cards', 1),
+    'job_cards': ('work_orders', 2),
+    'production_inventory': ('batch_cards', 1),
+    # Quality
+    'batch_releases': ('batch_cards', 1),
+    'material_revalidation': ('material_inspections', 0.2),
+    # Logistics
+    'sales_dispatches': ('sales_orders', 1),
+    'advance_shipment_notices': ('sales_dispatches', 0.5),
+    'dispatch_status_reports': ('sales_dispatches', 1),
+    'sales_register': ('sales_orders', 1),
+    # HR
+    'payroll_details': ('employee_records', 1),
+    'user_access': ('employee_records', 1),
+    'leave_management': ('employee_records', 2),
+    'employee_attendance': ('employee_records', 10),
+    'payroll_processing': ('employee_records', 0.2),
+    'payroll_reports': ('payroll_processing', 1),
+    # GST
+    'e_way_bills': ('e_invoices', 0.5),
+    'credit_debit_notes': ('e_invoices', 0.2)
+}
+
+# Named sizes for capacity planning
+PRESETS = {'small': 0.1, 'medium': 10, 'large': 100}
+
+
+# Default row count of every table of the given modules, keyed by output file
+def default_sizes(modules=ALL_MODULES):
+    sizes = {}
+    for module_name in modules:
+        module = importlib.import_module(module_name)
+        for filename, generator in module.TABLES.items():
+            sizes[filename] = batch_engine.table_size(generator)
+    return sizes
+
+
+# Tables whose row count is more than their primary key ids can number
+# (key_registry.ID_SPACES), as (filename, rows, prefix, digits)
+def id_overflows(sizes):
+    overflows = []
+    for filename, rows in sizes.items():
+        prefix, digits = key_registry.ID_SPACES.get(key_registry.table_name(filename), (None, None))
+        if prefix is not None and rows > 10 ** digits:
+            overflows.append((filename, rows, prefix, digits))
+    return overflows
+
+
+# Raise a ValueError naming every table whose ids would run out at these sizes, so a
+# build fails before generating anything rather than part way through a table
+def check_id_capacity(sizes, scale_factor=1):
+    overflows = id_overflows(sizes)
+    if overflows:
+        tables = '; '.join(f"{filename} needs {rows} rows but {prefix} ids with {digits} digits run out after {10 ** digits}"
+                           for filename, rows, prefix, digits in overflows)
+        raise ValueError(f"Scale factor {scale_factor:g} is too large: {tables}")
+
+
+# Row count of every table at a scale factor (1 gives the default sizes).
+# Reference tables keep their size, tables in RATIOS follow their driving table
+# and every other table grows linearly; scaled tables get at least one row.
+# Sizes are worked out over all modules, so they do not depend on which are run.
+# Raises a ValueError if a table would need more ids than its prefix has.
+def table_sizes(scale_factor=1, modules=ALL_MODULES):
+    defaults = {key_registry.table_name(filename): size for filename, size in default_sizes(ALL_MODULES).items()}
+    sizes = {}
+
+    def size(table):
+        if table not in sizes:
+            if table in FIXED_TABLES:
+                sizes[table] = defaults[table]
+            elif table in RATIOS:
+                driver, ratio = RATIOS[table]
+                sizes[table] = max(1, round(size(driver) * ratio))
+            else:
+                sizes[table] = max(1, round(defaults[table] * scale_factor))
+        return sizes[table]
+
+    result = {filename: size(key_registry.table_name(filename)) for filename in default_sizes(modules)}
+    check_id_capacity(result, scale_factor)
+    return result
+
+
+# Scale factor from a number or a preset name, e.g. '100' or 'small'
+def parse_scale_factor(value):
+    if value in PRESETS:
+        return PRESETS[value]
+    scale_factor = float(value)
+    if scale_factor <= 0:
+        raise argparse.ArgumentTypeError(f"scale factor must be positive, got {value}")
+    return scale_factor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the row count of every table at a scale factor")
+    parser.add_argument('scale_factor', type=parse_scale_factor, nargs='?', default=1,
+                        help=f"Scale factor or preset ({', '.join(PRESETS)})")
+    args = parser.parse_args()
+    try:
+        sizes = table_sizes(args.scale_factor)
+    except ValueError as e:
+        parser.error(str(e))
+    for filename, count in sizes.items():
+        print(f"{filename:<32} {count:>12}")
+    print(f"{'total':<32} {sum(sizes.values()):>12}")
@@ -1,97 +1,171 @@
+import argparse
 import os
 import json
-from pymongo import MongoClient
-from pymongo.errors import OperationFailure, ConnectionFailure
-from dotenv import load_dotenv
+import time
 import sys
 
+import bulk_loader
+import dataset_io
+import index_plan
+import seed_manifest
+import sinks
+
+try:
+    from dotenv import load_dotenv
+except ImportError:  # only needed to read MONGO_URI from a .env file
+    load_dotenv = None
+
 # Load environment variables from .env file
-load_dotenv()
+if load_dotenv is not None:
+    load_dotenv()
 
 # MongoDB credentials from environment variables
 MONGO_URI = os.getenv('MONGO_URI')
 MONGO_DB_NAME = os.getenv('MONGO_DB_NAME')
 
-# Debugging: Print the environment variables (redacted version for security)
-if MONGO_URI:
-    # Show only part of the connection string for security
-    redacted_uri = MONGO_URI[:10] + "..." + MONGO_URI[-10:] if len(MONGO_URI) > 20 else "..."
-    print(f"MONGO_URI detected (redacted for security)")
-else:
-    print(f"MONGO_URI not found in environment variables")
 
-print(f"MONGO_DB_NAME: {MONGO_DB_NAME}")
+# Connect to MongoDB with improved error handling. Only the mongo sink connects, when
+# seeding starts rather than at import, so the other sinks work offline.
+def connect_mongo():
+    from pymongo.errors import OperationFailure, ConnectionFailure
 
-# Connect to MongoDB with improved error handling
-try:
-    # Test the connection before proceeding
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    # Force a connection to verify credentials
-    client.admin.command('ping')
-    db = client[MONGO_DB_NAME]
-    print("Successfully connected to MongoDB!")
-except ConnectionFailure:
-    print("Failed to connect to MongoDB server. Please check if the server is running.")
-    sys.exit(1)
-except OperationFailure as e:
-    if "auth" in str(e).lower():
-        print("Authentication failed. Please check your username and password in the connection string.")
-        print("Tip: Ensure your MongoDB Atlas username and password are correct and properly URL-encoded.")
+    # Debugging: Print the environment variables (redacted version for security)
+    if MONGO_URI:
+        print("MONGO_URI detected (redacted for security)")
     else:
-        print(f"MongoDB operation failed: {e}")
-    sys.exit(1)
-except Exception as e:
-    print(f"An unexpected error occurred: {e}")
-    sys.exit(1)
-
-# Function to insert JSON data into MongoDB
-def insert_json_into_mongodb(file_path, collection_name):
+        print("MONGO_URI not found in environment variables")
+
+    print(f"MONGO_DB_NAME: {MONGO_DB_NAME}")
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        
-        # Get or create the collection
-        collection = db[collection_name]
-        
-        # Insert data into the collection
-        result = None
-        if isinstance(data, list):
-            if not data:  # Check if the list is empty
-                print(f"Warning: Empty list in {file_path}, skipping.")
-                return
-            result = collection.insert_many(data)  # Insert multiple documents
-            print(f"Inserted {len(result.inserted_ids)} documents from {file_path}")
-        else:
-            result = collection.insert_one(data)  # Insert a single document
-            print(f"Inserted document with ID {result.inserted_id} from {file_path}")
-    except json.JSONDecodeError:
-        print(f"Error: {file_path} contains invalid JSON. Please check the file format.")
+        sink = sinks.MongoSink(MONGO_URI, MONGO_DB_NAME)
+        # Force a connection to verify credentials
+        sink.ping()
+        print("Successfully connected to MongoDB!")
+        return sink
+    except ConnectionFailure:
+        print("Failed to connect to MongoDB server. Please check if the server is running.")
+        sys.exit(1)
     except OperationFailure as e:
-        print(f"MongoDB operation failed for {file_path}: {e}")
-        if "authentication" in str(e).lower():
-            print("Please check your MongoDB credentials and permissions.")
+        if "auth" in str(e).lower():
+            print("Authentication failed. Please check your username and password in the connection string.")
+            print("Tip: Ensure your MongoDB Atlas username and password are correct and properly URL-encoded.")
+        else:
+            print(f"MongoDB operation failed: {e}")
+        sys.exit(1)
     except Exception as e:
-        print(f"Error inserting data from {file_path}: {e}")
+        print(f"An unexpected error occurred: {e}")
+        sys.exit(1)
 
-# Function to process all JSON files in the data folder
-def process_json_files(data_folder):
-    json_files = [f for f in os.listdir(data_folder) if f.endswith('.json')]
+
+# The sink to seed into: MongoDB, an SQLite file, a directory of data files or the
+# in-process stand-in (see sinks.py)
+def open_sink(kind, target=None, fmt='ndjson'):
+    if kind == 'mongo':
+        return connect_mongo()
+    if kind == 'sqlite':
+        return sinks.SQLiteSink(target or 'seed.sqlite')
+    if kind == 'files':
+        return sinks.FileSink(target or 'seeded', fmt)
+    return sinks.MemorySink()
+
+
+# Report one loaded file, with the same hints for invalid JSON and auth failures as before
+def report_file(filename, stats):
+    error = stats.get('error')
+    if isinstance(error, json.JSONDecodeError):
+        print(f"Error: {filename} contains invalid JSON. Please check the file format.")
+        print(f"{stats['inserted']} documents read before the error were inserted.")
+    elif error is not None:
+        print(f"Error inserting data from {filename}: {error}")
+    elif stats.get('skipped'):
+        print(f"Skipped {filename}: unchanged since its last complete load ({stats['rows']} documents)")
+    elif not stats['rows'] and not stats.get('removed'):
+        print(f"Warning: No records in {filename}, skipping.")
+    elif 'removed' in stats:
+        print(f"Upserted {stats['inserted']} new or changed documents of {stats['rows']} from {filename}, "
+              f"removed {stats['removed']} ({stats['seconds']:.2f}s)")
+    else:
+        rate = stats['inserted'] / stats['seconds'] if stats['seconds'] else 0
+        print(f"Inserted {stats['inserted']} documents from {filename} in {stats['batches']} batches "
+              f"({stats['seconds']:.2f}s, {rate:,.0f} docs/s)")
+    if stats.get('index_error') is not None:
+        print(f"Warning: upserted {filename} without a unique key index: {stats['index_error']}")
+    for batch_error in stats['errors']:
+        print(f"MongoDB operation failed for {filename}: {batch_error}")
+        if "authentication" in str(batch_error).lower():
+            print("Please check your MongoDB credentials and permissions.")
+
+
+# Report one index build
+def report_index(collection_name, name, seconds, error):
+    if error is not None:
+        print(f"Failed to build index {name} on '{collection_name}': {error}")
+    else:
+        print(f"Built index {name} on '{collection_name}' in {seconds:.2f}s")
+
+
+# Function to process all data files in the data folder into a sink: several collections
+# load at once, each in unordered insert_many batches (see bulk_loader.py). With
+# use_manifest (on sinks that keep their data and support upserts), files already
+# seeded into this target are skipped and changed ones only upsert
+# their changed records (see seed_manifest.py). With build_indexes, the collections'
+# indexes (see index_plan.py) are built once every file has been loaded.
+def process_json_files(sink, data_folder, workers=bulk_loader.DEFAULT_WORKERS, batch_size=bulk_loader.DEFAULT_BATCH_SIZE,
+                       max_in_flight=bulk_loader.DEFAULT_MAX_IN_FLIGHT, file_workers=bulk_loader.DEFAULT_FILE_WORKERS,
+                       use_manifest=True, build_indexes=True, index_workers=index_plan.DEFAULT_WORKERS):
+    json_files = dataset_io.data_files(data_folder)
     
     if not json_files:
-        print(f"No JSON files found in '{data_folder}' directory.")
+        print(f"No data files found in '{data_folder}' directory.")
         return
         
-    print(f"Found {len(json_files)} JSON files to process.")
+    print(f"Found {len(json_files)} data files to process.")
     
-    for filename in json_files:
-        file_path = os.path.join(data_folder, filename)
-        collection_name = os.path.splitext(filename)[0]  # Use filename as collection name
-        print(f"Processing {filename} into collection '{collection_name}'...")
-        insert_json_into_mongodb(file_path, collection_name)
+    if use_manifest and sink.persistent and sink.supports_upsert:
+        manifest = seed_manifest.SeedManifest(data_folder, sink.name)
+    else:
+        manifest = None
+    loader = bulk_loader.BulkLoader(sink, workers, batch_size, max_in_flight, file_workers, manifest)
+    started = time.perf_counter()
+    results = loader.load(data_folder, json_files, on_file_done=report_file)
+    elapsed = time.perf_counter() - started
+    inserted = sum(stats['inserted'] for stats in results.values())
+    skipped = sum(1 for stats in results.values() if stats.get('skipped'))
+    print(f"Wrote {inserted} documents into {len(results) - skipped} collections in {elapsed:.2f}s "
+          f"({inserted / elapsed if elapsed else 0:,.0f} docs/s), {skipped} unchanged collections skipped")
+    if build_indexes:
+        started = time.perf_counter()
+        builds = index_plan.build_indexes(sink, sorted(results), index_workers, on_index_done=report_index)
+        failed = sum(1 for build in builds if build[3] is not None)
+        print(f"Built {len(builds) - failed} indexes in {time.perf_counter() - started:.2f}s ({failed} failed)")
+    return results
 
 # Main function
 if __name__ == "__main__":
-    data_folder = 'data'  # Folder containing JSON files
+    parser = argparse.ArgumentParser(description="Load the generated data files into MongoDB or another sink")
+    parser.add_argument('--data-folder', default='data', help="Folder containing the data files")
+    parser.add_argument('--sink', choices=sorted(sinks.SINKS), default='mongo',
+                        help="Where to load the data (default: MongoDB from MONGO_URI)")
+    parser.add_argument('--target', default=None,
+                        help="SQLite database file (default: seed.sqlite) or output directory (default: seeded)")
+    parser.add_argument('--format', choices=sorted(dataset_io.FORMATS), default='ndjson',
+                        help="File format of the files sink")
+    parser.add_argument('--workers', type=int, default=bulk_loader.DEFAULT_WORKERS,
+                        help="Threads sending insert batches")
+    parser.add_argument('--file-workers', type=int, default=bulk_loader.DEFAULT_FILE_WORKERS,
+                        help="Files (collections) loaded at the same time")
+    parser.add_argument('--batch-size', type=int, default=bulk_loader.DEFAULT_BATCH_SIZE,
+                        help="Documents per insert_many request")
+    parser.add_argument('--max-in-flight', type=int, default=bulk_loader.DEFAULT_MAX_IN_FLIGHT,
+                        help="Batches queued or being inserted at once, across all collections")
+    parser.add_argument('--no-manifest', action='store_true',
+                        help="Insert every file without checking or updating the seed manifest")
+    parser.add_argument('--no-indexes', action='store_true', help="Skip building the index plan after the load")
+    parser.add_argument('--index-workers', type=int, default=index_plan.DEFAULT_WORKERS,
+                        help="Collections whose indexes are built at the same time")
+    args = parser.parse_args()
+    data_folder = args.data_folder  # Folder containing JSON files
     if not os.path.exists(data_folder):
         print(f"Error: The folder '{data_folder}' does not exist.")
         print(f"Current working directory: {os.getcwd()}")
@@ -99,6 +173,13 @@ if __name__ == "__main__":
         for item in os.listdir('.'):
             print(f" - {item}")
     else:
-        print(f"Starting data insertion from '{data_folder}' into MongoDB...")
-        process_json_files(data_folder)
+        if args.sink == 'files' and os.path.abspath(args.target or 'seeded') == os.path.abspath(data_folder):
+            print("Error: the files sink cannot write into the data folder it reads from.")
+            sys.exit(1)
+        sink = open_sink(args.sink, args.target, args.format)
+        print(f"Starting data insertion from '{data_folder}' into {sink.name}...")
+        process_json_files(sink, data_folder, args.workers, args.batch_size, args.max_in_flight, args.file_workers,
+                           use_manifest=not args.no_manifest, build_indexes=not args.no_indexes,
+                           index_workers=args.index_workers)
+        sink.close()
         print("Process completed.")
\ No newline at end of file
@@ -0,0 +1,169 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Manifest of what has been seeded from a data folder, per target database
+MANIFEST_FILE = '.seed_manifest.json'
+
+# Per-table record digests of the last complete load, under the data folder
+DIGESTS_DIR = '.seed'
+
+# Keys per SQLite lookup, under SQLite's default limit of 999 bound parameters
+LOOKUP_SIZE = 900
+
+
+# sha256 of a data file, or of every file of a columnar/normalized table directory
+def file_checksum(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    else:
+        paths = [path]
+    for file_path in paths:
+        if len(paths) > 1:
+            digest.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# Short content hash of a record that does not depend on key order
+def record_digest(record):
+    return hashlib.blake2b(json.dumps(record, sort_keys=True, separators=(',', ':'), default=str).encode(),
+                           digest_size=8).hexdigest()
+
+
+# Natural key -> record digest of one table, kept in an SQLite file so a table of any size
+# is diffed and recorded batch by batch without holding its digests in memory. 'digests'
+# holds the last complete load; a load writes its digests into 'loading', which replaces
+# 'digests' on commit() and is discarded if the load never completes. The store is used
+# from the one thread loading its table.
+class DigestStore:
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        for table in ('digests', 'loading'):
+            # No type on key, so integer keys come back as integers
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {table} (key PRIMARY KEY, digest TEXT NOT NULL) WITHOUT ROWID')
+        self._connection.execute('DELETE FROM loading')
+        self._connection.commit()
+
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM digests').fetchone()[0]
+
+    # Forget the last complete load, e.g. when the target no longer matches it
+    def clear(self):
+        self._connection.execute('DELETE FROM digests')
+        self._connection.commit()
+
+    # {key: digest} of the last complete load for the given keys (those it has)
+    def previous(self, keys):
+        found = {}
+        for start in range(0, len(keys), LOOKUP_SIZE):
+            chunk = keys[start:start + LOOKUP_SIZE]
+            found.update(self._connection.execute(
+                f"SELECT key, digest FROM digests WHERE key IN ({', '.join('?' * len(chunk))})", chunk))
+        return found
+
+    # Record (key, digest) pairs of the load in progress
+    def add(self, pairs):
+        self._connection.executemany('INSERT OR REPLACE INTO loading (key, digest) VALUES (?, ?)', pairs)
+
+    # Keys of the last complete load that the load in progress does not have, in lists of
+    # up to batch_size
+    def removed(self, batch_size):
+        cursor = self._connection.execute('SELECT key FROM digests WHERE key NOT IN (SELECT key FROM loading)')
+        for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+            yield [key for key, in rows]
+
+    # Make the load in progress the last complete load
+    def commit(self):
+        with self._connection:
+            self._connection.execute('DELETE FROM digests')
+            self._connection.execute('INSERT INTO digests SELECT key, digest FROM loading')
+            self._connection.execute('DELETE FROM loading')
+
+    def close(self):
+        self._connection.close()
+
+
+# Files seeded from a data folder into one target (e.g. a database name): each file's
+# checksum, row count and status ('loading' until its load finishes without errors, so
+# an interrupted seed is never trusted), plus a DigestStore per table with the natural
+# key -> record digest of its last complete load, which the next seed diffs against to
+# upsert only changed records.
+class SeedManifest:
+    def __init__(self, data_folder, target):
+        self.path = os.path.join(data_folder, MANIFEST_FILE)
+        self.digests_dir = os.path.join(data_folder, DIGESTS_DIR, target)
+        self.target = target
+        self.manifests = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.manifests = json.load(f)
+        self.entries = self.manifests.setdefault(target, {})
+
+    # Whether a file with this checksum was loaded completely
+    def is_unchanged(self, filename, checksum):
+        return self.is_complete(filename) and self.entries[filename]['checksum'] == checksum
+
+    def rows(self, filename):
+        return self.entries[filename]['rows']
+
+    # Whether the last load of a file finished, so its table's digests can be trusted
+    def is_complete(self, filename):
+        entry = self.entries.get(filename)
+        return entry is not None and entry['status'] == 'complete'
+
+    # The digest store of a table, created empty if it has none
+    def digest_store(self, table):
+        os.makedirs(self.digests_dir, exist_ok=True)
+        return DigestStore(os.path.join(self.digests_dir, f"{table}.sqlite"))
+
+    # Record that a file is being loaded, before any of it is written to the target
+    def start(self, filename, checksum):
+        with self._lock:
+            self.entries[filename] = {'checksum': checksum, 'status': 'loading', 'rows': None,
+                                      'started': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            self.save()
+
+    # Record a finished load, committing the digests it left the table with (a DigestStore)
+    def complete(self, filename, rows, digests):
+        digests.commit()
+        with self._lock:
+            self.entries[filename].update(status='complete', rows=rows,
+                                          finished=time.strftime('%Y-%m-%dT%H:%M:%S'))
+            self.save()
+
+    def save(self):
+        _write_json(self.path, self.manifests, indent=2)
+
+
+def _write_json(path, value, indent=None):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f, indent=indent, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show what has been seeded from a data folder")
+    parser.add_argument('--data-folder', default='data')
+    args = parser.parse_args()
+    path = os.path.join(args.data_folder, MANIFEST_FILE)
+    if not os.path.exists(path):
+        print(f"No seed manifest in '{args.data_folder}'")
+    else:
+        with open(path) as f:
+            for target, entries in json.load(f).items():
+                print(f"{target}:")
+                for filename, entry in sorted(entries.items()):
+                    missing = '' if os.path.exists(os.path.join(args.data_folder, filename)) else ' (file missing)'
+                    rows = entry['rows'] if entry['rows'] is not None else '-'
+                    print(f"  {filename:<36} {entry['status']:<9} {rows:>8}{missing}")
@@ -0,0 +1,68 @@
+import hashlib
+import random
+from datetime import date, datetime
+
+import faker.providers.date_time as faker_date_time
+
+import batch_engine
+
+
+# Derive a 63-bit seed from a global seed and any labels (table name, shard index, ...)
+def derive_seed(seed, *parts):
+    key = ":".join(str(part) for part in (seed, *parts)).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], 'big') >> 1
+
+
+# datetime/date stand-ins whose now()/today() return a pinned reference time.
+# The metaclass keeps isinstance() working for ordinary datetime/date values.
+class _FrozenDatetimeMeta(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, datetime)
+
+
+class _FrozenDateMeta(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, date)
+
+
+class FrozenDatetime(datetime, metaclass=_FrozenDatetimeMeta):
+    as_of = None
+
+    @classmethod
+    def now(cls, tz=None):
+        as_of = datetime.fromisoformat(cls.as_of)
+        return as_of.astimezone(tz) if tz is not None else as_of
+
+    @classmethod
+    def today(cls):
+        return cls.now()
+
+
+class FrozenDate(date, metaclass=_FrozenDateMeta):
+    @classmethod
+    def today(cls):
+        return FrozenDatetime.now().date()
+
+
+# Default reference time: today at midnight, so runs on the same day agree
+def default_as_of():
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+
+# Pin "now" for Faker's relative dates ("-1y", "now") and for the given generator modules
+def freeze_clock(as_of, modules=()):
+    FrozenDatetime.as_of = as_of
+    faker_date_time.datetime = FrozenDatetime
+    faker_date_time.dtdate = FrozenDate
+    batch_engine.datetime = FrozenDatetime
+    for module in modules:
+        if getattr(module, 'datetime', None) is not None:
+            module.datetime = FrozenDatetime
+
+
+# Seed every source of randomness a generator module uses
+def seed_module(module, seed):
+    random.seed(seed)
+    if hasattr(module, 'fake'):
+        module.fake.seed_instance(seed)
+    return batch_engine.make_rng(seed)
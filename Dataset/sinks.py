@@ -0,0 +1,329 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import dataset_io
+import key_registry
+
+try:
+    from pymongo import MongoClient, ReplaceOne
+except ImportError:  # only needed for the mongo sink
+    MongoClient = ReplaceOne = None
+
+
+# Where bulk_loader.BulkLoader writes documents and index_plan.build_indexes builds
+# indexes. Every method takes the collection (table) name first. Sinks that support
+# upserts also provide upsert_many(collection_name, key_field, documents), which inserts
+# or replaces documents by key_field and returns how many were written, and
+# delete_keys(collection_name, key_field, keys); key_field is the table's natural key.
+class Sink(ABC):
+    # Name the seed manifest tracks this target under
+    name = None
+
+    # Whether data written survives the process, so a seed manifest can vouch for it
+    persistent = True
+
+    # Whether upsert_many and delete_keys are supported
+    supports_upsert = True
+
+    # Insert documents as an unordered batch; returns how many were inserted
+    @abstractmethod
+    def insert_many(self, collection_name, documents):
+        pass
+
+    # Documents in a collection (may be an estimate)
+    @abstractmethod
+    def count(self, collection_name):
+        pass
+
+    # Build an index on keys [(field, 1 or -1)]
+    @abstractmethod
+    def create_index(self, collection_name, keys, name, unique=False):
+        pass
+
+    def close(self):
+        pass
+
+
+# A MongoDB database. Connecting is lazy: ping() checks the server and credentials.
+class MongoSink(Sink):
+    def __init__(self, uri, db_name, timeout_ms=5000):
+        if MongoClient is None:
+            raise ImportError("The mongo sink needs pymongo: pip install pymongo")
+        self.client = MongoClient(uri, serverSelectionTimeoutMS=timeout_ms)
+        self.db = self.client[db_name]
+        self.name = db_name
+
+    def ping(self):
+        self.client.admin.command('ping')
+
+    def insert_many(self, collection_name, documents):
+        return len(self.db[collection_name].insert_many(documents, ordered=False).inserted_ids)
+
+    def upsert_many(self, collection_name, key_field, documents):
+        result = self.db[collection_name].bulk_write(
+            [ReplaceOne({key_field: document[key_field]}, document, upsert=True) for document in documents],
+            ordered=False)
+        return result.upserted_count + result.modified_count
+
+    def delete_keys(self, collection_name, key_field, keys):
+        self.db[collection_name].delete_many({key_field: {'$in': list(keys)}})
+
+    def count(self, collection_name):
+        return self.db[collection_name].estimated_document_count()
+
+    def create_index(self, collection_name, keys, name, unique=False):
+        self.db[collection_name].create_index(keys, name=name, unique=unique)
+
+    def close(self):
+        self.client.close()
+
+
+# An embedded SQLite database file: one table per collection holding each document as
+# JSON next to its natural key, with indexes on json_extract() expressions. Writes from
+# the loader's threads share one connection and are serialized.
+class SQLiteSink(Sink):
+    def __init__(self, path):
+        self.path = path
+        self.name = f"sqlite:{os.path.abspath(path)}"
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._lock = threading.Lock()
+        self._tables = set()
+
+    def _table(self, collection_name):
+        if collection_name not in self._tables:
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{collection_name}" (key TEXT, doc TEXT NOT NULL)')
+            self._connection.execute(f'CREATE INDEX IF NOT EXISTS "{collection_name}__key" ON "{collection_name}" (key)')
+            self._tables.add(collection_name)
+        return f'"{collection_name}"'
+
+    def _rows(self, collection_name, documents):
+        key_field = key_registry.PRIMARY_KEYS.get(collection_name)
+        return [(None if key_field is None else document.get(key_field), json.dumps(document, separators=(',', ':')))
+                for document in documents]
+
+    def _write(self, statements):
+        with self._lock:
+            self._connection.execute('BEGIN')
+            try:
+                for sql, rows in statements:
+                    self._connection.executemany(sql, rows)
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+    def insert_many(self, collection_name, documents):
+        rows = self._rows(collection_name, documents)
+        with self._lock:
+            table = self._table(collection_name)
+        self._write([(f'INSERT INTO {table} (key, doc) VALUES (?, ?)', rows)])
+        return len(rows)
+
+    def upsert_many(self, collection_name, key_field, documents):
+        rows = [(document[key_field], json.dumps(document, separators=(',', ':'))) for document in documents]
+        with self._lock:
+            table = self._table(collection_name)
+        self._write([(f'DELETE FROM {table} WHERE key = ?', [(key,) for key, _ in rows]),
+                     (f'INSERT INTO {table} (key, doc) VALUES (?, ?)', rows)])
+        return len(rows)
+
+    def delete_keys(self, collection_name, key_field, keys):
+        with self._lock:
+            table = self._table(collection_name)
+        self._write([(f'DELETE FROM {table} WHERE key = ?', [(key,) for key in keys])])
+
+    def count(self, collection_name):
+        with self._lock:
+            table = self._table(collection_name)
+            return self._connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def create_index(self, collection_name, keys, name, unique=False):
+        columns = ', '.join(f"json_extract(doc, '$.{field}'){' DESC' if direction < 0 else ''}" for field, direction in keys)
+        with self._lock:
+            table = self._table(collection_name)
+            self._connection.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS '
+                                     f'"{collection_name}__{name}" ON {table} ({columns})')
+
+    def close(self):
+        self._connection.close()
+
+
+# A directory of data files, one per collection (NDJSON by default, or any
+# dataset_io format), rewritten on each run. It can only insert.
+class FileSink(Sink):
+    supports_upsert = False
+
+    def __init__(self, directory, fmt='ndjson'):
+        if fmt not in dataset_io.FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}, expected one of {sorted(dataset_io.FORMATS)}")
+        self.directory = directory
+        self.fmt = fmt
+        self.name = f"files:{os.path.abspath(directory)}"
+        self._writers = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _writer(self, collection_name):
+        with self._lock:
+            if collection_name not in self._writers:
+                path = dataset_io.output_path(self.directory, f"{collection_name}.json", self.fmt)
+                self._writers[collection_name] = dataset_io.open_writer(path, self.fmt)
+                self._locks[collection_name] = threading.Lock()
+            return self._writers[collection_name], self._locks[collection_name]
+
+    def insert_many(self, collection_name, documents):
+        writer, lock = self._writer(collection_name)
+        with lock:
+            writer.write_many(documents)
+        return len(documents)
+
+    def count(self, collection_name):
+        with self._lock:
+            writer = self._writers.get(collection_name)
+            return writer.count if writer is not None else 0
+
+    # Files have no indexes
+    def create_index(self, collection_name, keys, name, unique=False):
+        pass
+
+    def close(self):
+        with self._lock:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers.clear()
+
+
+# Raised by MemorySink.insert_many when some documents were rejected, with the same
+# details as pymongo's BulkWriteError ('nInserted', 'writeErrors')
+class MemoryBulkWriteError(Exception):
+    def __init__(self, details):
+        super().__init__(f"{len(details['writeErrors'])} write errors")
+        self.details = details
+
+
+# An in-process stand-in for a MongoDB database, for measuring the loader without a
+# server. Like pymongo's insert_many it adds an _id to every document passed in,
+# rejects duplicate _ids and unique index violations without stopping the batch and
+# reports them in a MemoryBulkWriteError; upserts replace the document with the same
+# key and keep its _id. Nothing is kept after the process exits.
+class MemorySink(Sink):
+    name = 'memory'
+    persistent = False
+
+    def __init__(self):
+        self.collections = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    # Documents by _id and, per unique index, {key values: _id}
+    def _collection(self, collection_name):
+        if collection_name not in self.collections:
+            self.collections[collection_name] = {'documents': {}, 'unique': {}}
+        return self.collections[collection_name]
+
+    @staticmethod
+    def _index_key(document, fields):
+        return tuple(json.dumps(document.get(field), sort_keys=True) for field in fields)
+
+    def _add(self, collection, document):
+        if document['_id'] in collection['documents']:
+            return f"duplicate _id {document['_id']}"
+        for fields, index in collection['unique'].items():
+            if self._index_key(document, fields) in index:
+                return f"duplicate key {dict(zip(fields, (document.get(field) for field in fields)))}"
+        collection['documents'][document['_id']] = document
+        for fields, index in collection['unique'].items():
+            index[self._index_key(document, fields)] = document['_id']
+        return None
+
+    def _remove(self, collection, _id):
+        document = collection['documents'].pop(_id)
+        for fields, index in collection['unique'].items():
+            index.pop(self._index_key(document, fields), None)
+
+    def insert_many(self, collection_name, documents):
+        with self._lock:
+            collection = self._collection(collection_name)
+            inserted, errors = 0, []
+            for position, document in enumerate(documents):
+                if '_id' not in document:
+                    self._next_id += 1
+                    document['_id'] = self._next_id
+                error = self._add(collection, dict(document))
+                if error is None:
+                    inserted += 1
+                else:
+                    errors.append({'index': position, 'errmsg': error})
+        if errors:
+            raise MemoryBulkWriteError({'nInserted': inserted, 'writeErrors': errors})
+        return inserted
+
+    def _find(self, collection, key_field, key):
+        for _id, document in collection['documents'].items():
+            if document.get(key_field) == key:
+                return _id
+        return None
+
+    # Lookup of documents by key_field: its unique index if there is one, else a scan
+    def _key_lookup(self, collection, key_field):
+        index = collection['unique'].get((key_field,))
+        if index is not None:
+            return lambda key: index.get(self._index_key({key_field: key}, (key_field,)))
+        return lambda key: self._find(collection, key_field, key)
+
+    def upsert_many(self, collection_name, key_field, documents):
+        with self._lock:
+            collection = self._collection(collection_name)
+            lookup = self._key_lookup(collection, key_field)
+            for document in documents:
+                _id = lookup(document[key_field])
+                if _id is not None:
+                    self._remove(collection, _id)
+                else:
+                    self._next_id += 1
+                    _id = self._next_id
+                self._add(collection, dict(document, _id=_id))
+        return len(documents)
+
+    def delete_keys(self, collection_name, key_field, keys):
+        with self._lock:
+            collection = self._collection(collection_name)
+            lookup = self._key_lookup(collection, key_field)
+            for key in keys:
+                _id = lookup(key)
+                if _id is not None:
+                    self._remove(collection, _id)
+
+    def count(self, collection_name):
+        with self._lock:
+            return len(self._collection(collection_name)['documents'])
+
+    # Unique indexes are enforced; other indexes are accepted and ignored
+    def create_index(self, collection_name, keys, name, unique=False):
+        if not unique:
+            return
+        fields = tuple(field for field, _ in keys)
+        with self._lock:
+            collection = self._collection(collection_name)
+            index = {}
+            for _id, document in collection['documents'].items():
+                key = self._index_key(document, fields)
+                if key in index:
+                    raise ValueError(f"Cannot build unique index {name} on '{collection_name}': duplicate key {key}")
+                index[key] = _id
+            collection['unique'][fields] = index
+
+
+# Sink kinds by name, as chosen with seed.py --sink
+SINKS = {
+    'mongo': MongoSink,
+    'sqlite': SQLiteSink,
+    'files': FileSink,
+    'memory': MemorySink
+}
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import numpy as np
+
+import generate_hr_data
+import id_allocator
+
+
+def test_calendar_attendance_ids_continue_into_appends():
+    calendar = {
+        "employee_id": np.array(["EMP1", "EMP2", "EMP3"], dtype=object),
+        "join_date": np.array(["2024-01-01"] * 3, dtype='datetime64[D]'),
+        "leave_employee": np.array([], dtype=np.int64),
+        "leave_start": np.array([], dtype='datetime64[D]'),
+        "leave_end": np.array([], dtype='datetime64[D]')
+    }
+    ids = [value for columns in generate_hr_data.generate_employee_attendance_calendar(
+        calendar, start_date=datetime(2024, 1, 1), end_date=datetime(2024, 3, 31), chunk_size=20) for value in columns["attendance_id"]]
+    # An append starts allocating at the table's row count
+    id_allocator.start(len(ids))
+    appended = [id_allocator.next_id("ATT", 8) for _ in range(10)]
+    assert len(set(ids + appended)) == len(ids) + 10
+    id_allocator.start(0)
+    assert ids + appended == id_allocator.id_column(len(ids) + 10, "ATT", 8).tolist()
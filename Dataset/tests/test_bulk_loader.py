@@ -0,0 +1,54 @@
+import json
+
+import bulk_loader
+import seed_manifest
+import sinks
+
+
+def _write_orders(folder, count):
+    with open(folder / 'sales_orders.json', 'w') as f:
+        json.dump([{'order_id': f"SO{i}", 'total_amount': i} for i in range(count)], f)
+
+
+def test_unmanifested_collection_is_upserted_through_a_unique_key_index(tmp_path):
+    _write_orders(tmp_path, 50)
+    sink = sinks.MemorySink()
+    sink.insert_many('sales_orders', [{'order_id': f"SO{i}", 'total_amount': -1} for i in range(20)])
+    manifest = seed_manifest.SeedManifest(str(tmp_path), 'test')
+    results = bulk_loader.BulkLoader(sink, batch_size=8, manifest=manifest).load(str(tmp_path))
+    stats = results['sales_orders']
+    assert not stats['errors'] and 'index_error' not in stats
+    assert ('order_id',) in sink.collections['sales_orders']['unique']
+    documents = sink.collections['sales_orders']['documents'].values()
+    assert sorted(document['total_amount'] for document in documents) == list(range(50))
+
+
+def test_duplicate_keys_fall_back_to_upserts_without_the_index(tmp_path):
+    _write_orders(tmp_path, 5)
+    sink = sinks.MemorySink()
+    sink.insert_many('sales_orders', [{'order_id': 'SO1'}, {'order_id': 'SO1'}])
+    manifest = seed_manifest.SeedManifest(str(tmp_path), 'test')
+    stats = bulk_loader.BulkLoader(sink, manifest=manifest).load(str(tmp_path))['sales_orders']
+    assert 'duplicate key' in str(stats['index_error'])
+    assert stats['rows'] == 5 and not stats['errors']
+
+
+def test_changed_file_upserts_only_changed_records_and_deletes_missing_ones(tmp_path):
+    data = tmp_path / 'data'
+    data.mkdir()
+    _write_orders(data, 2500)
+    sink = sinks.SQLiteSink(str(tmp_path / 'seed.sqlite'))
+
+    def load():
+        manifest = seed_manifest.SeedManifest(str(data), sink.name)
+        return bulk_loader.BulkLoader(sink, batch_size=1000, manifest=manifest).load(str(data))['sales_orders']
+
+    assert load()['inserted'] == 2500
+    assert load()['skipped']
+    with open(data / 'sales_orders.json', 'w') as f:
+        json.dump([{'order_id': f"SO{i}", 'total_amount': -i if i % 500 == 0 else i} for i in range(2000)], f)
+    stats = load()
+    assert (stats['rows'], stats['inserted'], stats['removed']) == (2000, 3, 500)
+    assert sink.count('sales_orders') == 2000
+    assert load()['skipped']
+    sink.close()
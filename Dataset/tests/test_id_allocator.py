@@ -0,0 +1,19 @@
+import pytest
+
+import id_allocator
+
+
+def test_next_id_hands_out_the_last_ids_of_a_digit_space():
+    id_allocator.start(990000)
+    ids = [id_allocator.next_id('SKU', 6) for _ in range(10000)]
+    assert len(set(ids)) == 10000
+    assert all(value.startswith('SKU') and int(value[3:]) < 10 ** 6 for value in ids)
+    with pytest.raises(ValueError, match='run out after 1000000 rows'):
+        id_allocator.next_id('SKU', 6)
+
+
+def test_next_id_matches_id_column():
+    id_allocator.start(5)
+    column = id_allocator.id_column(3000, 'SO', 8).tolist()
+    id_allocator.start(5)
+    assert [id_allocator.next_id('SO', 8) for _ in range(3000)] == column
@@ -0,0 +1,21 @@
+import pytest
+
+import key_registry
+import scale
+
+
+def test_sf_1000_fits_every_id_space():
+    sizes = scale.table_sizes(1000)
+    assert sizes['sku_master.json'] == 10 ** 6
+    assert sizes['employee_records.json'] == sizes['user_access.json'] == 500000
+    assert scale.id_overflows(sizes) == []
+
+
+def test_scale_factor_beyond_an_id_space_fails_early():
+    with pytest.raises(ValueError, match=r'sku_master\.json needs 1001000 rows but SKU ids with 6 digits'):
+        scale.table_sizes(1001)
+
+
+def test_id_spaces_name_known_tables():
+    for table in key_registry.ID_SPACES:
+        assert table in key_registry.PRIMARY_KEYS
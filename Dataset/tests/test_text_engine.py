@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+import text_engine
+
+
+@pytest.mark.parametrize('domain', [None, 'qc'])
+@pytest.mark.parametrize('kind', sorted(text_engine.LENGTHS))
+def test_column_slices_match_single_texts(kind, domain):
+    corpus = text_engine.corpus(domain)
+    rng = np.random.default_rng(0)
+    indices = rng.integers(0, corpus.usable, 5000)
+    lengths = text_engine.lengths(rng, 5000, kind)
+    texts = corpus.slices(indices, lengths)
+    assert texts.tolist() == [corpus.slice(index, length) for index, length in zip(indices.tolist(), lengths.tolist())]
+    assert all(len(text) <= text_engine.LENGTHS[kind]['max_chars'] for text in texts)
@@ -0,0 +1,169 @@
+import argparse
+import bisect
+import random
+
+import numpy as np
+from faker.providers.lorem.en_US import Provider as LoremProvider
+
+# General vocabulary: the words fake.text() draws from
+WORDS = list(LoremProvider.word_list)
+
+# Domain vocabulary mixed into the corpus of each domain, so search indexes see real terms
+DOMAIN_TERMS = {
+    'gst': [
+        'GST', 'GSTIN', 'IGST', 'CGST', 'SGST', 'HSN', 'SAC', 'GSTR-1', 'GSTR-3B', 'GSTR-2A', 'e-invoice',
+        'IRN', 'e-way bill', 'input tax credit', 'reverse charge', 'place of supply', 'taxable value',
+        'credit note', 'debit note', 'tax invoice', 'return filing', 'reconciliation', 'composition scheme'
+    ],
+    'dispatch': [
+        'dispatch', 'consignment', 'shipment', 'LR number', 'POD', 'ASN', 'transporter', 'vehicle number',
+        'e-way bill', 'delivery challan', 'in transit', 'loading', 'unloading', 'route', 'freight',
+        'docket', 'delivery note', 'carrier', 'transit delay', 'proof of delivery', 'pallet'
+    ],
+    'qc': [
+        'QC', 'inspection', 'checkpoint', 'tolerance', 'specification', 'deviation', 'non-conformance',
+        'NCR', 'CAPA', 'sampling plan', 'AQL', 'batch release', 'retest', 'calibration', 'visual check',
+        'dimension check', 'out of spec', 'hold', 'rework', 'certificate of analysis', 'shelf life'
+    ]
+}
+
+# Share of corpus tokens drawn from the domain vocabulary
+DOMAIN_SHARE = 0.2
+
+# Sentences in each precomputed corpus and words per sentence
+CORPUS_SENTENCES = 50000
+SENTENCE_WORDS = (3, 12)
+
+# Target length of each text kind in characters: drawn per value from the distribution
+# ('uniform' between min and max, or 'normal' around their midpoint) and never above max_chars
+LENGTHS = {
+    'sentence': {'min_chars': 20, 'max_chars': 60, 'distribution': 'uniform'},
+    'short_text': {'min_chars': 40, 'max_chars': 100, 'distribution': 'uniform'},
+    'text': {'min_chars': 60, 'max_chars': 200, 'distribution': 'uniform'},
+    'long_text': {'min_chars': 150, 'max_chars': 500, 'distribution': 'uniform'},
+    'paragraph': {'min_chars': 50, 'max_chars': 130, 'distribution': 'normal'}
+}
+
+DISTRIBUTIONS = ('uniform', 'normal')
+
+_corpora = {}
+
+
+# Change the length distribution of a text kind, e.g. configure('text', max_chars=400)
+def configure(kind, min_chars=None, max_chars=None, distribution=None):
+    spec = LENGTHS[kind]
+    if distribution is not None and distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+    for key, value in (('min_chars', min_chars), ('max_chars', max_chars), ('distribution', distribution)):
+        if value is not None:
+            spec[key] = value
+
+
+# A long run of random sentences with the offsets where each one starts and ends.
+# A text is a slice from a sentence start to the last sentence end that fits its length.
+class Corpus:
+    def __init__(self, domain=None):
+        rng = np.random.default_rng(list(f"corpus:{domain}".encode()))
+        vocabulary = WORDS + DOMAIN_TERMS[domain] if domain else WORDS
+        weights = np.full(len(vocabulary), 1.0)
+        if domain:
+            weights[:len(WORDS)] = (1 - DOMAIN_SHARE) / len(WORDS)
+            weights[len(WORDS):] = DOMAIN_SHARE / len(DOMAIN_TERMS[domain])
+        words = np.array(vocabulary, dtype=object)[
+            rng.choice(len(vocabulary), CORPUS_SENTENCES * SENTENCE_WORDS[1], p=weights / weights.sum())].tolist()
+        counts = rng.integers(SENTENCE_WORDS[0], SENTENCE_WORDS[1], CORPUS_SENTENCES, endpoint=True).tolist()
+        sentences, position = [], 0
+        for count in counts:
+            sentence = ' '.join(words[position:position + count])
+            sentences.append(sentence[0].upper() + sentence[1:] + '.')
+            position += count
+        self.text = ' '.join(sentences)
+        lengths = np.array([len(sentence) for sentence in sentences], dtype=np.int64)
+        self.ends = np.cumsum(lengths + 1) - 1
+        self.starts = self.ends - lengths
+        self._starts = self.starts.tolist()
+        self._ends = self.ends.tolist()
+        # Per position, the last space at or before it (-1 if none), so slices() finds the
+        # word boundaries of whole columns of texts at once
+        characters = np.frombuffer(self.text.encode('utf-32-le'), dtype=np.uint32)
+        positions = np.arange(len(characters), dtype=np.int64)
+        self.last_space = np.maximum.accumulate(np.where(characters == ord(' '), positions, -1))
+        # Texts start early enough that the longest one still fits before the end
+        longest = max(spec['max_chars'] for spec in LENGTHS.values())
+        self.usable = max(1, int(np.searchsorted(self.starts, len(self.text) - longest)))
+
+    # Texts starting at the sentence indices, of about the given lengths (at most), as
+    # slice() but for whole arrays: the end sentences of all texts are found with one
+    # searchsorted and only the final cut of each string out of the corpus is Python
+    def slices(self, indices, lengths):
+        start = self.starts[indices]
+        last = np.searchsorted(self.ends, start + lengths, side='right') - 1
+        fits = last >= indices
+        # Where the first sentence alone is too long it is cut at a word boundary
+        cut = self.last_space[start + lengths - 1]
+        stop = np.where(fits, self.ends[np.maximum(last, 0)], np.where(cut > start, cut, start + lengths))
+        text = self.text
+        texts = np.array([text[begin:end] for begin, end in zip(start.tolist(), stop.tolist())], dtype=object)
+        cut_rows = np.flatnonzero(~fits)
+        texts[cut_rows] = np.char.add(texts[cut_rows].astype(str), '.').astype(object)
+        return texts
+
+    # Text starting at sentence index of about length characters (at most length)
+    def slice(self, index, length):
+        start = self._starts[index]
+        end = bisect.bisect_right(self._ends, start + length) - 1
+        if end >= index:
+            return self.text[start:self._ends[end]]
+        # The first sentence alone is too long: cut it at a word boundary
+        cut = self.text.rfind(' ', start, start + length)
+        return self.text[start:cut if cut > start else start + length].rstrip(',') + '.'
+
+
+# Corpus of a domain ('gst', 'dispatch', 'qc' or None for general text), built once per process
+def corpus(domain=None):
+    if domain is not None and domain not in DOMAIN_TERMS:
+        raise ValueError(f"Unknown text domain {domain!r}, expected one of {sorted(DOMAIN_TERMS)}")
+    if domain not in _corpora:
+        _corpora[domain] = Corpus(domain)
+    return _corpora[domain]
+
+
+# Target lengths of n texts of a kind
+def lengths(rng, n, kind='text'):
+    spec = LENGTHS[kind]
+    low, high = spec['min_chars'], spec['max_chars']
+    if spec['distribution'] == 'normal':
+        values = np.rint(rng.normal((low + high) / 2, (high - low) / 4, n))
+    else:
+        values = rng.integers(low, high, n, endpoint=True)
+    return np.clip(values, 1, high).astype(np.int64)
+
+
+# A column of n texts of a kind, e.g. column(rng, 1000, 'text', domain='qc')
+def column(rng, n, kind='text', domain=None):
+    text = corpus(domain)
+    starts = rng.integers(0, text.usable, n)
+    return text.slices(starts, lengths(rng, n, kind))
+
+
+# One text of a kind for per-record generators, drawn with the random module so
+# seeded runs stay reproducible; replaces fake.text()/fake.sentence()/fake.paragraph()
+def text(kind='text', domain=None):
+    spec = LENGTHS[kind]
+    low, high = spec['min_chars'], spec['max_chars']
+    if spec['distribution'] == 'normal':
+        length = min(high, max(1, round(random.gauss((low + high) / 2, (high - low) / 4))))
+    else:
+        length = random.randint(low, high)
+    source = corpus(domain)
+    return source.slice(random.randrange(source.usable), length)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show sample texts from the text engine")
+    parser.add_argument('kind', nargs='?', choices=sorted(LENGTHS), default='text')
+    parser.add_argument('--domain', choices=sorted(DOMAIN_TERMS), default=None)
+    parser.add_argument('--count', type=int, default=5)
+    args = parser.parse_args()
+    for value in column(np.random.default_rng(), args.count, args.kind, args.domain):
+        print(f"{len(value):>4}  {value}")
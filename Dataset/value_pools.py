@@ -0,0 +1,154 @@
+import argparse
+import os
+
+import numpy as np
+from faker import Faker
+from faker.exceptions import UniquenessException
+
+# Where built pools are cached between runs
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'value_pools')
+
+DEFAULT_LOCALE = 'en_US'
+
+# Pool settings per field: Faker provider, its arguments, pool size and whether values must be unique
+POOL_SPECS = {
+    'name': {'provider': 'name', 'size': 20000, 'unique': False},
+    'company': {'provider': 'company', 'size': 20000, 'unique': False},
+    'email': {'provider': 'email', 'size': 50000, 'unique': True},
+    'phone_number': {'provider': 'phone_number', 'size': 20000, 'unique': False},
+    'address': {'provider': 'address', 'size': 20000, 'unique': False},
+    'city': {'provider': 'city', 'size': 5000, 'unique': False},
+    'state': {'provider': 'state', 'size': 100, 'unique': False},
+    'country': {'provider': 'country', 'size': 500, 'unique': False},
+    'postcode': {'provider': 'postcode', 'size': 20000, 'unique': False}
+}
+
+_MAGIC = b'VPOOL001'
+_pools = {}
+_seed = 0
+
+
+# Seed used to build (and look up) pools; runs with the same seed share the cache
+def set_seed(seed):
+    global _seed
+    _seed = seed
+
+
+# Change the size or uniqueness of a field's pool, e.g. configure('email', size=200000)
+def configure(field, size=None, unique=None):
+    spec = POOL_SPECS[field]
+    if size is not None:
+        spec['size'] = size
+    if unique is not None:
+        spec['unique'] = unique
+
+
+# Pre-generated values of one field, memory-mapped from the cache file
+class ValuePool:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(16)
+        if header[:8] != _MAGIC:
+            raise ValueError(f"{path} is not a value pool file")
+        count = int.from_bytes(header[8:], 'little')
+        self.path = path
+        self.offsets = np.memmap(path, dtype='<i8', mode='r', offset=16, shape=(count + 1,))
+        self.blob = np.memmap(path, dtype=np.uint8, mode='r', offset=16 + 8 * (count + 1))
+        self._values = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # All values as an object array, decoded once on first use
+    def values(self):
+        if self._values is None:
+            data = self.blob.tobytes()
+            offsets = self.offsets.tolist()
+            self._values = np.array([data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(self))], dtype=object)
+        return self._values
+
+    # Values at the given indices
+    def take(self, indices):
+        return self.values()[indices]
+
+    # n values drawn uniformly from the pool; distinct=True draws without replacement
+    # (as far as the pool size allows)
+    def sample(self, rng, n, distinct=False):
+        if distinct and n <= len(self):
+            return self.take(rng.choice(len(self), n, replace=False))
+        return self.take(rng.integers(0, len(self), n))
+
+
+# Write values to a pool file (offsets followed by UTF-8 bytes); written atomically
+def write_pool(path, values):
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC + len(encoded).to_bytes(8, 'little'))
+        f.write(offsets.tobytes())
+        f.write(b''.join(encoded))
+    os.replace(tmp_path, path)
+
+
+# Generate a field's values with a Faker instance seeded from locale, seed and field
+def build_values(field, locale=DEFAULT_LOCALE, seed=0):
+    spec = POOL_SPECS[field]
+    fake = Faker(locale)
+    fake.seed_instance(f"{seed}:{field}")
+    kwargs = spec.get('kwargs', {})
+    if not spec['unique']:
+        method = getattr(fake, spec['provider'])
+        return [method(**kwargs) for _ in range(spec['size'])]
+    method = getattr(fake.unique, spec['provider'])
+    values = []
+    try:
+        for _ in range(spec['size']):
+            values.append(method(**kwargs))
+    except UniquenessException:
+        pass  # The provider ran out of distinct values; keep what we have
+    return values
+
+
+# Cache file for a field, keyed by locale, seed, size and uniqueness
+def pool_path(field, locale=DEFAULT_LOCALE, seed=0, cache_dir=DEFAULT_CACHE_DIR):
+    spec = POOL_SPECS[field]
+    unique = 'u' if spec['unique'] else 'r'
+    return os.path.join(cache_dir, f"{locale}-{seed}-{field}-{spec['size']}{unique}.pool")
+
+
+# Load a field's pool from the cache, building and saving it first if needed
+def get_pool(field, locale=DEFAULT_LOCALE, seed=None, cache_dir=DEFAULT_CACHE_DIR):
+    seed = _seed if seed is None else seed
+    path = pool_path(field, locale, seed, cache_dir)
+    pool = _pools.get(path)
+    if pool is None:
+        if not os.path.exists(path):
+            write_pool(path, build_values(field, locale, seed))
+        pool = _pools[path] = ValuePool(path)
+    return pool
+
+
+# A column of n values of a field, e.g. column(rng, 1000, 'company').
+# Fields configured as unique are drawn without repeats within the column.
+def column(rng, n, field, locale=DEFAULT_LOCALE):
+    return get_pool(field, locale).sample(rng, n, distinct=POOL_SPECS[field]['unique'])
+
+
+# Build every pool up front so later runs only read the cache
+def warm_cache(fields=None, locale=DEFAULT_LOCALE, seed=None, cache_dir=DEFAULT_CACHE_DIR):
+    for field in fields or POOL_SPECS:
+        pool = get_pool(field, locale, seed, cache_dir)
+        print(f"{field}: {len(pool)} values in {pool.path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Faker value pools used by batch mode")
+    parser.add_argument('fields', nargs='*', help="Fields to build (default: all)")
+    parser.add_argument('--locale', default=DEFAULT_LOCALE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+    warm_cache(args.fields, args.locale, args.seed, args.cache_dir)